@@ -1,61 +1,224 @@
 # app/api/v1/endpoints/CardController.py
-from fastapi import APIRouter, Depends, HTTPException, status
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.responses import Response, StreamingResponse
+from typing import List, Optional, Dict, Any
 from uuid import UUID
 from decimal import Decimal
 from datetime import date
-from app.services.CardService import CardsService,CardsThemeService,CardIntereactionService
-from app.domain.CardModel import Card, CardTheme, CardInteraction
-from app.core.config import get_cards_service, get_cards_theme_service, get_card_interaction_service
+from app.services.CardService import CardsService,CardsThemeService,CardIntereactionService,PriceService,PRICE_CHART_MAX_POINTS
+from app.domain.CardModel import Card, CardTheme, CardInteraction, CardSearchResult, CardFilter, InteractionNeighbour, PriceCandle, PriceHistory, CardStats, CardDistribution
+from app.domain.BaseModel import Page, BulkResult
+from app.data.BaseRepository import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from app.core.config import get_cards_service, get_request_cards_service, get_cards_theme_service, get_card_interaction_service, get_price_service
+from app.core.streaming import ndjson_stream, NDJSON_MEDIA_TYPE
+from app.core.serialization import FastJSONResponse, dump_json
+from app.core.http_cache import version_of, is_conditional, not_modified, not_modified_response, cache_headers, with_cache_headers, conditional_body
 
 router = APIRouter()
 
 # Cards Endpoints
 @router.post("/cards/", response_model=Card, status_code=status.HTTP_201_CREATED)
-async def create_card(card: Card, cards_service: CardsService = Depends(get_cards_service)):
+async def create_card(card: Card, return_representation: bool = True, cards_service: CardsService = Depends(get_cards_service)):
     """
-    Endpoint to create a new card.
+    Endpoint to create a new card. With `return_representation=false` only the Location header is returned.
     """
     try:
-        return await cards_service.create(card)
+        created = await cards_service.create(card, return_representation=return_representation)
+        if not return_representation:
+            return Response(status_code=status.HTTP_201_CREATED, headers={"Location": f"/api/v1/cards/{created.id}"})
+        return created
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
+
+@router.post("/cards/bulk", response_model=BulkResult)
+async def bulk_upsert_cards(cards: List[Dict[str, Any]], cards_service: CardsService = Depends(get_cards_service)):
+    """
+    Endpoint to create or update many cards in one transaction, reporting the rows that failed.
+    """
+    try:
+        return await cards_service.bulk_upsert(cards)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
+
+# Search, filter and export routes are declared before /cards/{card_id} so they are not parsed as card IDs
+@router.get("/cards/search", response_model=List[CardSearchResult])
+async def search_cards(
+    q: str = Query(..., min_length=1, max_length=100),
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0),
+    cards_service: CardsService = Depends(get_cards_service)
+):
+    """
+    Endpoint to search cards by name, ranked by relevance. Supports prefixes and typos.
+    """
+    try:
+        return await cards_service.search(q, limit=limit, offset=offset)
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
+
+@router.get("/cards/filter", response_model=Page[Card])
+async def filter_cards(
+    request: Request,
+    min_mana_cost: Optional[int] = Query(None, ge=0),
+    max_mana_cost: Optional[int] = Query(None, ge=0),
+    types: Optional[List[str]] = Query(None),
+    colors: Optional[List[str]] = Query(None),
+    min_power: Optional[int] = None,
+    max_power: Optional[int] = None,
+    min_toughness: Optional[int] = None,
+    max_toughness: Optional[int] = None,
+    sets: Optional[List[str]] = Query(None),
+    min_price: Optional[Decimal] = Query(None, ge=0),
+    max_price: Optional[Decimal] = Query(None, ge=0),
+    themes: Optional[List[str]] = Query(None),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    after: Optional[str] = None,
+    cards_service: CardsService = Depends(get_cards_service)
+):
+    """
+    Endpoint to filter cards by any combination of attributes, e.g.
+    `?types=Creature&colors=Red&colors=Green&min_mana_cost=2&max_mana_cost=4&themes=Aggro`.
+    """
+    try:
+        card_filter = CardFilter(
+            min_mana_cost=min_mana_cost, max_mana_cost=max_mana_cost, types=types, colors=colors,
+            min_power=min_power, max_power=max_power, min_toughness=min_toughness, max_toughness=max_toughness,
+            sets=sets, min_price=min_price, max_price=max_price, themes=themes,
+        )
+        page = await cards_service.filter_cards(card_filter, limit=limit, after=after, raw=True)
+        return conditional_body(request, FastJSONResponse(page), "card_list")
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
+
+@router.get("/cards/batch", response_model=List[Card])
+async def get_cards_batch(
+    ids: List[UUID] = Query(..., max_length=1000),
+    cards_service: CardsService = Depends(get_cards_service)
+):
+    """
+    Endpoint to retrieve many cards by ID in one request. Unknown IDs are skipped.
+    """
+    try:
+        return FastJSONResponse(dump_json(List[Card], await cards_service.get_many(ids)))
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
+
+@router.get("/cards/export")
+async def export_cards(
+    format: str = Query("ndjson", pattern="^ndjson$"),
+    cards_service: CardsService = Depends(get_cards_service)
+):
+    """
+    Endpoint to stream the whole card catalogue as newline-delimited JSON.
+    """
+    return StreamingResponse(ndjson_stream(cards_service.iterate()), media_type=NDJSON_MEDIA_TYPE)
+
+@router.get("/cards/prices/export")
+async def export_price_history(
+    format: str = Query("ndjson", pattern="^ndjson$"),
+    price_service: PriceService = Depends(get_price_service)
+):
+    """
+    Endpoint to stream the price history of every card as newline-delimited JSON.
+    """
+    return StreamingResponse(ndjson_stream(price_service.iterate()), media_type=NDJSON_MEDIA_TYPE)
+
+@router.get("/cards/stats", response_model=List[CardStats])
+async def get_card_stats(
+    group_by: str = Query("set", pattern="^(type|color|set)$"),
+    metric: str = Query("price", pattern="^(mana_cost|power|toughness|price)$"),
+    cards_service: CardsService = Depends(get_cards_service)
+):
+    """
+    Endpoint to aggregate a numeric card attribute (count, mean, min, max, total) per type, color or set,
+    e.g. the average price per color. Served from the in-memory columnar catalogue.
+    """
+    try:
+        return await cards_service.get_card_stats(group_by, metric)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
+
+@router.get("/cards/stats/distribution", response_model=List[CardDistribution])
+async def get_card_distribution(
+    group_by: str = Query("set", pattern="^(type|color|set)$"),
+    column: str = Query("mana_cost", pattern="^(mana_cost|power|toughness)$"),
+    cards_service: CardsService = Depends(get_cards_service)
+):
+    """
+    Endpoint to count the cards per value of an integer attribute per type, color or set,
+    e.g. the mana cost distribution of each set.
+    """
+    try:
+        return await cards_service.get_card_distribution(group_by, column)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
 
 @router.get("/cards/{card_id}", response_model=Card)
-async def get_card(card_id: UUID, cards_service: CardsService = Depends(get_cards_service)):
+async def get_card(card_id: UUID, request: Request, response: Response, cards_service: CardsService = Depends(get_request_cards_service)):
     """
-    Endpoint to retrieve a card by ID.
+    Endpoint to retrieve a card by ID. Responses carry an ETag and Last-Modified; a conditional
+    request for an unchanged card is answered with 304 after reading only its updated_at.
     """
+    if is_conditional(request):
+        updated_at = await cards_service.get_version(card_id)
+        version = version_of(updated_at, card_id)
+        if updated_at is not None and not_modified(request, version):
+            return not_modified_response(version, "card")
     card = await cards_service.get(card_id)
     if not card:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Card not found.")
+    if card.updated_at is not None:
+        response.headers.update(cache_headers(version_of(card.updated_at, card_id), "card"))
     return card
 
-@router.get("/cards/", response_model=List[Card])
-async def list_cards(cards_service: CardsService = Depends(get_cards_service)):
+@router.get("/cards/", response_model=Page[Card])
+async def list_cards(
+    request: Request,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    after: Optional[str] = None,
+    cards_service: CardsService = Depends(get_cards_service)
+):
     """
-    Endpoint to list all cards.
+    Endpoint to list cards one page at a time. Pass `next_cursor` back as `after` to get the next page.
     """
-    return await cards_service.list()
+    try:
+        return conditional_body(request, FastJSONResponse(await cards_service.list(limit=limit, after=after, raw=True)), "card_list")
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
 
 @router.put("/cards/{card_id}", response_model=Card)
-async def update_card(card_id: UUID, card: Card, cards_service: CardsService = Depends(get_cards_service)):
+async def update_card(card_id: UUID, card: Card, return_representation: bool = True, cards_service: CardsService = Depends(get_cards_service)):
     """
-    Endpoint to update a card's information.
+    Endpoint to update a card's information. With `return_representation=false` the response has no body.
     """
     try:
-        return await cards_service.update(card_id, card)
+        updated = await cards_service.update(card_id, card, return_representation=return_representation)
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
+    if not updated:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Card not found.")
+    if not return_representation:
+        return Response(status_code=status.HTTP_204_NO_CONTENT)
+    return updated
 
 @router.delete("/cards/{card_id}", response_model=Card)
-async def delete_card(card_id: UUID, cards_service: CardsService = Depends(get_cards_service)):
+async def delete_card(card_id: UUID, return_representation: bool = True, cards_service: CardsService = Depends(get_cards_service)):
     """
-    Endpoint to delete a card by ID.
+    Endpoint to delete a card by ID. With `return_representation=false` the card is not read first and the response has no body.
     """
-    card = await cards_service.delete(card_id)
+    card = await cards_service.delete(card_id, return_representation=return_representation)
     if not card:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Card not found.")
+    if not return_representation:
+        return Response(status_code=status.HTTP_204_NO_CONTENT)
     return card
 
 # Cards Theme Endpoints
@@ -99,48 +262,134 @@ async def get_card_interactions(card_id: UUID, card_interaction_service: CardInt
     """
     return await card_interaction_service.get_interactions_for_card(card_id)
 
+@router.get("/cards/interactions/common", response_model=List[UUID])
+async def get_common_interactions(
+    ids: List[UUID] = Query(..., max_length=50),
+    limit: int = Query(100, ge=1, le=1000),
+    card_interaction_service: CardIntereactionService = Depends(get_card_interaction_service)
+):
+    """
+    Endpoint to retrieve the cards that interact with all of the given cards.
+    """
+    try:
+        return await card_interaction_service.get_common_interactions(ids, limit=limit)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
+
+@router.get("/cards/{card_id}/interactions/graph", response_model=List[InteractionNeighbour])
+async def get_card_interaction_graph(
+    card_id: UUID,
+    depth: int = Query(1, ge=1, le=4),
+    limit: int = Query(100, ge=1, le=1000),
+    card_interaction_service: CardIntereactionService = Depends(get_card_interaction_service)
+):
+    """
+    Endpoint to retrieve the cards within `depth` interaction hops of a card, nearest first.
+    """
+    try:
+        return await card_interaction_service.get_interaction_graph(card_id, depth=depth, limit=limit)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
+
 # Price History Endpoints
 @router.post("/cards/{card_id}/price", status_code=status.HTTP_200_OK)
 async def record_card_price(
     card_id: UUID,
     price: Decimal,
     price_date: date,
-    cards_service: CardsService = Depends(get_cards_service)
+    price_service: PriceService = Depends(get_price_service)
 ):
     """
     Endpoint to record a new price for a card.
     """
     try:
-        await cards_service.record_card_price(card_id, price, price_date)
+        await price_service.record_price(card_id, price, price_date)
         return {"message": "Price recorded successfully."}
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
 
+@router.post("/cards/prices/bulk", response_model=BulkResult)
+async def bulk_record_card_prices(prices: List[Dict[str, Any]], price_service: PriceService = Depends(get_price_service)):
+    """
+    Endpoint to record many prices (card_id, price, date) in one transaction, reporting the rows that failed.
+    """
+    try:
+        return await price_service.bulk_upsert(prices)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
+
+@router.get("/cards/prices/latest", response_model=Dict[str, PriceHistory])
+async def get_latest_card_prices(
+    ids: List[UUID] = Query(..., max_length=MAX_PAGE_SIZE),
+    price_service: PriceService = Depends(get_price_service)
+):
+    """
+    Endpoint to retrieve the latest price of many cards in one request, keyed by card id.
+    """
+    try:
+        return FastJSONResponse(await price_service.get_latest_prices(ids, raw=True))
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
+
 @router.get("/cards/{card_id}/latest-price", response_model=Decimal)
 async def get_latest_card_price(
     card_id: UUID,
-    cards_service: CardsService = Depends(get_cards_service)
+    price_service: PriceService = Depends(get_price_service)
 ):
     """
     Endpoint to retrieve the latest price of a card.
     """
     try:
-        return await cards_service.get_latest_card_price(card_id)
-    except ValueError as e:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+        latest = await price_service.get_latest_price(card_id)
+        if latest is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="No price recorded for this card.")
+        return latest.price
+    except HTTPException as e:
+        raise e
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
 
-@router.get("/cards/{card_id}/price-history", response_model=List[dict])
+@router.get("/cards/{card_id}/price-history", response_model=List[PriceCandle])
 async def get_card_price_history(
     card_id: UUID,
-    cards_service: CardsService = Depends(get_cards_service)
+    request: Request,
+    start: Optional[date] = Query(None, alias="from"),
+    end: Optional[date] = Query(None, alias="to"),
+    bucket: Optional[str] = Query(None, pattern="^(day|week|month)$"),
+    max_points: int = Query(PRICE_CHART_MAX_POINTS, ge=1, le=5000),
+    price_service: PriceService = Depends(get_price_service)
 ):
     """
-    Endpoint to retrieve the price history of a card.
+    Endpoint to retrieve the price history of a card as OHLC candles between `from` and `to`.
+    Without `bucket` the range is downsampled to at most `max_points` candles.
     """
     try:
-        price_history = await cards_service.get_price_history(card_id)
-        return [{"price": record.price, "date": record.date} for record in price_history]
+        # Versão e corpo lidos da mesma réplica: uma réplica atrasada não pode pôr um ETag novo num corpo velho
+        async with price_service.pinned_reads():
+            updated_at, records = await price_service.get_price_history_version(card_id)
+            version = version_of(updated_at, card_id, records, request.url.query)
+            if not_modified(request, version):
+                return not_modified_response(version, "price_history")
+            candles = await price_service.get_price_candles(card_id, start, end, bucket=bucket, max_points=max_points)
+        return with_cache_headers(FastJSONResponse(dump_json(List[PriceCandle], candles)), version, "price_history")
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
+
+@router.get("/cards/{card_id}/price-history/export")
+async def export_card_price_history(
+    card_id: UUID,
+    format: str = Query("ndjson", pattern="^ndjson$"),
+    price_service: PriceService = Depends(get_price_service)
+):
+    """
+    Endpoint to stream the price history of a card as newline-delimited JSON.
+    """
+    return StreamingResponse(ndjson_stream(price_service.iterate_price_history(card_id)), media_type=NDJSON_MEDIA_TYPE)
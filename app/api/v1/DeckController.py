@@ -1,26 +1,89 @@
 # app/api/v1/endpoints/DeckController.py
-from fastapi import APIRouter, Depends, HTTPException, status
-from typing import List
+from fastapi import APIRouter, Body, Depends, HTTPException, Query, Request, status
+from fastapi.responses import Response
+from typing import List, Optional, Dict, Any, Union
 from uuid import UUID
-from app.services.DeckService import DeckService, DeckCardsService, SynergyScoresService
-from app.domain.DeckModel import Deck, DeckCard, SynergyScore
-from app.core.config import get_deck_service, get_deck_cards_service, get_synergy_scores_service
+from app.services.DeckService import DeckService, DeckCardsService, SynergyScoresService, DeckSummaryService
+from app.services.CardService import CardIntereactionService
+from app.domain.DeckModel import Deck, DeckCard, DeckCardDetail, SynergyScore, DeckSummary, DeckValue, UserDecksValue
+from app.domain.CardModel import CardSuggestion
+from app.domain.BaseModel import Page, BulkResult
+from app.data.BaseRepository import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from app.core.serialization import FastJSONResponse, dump_json
+from app.core.http_cache import version_of, not_modified, not_modified_response, with_cache_headers, conditional_body
+from app.core.config import get_deck_service, get_deck_cards_service, get_synergy_scores_service, get_deck_summary_service, get_card_interaction_service
+from pydantic import BaseModel
 
 router = APIRouter()
 
+class DeckCardChange(BaseModel):
+    """
+    Pydantic model for one entry of a deck diff: how many copies of a card to add (or remove, if negative).
+    """
+    card_id: UUID
+    delta: int
+
 # Deck Endpoints
 @router.post("/decks/", response_model=Deck, status_code=status.HTTP_201_CREATED)
-async def create_deck(user_id: UUID, name: str, deck_service: DeckService = Depends(get_deck_service)):
+async def create_deck(
+    user_id: UUID, name: str, return_representation: bool = True,
+    cards: Optional[List[Dict[str, Any]]] = Body(None), deck_service: DeckService = Depends(get_deck_service)
+):
     """
-    Endpoint to create a new deck for a user.
+    Endpoint to create a new deck for a user, optionally with its cards (card_id, quantity) in the same transaction.
+    With `return_representation=false` only the Location header is returned.
     """
     try:
-        return await deck_service.create_deck_for_user(user_id, name)
+        if cards:
+            deck = await deck_service.create_deck_with_cards(user_id, name, cards, return_representation=return_representation)
+        else:
+            deck = await deck_service.create_deck_for_user(user_id, name, return_representation=return_representation)
+        if not return_representation:
+            return Response(status_code=status.HTTP_201_CREATED, headers={"Location": f"/api/v1/decks/{deck.id}"})
+        return deck
     except ValueError as e:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
 
+@router.get("/decks/", response_model=Page[Deck])
+async def list_decks(
+    request: Request,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    after: Optional[str] = None,
+    deck_service: DeckService = Depends(get_deck_service)
+):
+    """
+    Endpoint to list decks one page at a time. Pass `next_cursor` back as `after` to get the next page.
+    """
+    try:
+        return conditional_body(request, FastJSONResponse(await deck_service.list(limit=limit, after=after, raw=True)), "deck")
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+@router.get("/decks/summaries", response_model=List[DeckSummary])
+async def get_deck_summaries(
+    ids: List[UUID] = Query(..., max_length=MAX_PAGE_SIZE),
+    deck_summary_service: DeckSummaryService = Depends(get_deck_summary_service)
+):
+    """
+    Endpoint to retrieve the summaries of many decks in one request, e.g. for a deck list page.
+    """
+    try:
+        return await deck_summary_service.get_summaries(ids)
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
+
+@router.get("/users/{user_id}/decks/value", response_model=UserDecksValue)
+async def get_user_decks_value(user_id: UUID, deck_service: DeckService = Depends(get_deck_service)):
+    """
+    Endpoint to retrieve the current value of every deck of a user, for the portfolio page.
+    """
+    try:
+        return await deck_service.get_user_decks_value(user_id)
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
+
 @router.get("/decks/user/{user_id}", response_model=List[Deck])
 async def get_user_decks(user_id: UUID, deck_service: DeckService = Depends(get_deck_service)):
     """
@@ -32,15 +95,49 @@ async def get_user_decks(user_id: UUID, deck_service: DeckService = Depends(get_
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
 
 @router.delete("/decks/{deck_id}", response_model=Deck)
-async def delete_deck(deck_id: UUID, deck_service: DeckService = Depends(get_deck_service)):
+async def delete_deck(deck_id: UUID, return_representation: bool = True, deck_service: DeckService = Depends(get_deck_service)):
     """
-    Endpoint to delete a specific deck.
+    Endpoint to delete a specific deck. With `return_representation=false` the deck is not read first and the response has no body.
     """
     try:
-        deck = await deck_service.delete(deck_id)
+        deck = await deck_service.delete(deck_id, return_representation=return_representation)
         if not deck:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Deck not found.")
+        if not return_representation:
+            return Response(status_code=status.HTTP_204_NO_CONTENT)
         return deck
+    except HTTPException as e:
+        raise e
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
+
+@router.get("/decks/{deck_id}/summary", response_model=DeckSummary)
+async def get_deck_summary(deck_id: UUID, deck_summary_service: DeckSummaryService = Depends(get_deck_summary_service)):
+    """
+    Endpoint to retrieve the card count, mana curve, color distribution and value of a deck.
+    """
+    try:
+        summary = await deck_summary_service.get_summary(deck_id)
+        if summary is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Deck not found.")
+        return summary
+    except HTTPException as e:
+        raise e
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
+
+@router.get("/decks/{deck_id}/value", response_model=DeckValue)
+async def get_deck_value(deck_id: UUID, deck_service: DeckService = Depends(get_deck_service)):
+    """
+    Endpoint to retrieve the current value of a deck (quantity x latest price of each card).
+    """
+    try:
+        value = await deck_service.get_deck_value(deck_id)
+        if value is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Deck not found.")
+        return value
+    except HTTPException as e:
+        raise e
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
 
@@ -60,6 +157,19 @@ async def add_card_to_deck(deck_id: UUID, card_id: UUID, quantity: int = 1, deck
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
 
+@router.patch("/decks/{deck_id}/cards", status_code=status.HTTP_200_OK)
+async def apply_deck_diff(deck_id: UUID, changes: List[DeckCardChange], deck_cards_service: DeckCardsService = Depends(get_deck_cards_service)):
+    """
+    Endpoint to apply a batch of quantity changes to a deck in one transaction.
+    """
+    try:
+        await deck_cards_service.apply_deck_diff(deck_id, [(change.card_id, change.delta) for change in changes])
+        return {"message": "Deck updated successfully."}
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
+
 @router.delete("/decks/{deck_id}/cards/{card_id}", status_code=status.HTTP_200_OK)
 async def remove_card_from_deck(deck_id: UUID, card_id: UUID, deck_cards_service: DeckCardsService = Depends(get_deck_cards_service)):
     """
@@ -71,13 +181,60 @@ async def remove_card_from_deck(deck_id: UUID, card_id: UUID, deck_cards_service
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
 
-@router.get("/decks/{deck_id}/cards", response_model=List[DeckCard])
-async def get_deck_cards(deck_id: UUID, deck_cards_service: DeckCardsService = Depends(get_deck_cards_service)):
+@router.put("/decks/{deck_id}/cards/bulk", response_model=BulkResult)
+async def set_deck_cards(deck_id: UUID, cards: List[Dict[str, Any]], deck_cards_service: DeckCardsService = Depends(get_deck_cards_service)):
+    """
+    Endpoint to set the quantity of many cards (card_id, quantity) in a deck in one transaction.
+    """
+    try:
+        return await deck_cards_service.set_cards_in_deck(deck_id, cards)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
+
+@router.get("/decks/{deck_id}/cards", response_model=Union[List[DeckCardDetail], List[DeckCard]])
+async def get_deck_cards(
+    deck_id: UUID,
+    request: Request,
+    expand: Optional[str] = Query(None, pattern="^card$"),
+    deck_cards_service: DeckCardsService = Depends(get_deck_cards_service)
+):
     """
-    Endpoint to retrieve all cards in a specified deck.
+    Endpoint to retrieve all cards in a specified deck. With `expand=card` each entry
+    includes the full card, so rendering a deck takes one request instead of one per card.
+    Responses carry an ETag; a conditional request for an unchanged deck gets a 304.
     """
+    expand_cards = expand == "card"
     try:
-        return await deck_cards_service.get_cards_in_deck(deck_id)
+        async with deck_cards_service.pinned_reads():
+            version = await deck_cards_service.get_cards_version(deck_id, expand_cards=expand_cards)
+            if version is not None:
+                updated_at, cards = version
+                version = version_of(updated_at, deck_id, cards, expand_cards)
+                if not_modified(request, version):
+                    return not_modified_response(version, "deck")
+            deck_cards = await deck_cards_service.get_cards_in_deck(deck_id, expand_cards=expand_cards)
+        response = FastJSONResponse(dump_json(List[DeckCardDetail] if expand_cards else List[DeckCard], deck_cards))
+        return with_cache_headers(response, version, "deck") if version is not None else response
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
+
+@router.get("/decks/{deck_id}/suggestions", response_model=List[CardSuggestion])
+async def get_deck_suggestions(
+    deck_id: UUID,
+    limit: int = Query(20, ge=1, le=100),
+    deck_cards_service: DeckCardsService = Depends(get_deck_cards_service),
+    card_interaction_service: CardIntereactionService = Depends(get_card_interaction_service)
+):
+    """
+    Endpoint to suggest cards for a deck, ranked by how many of its cards they interact with.
+    """
+    try:
+        deck_cards = await deck_cards_service.get_cards_in_deck(deck_id)
+        return await card_interaction_service.suggest_cards(deck_cards, limit=limit)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
 
@@ -0,0 +1,40 @@
+# app/api/v1/endpoints/InternalController.py
+from fastapi import APIRouter, Query
+from fastapi.responses import PlainTextResponse
+from app.core import config
+from app.core.instrumentation import render_prometheus
+from app.data.BaseRepository import BaseRepository
+from app.core.pool import pool_metrics
+from app.data.DatabaseRouter import DatabaseRouter
+from app.data.InstrumentedDatabase import InstrumentedDatabase
+from app.data.StatementCache import statement_cache
+
+router = APIRouter()
+
+@router.get("/internal/cache")
+async def get_cache_stats():
+    """
+    Endpoint to report the read cache hit/miss/eviction counters, used to size the cache.
+    """
+    if BaseRepository.cache is None:
+        return {"backend": None}
+    return BaseRepository.cache.stats()
+
+@router.get("/internal/metrics")
+async def get_metrics(format: str = Query("json", pattern="^(json|prometheus)$")):
+    """
+    Endpoint to report connection pool saturation (in use, idle, waiting, acquire wait time and timeouts),
+    to tell queueing on the pool apart from slow queries, and how reads were routed between primary and replicas.
+    With `format=prometheus` it returns the per-route latency and SQL histograms in Prometheus text format.
+    """
+    if format == "prometheus":
+        return PlainTextResponse(render_prometheus(), media_type="text/plain; version=0.0.4")
+    metrics = {"pools": [metrics.snapshot() for metrics in pool_metrics.values()], "statements": statement_cache.stats()}
+    database = BaseRepository.database
+    if isinstance(database, InstrumentedDatabase):
+        database = database.database
+    if isinstance(database, DatabaseRouter):
+        metrics["routing"] = database.stats()
+    if config.card_catalogue is not None:
+        metrics["catalogue"] = {"cards": len(config.card_catalogue), "bytes": config.card_catalogue.nbytes}
+    return metrics
@@ -1,9 +1,12 @@
 # app/api/v1/endpoints/UserController.py
-from fastapi import APIRouter, Depends, HTTPException, status
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import Response
+from typing import List, Optional
 from uuid import UUID
 from app.services.UserService import UserService
 from app.domain.UserModel import User
+from app.domain.BaseModel import Page
+from app.data.BaseRepository import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
 from app.core.config import get_user_service
 from pydantic import BaseModel
 
@@ -19,17 +22,34 @@ class UserUpdateRequest(BaseModel):
     is_active: bool
 
 @router.post("/users/", response_model=User, status_code=status.HTTP_201_CREATED)
-async def create_user(user: User, user_service: UserService = Depends(get_user_service)):
+async def create_user(user: User, return_representation: bool = True, user_service: UserService = Depends(get_user_service)):
     """
-    Endpoint to create a new user.
+    Endpoint to create a new user. With `return_representation=false` only the Location header is returned.
     """
     try:
-        return await user_service.create(user)
+        created = await user_service.create(user, return_representation=return_representation)
+        if not return_representation:
+            return Response(status_code=status.HTTP_201_CREATED, headers={"Location": f"/api/v1/users/{created.id}"})
+        return created
     except ValueError as e:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
 
+@router.get("/users/", response_model=Page[User])
+async def list_users(
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    after: Optional[str] = None,
+    user_service: UserService = Depends(get_user_service)
+):
+    """
+    Endpoint to list users one page at a time. Pass `next_cursor` back as `after` to get the next page.
+    """
+    try:
+        return await user_service.list(limit=limit, after=after)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
 @router.get("/users/{user_id}", response_model=User)
 async def get_user(user_id: UUID, user_service: UserService = Depends(get_user_service)):
     """
@@ -41,12 +61,15 @@ async def get_user(user_id: UUID, user_service: UserService = Depends(get_user_s
     return user
 
 @router.put("/users/{user_id}", response_model=User)
-async def update_user(user_id: UUID, user_data: UserUpdateRequest, user_service: UserService = Depends(get_user_service)):
+async def update_user(user_id: UUID, user_data: UserUpdateRequest, return_representation: bool = True, user_service: UserService = Depends(get_user_service)):
     """
-    Endpoint to update user data.
+    Endpoint to update user data. With `return_representation=false` the response has no body.
     """
     try:
-        return await user_service.update_user(user_id, user_data.dict())
+        updated = await user_service.update_user(user_id, user_data.dict(), return_representation=return_representation)
+        if not return_representation:
+            return Response(status_code=status.HTTP_204_NO_CONTENT)
+        return updated
     except ValueError as e:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     except HTTPException as e:
@@ -55,13 +78,15 @@ async def update_user(user_id: UUID, user_data: UserUpdateRequest, user_service:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
 
 @router.delete("/users/{user_id}", response_model=User)
-async def delete_user(user_id: UUID, user_service: UserService = Depends(get_user_service)):
+async def delete_user(user_id: UUID, return_representation: bool = True, user_service: UserService = Depends(get_user_service)):
     """
-    Endpoint to delete a user by ID.
+    Endpoint to delete a user by ID. With `return_representation=false` the user is not read first and the response has no body.
     """
-    user = await user_service.delete(user_id)
+    user = await user_service.delete(user_id, return_representation=return_representation)
     if not user:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found.")
+    if not return_representation:
+        return Response(status_code=status.HTTP_204_NO_CONTENT)
     return user
 
 @router.get("/users/email/{email}", response_model=User)
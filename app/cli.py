@@ -0,0 +1,72 @@
+# app/cli.py
+# Comandos de manutenção executados fora do servidor, por exemplo:
+#   python -m app.cli rebuild-deck-summaries
+#   python -m app.cli rescore-synergy --card-id <uuid> --card-id <uuid> --resume
+#   python -m app.cli rebuild-price-rollups
+import argparse
+import asyncio
+from app.core import config
+from app.data.BaseRepository import BaseRepository, EXPORT_CHUNK_SIZE, GET_MANY_CHUNK_SIZE
+from app.data.DeckRepository import DeckSummaryRepository, SynergyScoresRepository
+from app.data.CardsRepository import CardsRepository, PriceHistoryRepository
+from app.services.CardService import PriceService
+from app.services.DeckService import DeckSummaryService
+from app.services.SynergyRescoreJob import SynergyRescoreJob, RESCORE_CHUNK_SIZE
+
+async def rebuild_deck_summaries(args: argparse.Namespace):
+    """
+    Recompute every Deck_Summary row from the source tables to repair drift.
+    """
+    rebuilt = await DeckSummaryService(DeckSummaryRepository()).rebuild_all(chunk_size=args.chunk_size)
+    print(f"Rebuilt {rebuilt} deck summaries.")
+
+async def rescore_synergy(args: argparse.Namespace):
+    """
+    Recompute Synergy_Scores for the decks holding the given cards, or for every deck.
+    """
+    job = SynergyRescoreJob(SynergyScoresRepository(), chunk_size=args.chunk_size, workers=args.workers, checkpoint_path=args.checkpoint)
+    await job.run(card_ids=args.card_id, resume=args.resume)
+
+async def rebuild_price_rollups(args: argparse.Namespace):
+    """
+    Recompute Latest_Prices and Price_Rollups for every card, e.g. after creating the tables.
+    """
+    card_ids = [row["id"] async for row in CardsRepository().iterate_names()]
+    price_service = PriceService(PriceHistoryRepository())
+    for start in range(0, len(card_ids), args.chunk_size):
+        await price_service.rebuild_price_rollups(card_ids[start:start + args.chunk_size])
+    print(f"Rebuilt price rollups for {len(card_ids)} cards.")
+
+async def run(args: argparse.Namespace):
+    database = config.create_database()
+    BaseRepository.database = database
+    await database.connect()
+    try:
+        await args.command(args)
+    finally:
+        await database.disconnect()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m app.cli", description="Backend-BD2 maintenance commands.")
+    subparsers = parser.add_subparsers(required=True)
+
+    rebuild = subparsers.add_parser("rebuild-deck-summaries", help="Recompute the materialised deck summaries.")
+    rebuild.add_argument("--chunk-size", type=int, default=EXPORT_CHUNK_SIZE, help="Decks rebuilt per batch.")
+    rebuild.set_defaults(command=rebuild_deck_summaries)
+
+    rescore = subparsers.add_parser("rescore-synergy", help="Recompute the synergy scores of the decks affected by changed cards.")
+    rescore.add_argument("--card-id", action="append", help="Changed card; repeat for several. Omit to rescore every deck.")
+    rescore.add_argument("--chunk-size", type=int, default=RESCORE_CHUNK_SIZE, help="Decks loaded and written per batch.")
+    rescore.add_argument("--workers", type=int, default=None, help="Scoring processes (default: CPU count, 0 scores in-process).")
+    rescore.add_argument("--checkpoint", default=".synergy-rescore.json", help="File recording the last deck rescored.")
+    rescore.add_argument("--resume", action="store_true", help="Continue from the checkpoint of an interrupted run.")
+    rescore.set_defaults(command=rescore_synergy)
+
+    rollups = subparsers.add_parser("rebuild-price-rollups", help="Recompute the latest prices and OHLC candles of every card.")
+    rollups.add_argument("--chunk-size", type=int, default=GET_MANY_CHUNK_SIZE, help="Cards recomputed per batch.")
+    rollups.set_defaults(command=rebuild_price_rollups)
+
+    asyncio.run(run(parser.parse_args(argv)))
+
+if __name__ == "__main__":
+    main()
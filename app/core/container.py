@@ -0,0 +1,50 @@
+# app/core/container.py
+from typing import Optional
+from app.services.UserService import UserService
+from app.data.UserRepository import UserRepository
+from app.services.CardService import CardsService, CardsThemeService, CardIntereactionService, PriceService
+from app.data.CardsRepository import CardsRepository, CardsThemeRepository, CardIntereactionRepository, PriceHistoryRepository
+from app.services.DeckService import DeckService, DeckCardsService, SynergyScoresService, DeckSummaryService
+from app.data.DeckRepository import DecksRepository, DeckCardsRepository, SynergyScoresRepository, DeckSummaryRepository
+from app.data.SearchIndex import TrigramIndex
+from app.data.InteractionGraph import InteractionGraph
+from app.data.CardCatalogue import CardCatalogue
+from app.data.BatchLoader import BatchLoader
+
+class Container:
+    """
+    Application-scoped repositories and services, built once in the startup hook and shared by
+    every request. They hold no per-request state; request-scoped pieces (BatchLoader) are
+    created by the dependencies that need them.
+    """
+    def __init__(
+        self, search_index: Optional[TrigramIndex] = None, interaction_graph: Optional[InteractionGraph] = None,
+        catalogue: Optional[CardCatalogue] = None
+    ):
+        # Repositórios
+        self.user_repository = UserRepository()
+        self.cards_repository = CardsRepository()
+        self.cards_theme_repository = CardsThemeRepository()
+        self.card_interaction_repository = CardIntereactionRepository()
+        self.price_history_repository = PriceHistoryRepository()
+        self.decks_repository = DecksRepository()
+        self.deck_cards_repository = DeckCardsRepository()
+        self.deck_summary_repository = DeckSummaryRepository()
+        self.synergy_scores_repository = SynergyScoresRepository()
+
+        # Serviços
+        self.user_service = UserService(self.user_repository)
+        self.cards_service = CardsService(self.cards_repository, search_index, catalogue=catalogue, interaction_graph=interaction_graph)
+        self.cards_theme_service = CardsThemeService(self.cards_theme_repository)
+        self.card_interaction_service = CardIntereactionService(self.card_interaction_repository, interaction_graph)
+        self.price_service = PriceService(self.price_history_repository, self.deck_summary_repository)
+        self.deck_cards_service = DeckCardsService(self.deck_cards_repository, self.deck_summary_repository)
+        self.deck_service = DeckService(self.decks_repository, self.deck_cards_service)
+        self.deck_summary_service = DeckSummaryService(self.deck_summary_repository)
+        self.synergy_scores_service = SynergyScoresService(self.synergy_scores_repository)
+
+    def request_cards_service(self) -> CardsService:
+        """
+        CardsService bound to a new BatchLoader, which coalesces and memoises the get() calls of one request.
+        """
+        return self.cards_service.with_loader(BatchLoader(self.cards_repository.get_many))
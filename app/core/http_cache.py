@@ -0,0 +1,84 @@
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any, Dict, NamedTuple, Optional
+from fastapi import Request, Response, status
+
+# Cache-Control por tipo de recurso. Cartas e preços mudam pouco e podem ser servidos do cache por um
+# tempo; decks e listagens são revalidados a cada requisição, o que com ETag custa só um 304.
+CACHE_CONTROL = {
+    "card": "public, max-age=60",
+    "card_list": "public, no-cache",
+    "price_history": "public, max-age=300",
+    "deck": "private, no-cache",
+}
+
+class Version(NamedTuple):
+    """
+    Validators of one representation: a weak ETag and, when known, the last modification time.
+    """
+    etag: str
+    last_modified: Optional[datetime] = None
+
+def version_of(last_modified: Optional[datetime], *parts: Any) -> Version:
+    """
+    Version of a resource from its `updated_at` and whatever else identifies the representation
+    (its id, row count, query variant). Weak, since equal versions may not serialise byte for byte.
+    """
+    digest = hashlib.blake2b(":".join(str(part) for part in (last_modified, *parts)).encode(), digest_size=12).hexdigest()
+    return Version(f'W/"{digest}"', last_modified)
+
+def body_version(body: bytes) -> Version:
+    """
+    Version of a rendered body, for responses with no cheaper version lookup (e.g. list pages).
+    """
+    return Version(f'W/"{hashlib.blake2b(body, digest_size=12).hexdigest()}"')
+
+def is_conditional(request: Request) -> bool:
+    return "if-none-match" in request.headers or "if-modified-since" in request.headers
+
+def not_modified(request: Request, version: Version) -> bool:
+    """
+    Evaluate If-None-Match (weak comparison) or, when it is absent, If-Modified-Since against `version`.
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+        return "*" in tags or version.etag.removeprefix("W/") in tags
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and version.last_modified is not None:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if since.tzinfo is None:
+            return False
+        return _utc(version.last_modified).replace(microsecond=0) <= since
+    return False
+
+def cache_headers(version: Version, policy: str) -> Dict[str, str]:
+    headers = {"ETag": version.etag, "Cache-Control": CACHE_CONTROL[policy]}
+    if version.last_modified is not None:
+        headers["Last-Modified"] = format_datetime(_utc(version.last_modified), usegmt=True)
+    return headers
+
+def not_modified_response(version: Version, policy: str) -> Response:
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=cache_headers(version, policy))
+
+def with_cache_headers(response: Response, version: Version, policy: str) -> Response:
+    response.headers.update(cache_headers(version, policy))
+    return response
+
+def conditional_body(request: Request, response: Response, policy: str) -> Response:
+    """
+    Tag an already rendered response with a hash of its body, answering 304 if the client has it.
+    Saves the transfer, not the query or the serialisation.
+    """
+    version = body_version(response.body)
+    if not_modified(request, version):
+        return not_modified_response(version, policy)
+    return with_cache_headers(response, version, policy)
+
+def _utc(value: datetime) -> datetime:
+    # TIMESTAMP volta do MySQL sem fuso, no fuso da sessão, que nos containers é UTC
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value.astimezone(timezone.utc)
@@ -0,0 +1,106 @@
+import bisect
+import json
+import logging
+import time
+from typing import Dict, List, Sequence, Tuple
+from fastapi import Request, Response
+from app.core.pool import pool_metrics
+from app.data.InstrumentedDatabase import QueryStats, current_query_stats
+from app.data.StatementCache import statement_cache
+
+logger = logging.getLogger("app.requests")
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200)
+
+class Histogram:
+    """
+    Prometheus-style cumulative histogram with one series per (method, route).
+    """
+    def __init__(self, name: str, help: str, buckets: Sequence[float]):
+        self.name = name
+        self.help = help
+        self.buckets = tuple(buckets)
+        self._series: Dict[Tuple[str, str], List[float]] = {}  # contagem por bucket (+Inf no fim), soma, total
+
+    def observe(self, method: str, route: str, value: float):
+        series = self._series.get((method, route))
+        if series is None:
+            series = self._series[(method, route)] = [0.0] * (len(self.buckets) + 3)
+        series[bisect.bisect_left(self.buckets, value)] += 1
+        series[-2] += value
+        series[-1] += 1
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for (method, route), series in sorted(self._series.items()):
+            labels = f'method="{method}",route="{route}"'
+            cumulative = 0.0
+            for bound, count in zip(self.buckets + ("+Inf",), series):
+                cumulative += count
+                lines.append(f'{self.name}_bucket{{{labels},le="{bound}"}} {cumulative:g}')
+            lines.append(f"{self.name}_sum{{{labels}}} {series[-2]:.6f}")
+            lines.append(f"{self.name}_count{{{labels}}} {series[-1]:g}")
+        return lines
+
+request_duration = Histogram("http_request_duration_seconds", "Request latency by route.", LATENCY_BUCKETS)
+request_db_duration = Histogram("http_request_db_duration_seconds", "Time spent in SQL statements per request, by route.", LATENCY_BUCKETS)
+request_db_queries = Histogram("http_request_db_queries", "SQL statements issued per request, by route.", QUERY_COUNT_BUCKETS)
+histograms = [request_duration, request_db_duration, request_db_queries]
+
+async def instrument_requests(request: Request, call_next) -> Response:
+    """
+    HTTP middleware: collect the request's SQL statements, report them in a `Server-Timing` header
+    and a structured log line, and feed the per-route histograms.
+    """
+    stats = QueryStats()
+    token = current_query_stats.set(stats)
+    started = time.perf_counter()
+    try:
+        response = await call_next(request)
+    finally:
+        current_query_stats.reset(token)
+    elapsed = time.perf_counter() - started
+
+    # Rota como template (/cards/{card_id}) para não explodir a cardinalidade; 404 vira "unmatched"
+    route = getattr(request.scope.get("route"), "path", "unmatched")
+    method = request.method
+    request_duration.observe(method, route, elapsed)
+    request_db_duration.observe(method, route, stats.total_time)
+    request_db_queries.observe(method, route, stats.count)
+
+    response.headers["Server-Timing"] = (
+        f'db;dur={1000 * stats.total_time:.2f};desc="{stats.count} queries", total;dur={1000 * elapsed:.2f}'
+    )
+    logger.info(json.dumps({
+        "event": "request",
+        "method": method,
+        "route": route,
+        "status": response.status_code,
+        "duration_ms": round(1000 * elapsed, 3),
+        "db_queries": stats.count,
+        "db_ms": round(1000 * stats.total_time, 3),
+        "slowest": [{"ms": round(1000 * duration, 3), "sql": sql} for duration, sql in stats.slowest],
+    }))
+    return response
+
+def render_prometheus() -> str:
+    """
+    Render the request histograms and the connection pool gauges in Prometheus text format.
+    """
+    lines = []
+    for histogram in histograms:
+        lines.extend(histogram.render())
+    gauges = [("db_pool_in_use", "in_use", "Connections checked out."), ("db_pool_idle", "idle", "Idle connections."),
+              ("db_pool_waiting", "waiting", "Callers waiting for a connection.")]
+    snapshots = [metrics.snapshot() for metrics in pool_metrics.values()]
+    for name, key, help in gauges:
+        lines.extend([f"# HELP {name} {help}", f"# TYPE {name} gauge"])
+        lines.extend(f'{name}{{pool="{snapshot["name"]}"}} {snapshot[key]}' for snapshot in snapshots)
+    lines.extend(["# HELP db_pool_acquire_timeouts_total Acquisitions that timed out.", "# TYPE db_pool_acquire_timeouts_total counter"])
+    lines.extend(f'db_pool_acquire_timeouts_total{{pool="{snapshot["name"]}"}} {snapshot["acquire_timeouts"]}' for snapshot in snapshots)
+    statements = statement_cache.stats()
+    for name, key, help in [("sql_statement_cache_hits_total", "hits", "Repository statements served from the statement cache."),
+                            ("sql_statement_cache_misses_total", "misses", "Repository statements built because they were not cached.")]:
+        lines.extend([f"# HELP {name} {help}", f"# TYPE {name} counter", f"{name} {statements[key]}"])
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,72 @@
+import asyncio
+import time
+from typing import Any, Dict, Optional
+from databases import Database
+
+class PoolMetrics:
+    """
+    Live counters of one connection pool: connections in use and idle, callers waiting for a
+    connection, time spent waiting to acquire one and acquisitions that timed out.
+    """
+    def __init__(self, name: str):
+        self.name = name
+        self.acquisitions = 0
+        self.acquire_timeouts = 0
+        self.waiting = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self._pool: Any = None
+
+    def attach(self, database: Database, acquire_timeout: Optional[float] = None):
+        """
+        Start measuring the pool of a connected database, bounding each acquisition by
+        `acquire_timeout` seconds. Backends without a pool (e.g. SQLite) are left untouched.
+        """
+        pool = getattr(database._backend, "_pool", None)
+        if pool is None:
+            return
+        self._pool = pool
+        acquire = pool.acquire
+
+        async def timed_acquire():
+            started = time.monotonic()
+            self.waiting += 1
+            try:
+                return await asyncio.wait_for(acquire(), acquire_timeout)
+            except asyncio.TimeoutError:
+                self.acquire_timeouts += 1
+                raise
+            finally:
+                self.waiting -= 1
+                waited = time.monotonic() - started
+                self.acquisitions += 1
+                self.total_wait += waited
+                self.max_wait = max(self.max_wait, waited)
+
+        # O MySQLConnection do `databases` só faz `await pool.acquire()`, então basta trocar o método da instância
+        pool.acquire = timed_acquire
+
+    def snapshot(self) -> Dict[str, Any]:
+        pool = self._pool
+        size = pool.size if pool is not None else 0
+        idle = pool.freesize if pool is not None else 0
+        return {
+            "name": self.name,
+            "min_size": pool.minsize if pool is not None else None,
+            "max_size": pool.maxsize if pool is not None else None,
+            "size": size,
+            "in_use": size - idle,
+            "idle": idle,
+            "waiting": self.waiting,
+            "acquisitions": self.acquisitions,
+            "acquire_timeouts": self.acquire_timeouts,
+            "avg_wait_ms": round(1000 * self.total_wait / self.acquisitions, 3) if self.acquisitions else 0.0,
+            "max_wait_ms": round(1000 * self.max_wait, 3),
+        }
+
+# Métricas de todos os pools do processo, expostas em /internal/metrics
+pool_metrics: Dict[str, PoolMetrics] = {}
+
+def register_pool(name: str) -> PoolMetrics:
+    metrics = pool_metrics[name] = PoolMetrics(name)
+    return metrics
@@ -0,0 +1,40 @@
+from decimal import Decimal
+from functools import lru_cache
+from typing import Any
+import orjson
+from fastapi.responses import Response
+from pydantic import TypeAdapter
+from app.domain.BaseModel import Page
+
+def _orjson_default(value: Any) -> Any:
+    # Decimal vira string, como no JSON gerado pelo Pydantic; data, datetime e UUID o orjson já conhece
+    if isinstance(value, Decimal):
+        return str(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+class FastJSONResponse(Response):
+    """
+    JSON response rendered by orjson, for content that needs no response_model validation: plain
+    rows (`raw=True` repository reads) or bytes already encoded by `dump_json`.
+    """
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, bytes):
+            return content
+        if isinstance(content, Page):
+            content = {"items": content.items, "next_cursor": content.next_cursor}
+        return orjson.dumps(content, default=_orjson_default, option=orjson.OPT_NON_STR_KEYS)
+
+@lru_cache(maxsize=None)
+def type_adapter(annotation: Any) -> TypeAdapter:
+    """
+    TypeAdapter built once per response type, instead of the per-call validation FastAPI does for `response_model`.
+    """
+    return TypeAdapter(annotation)
+
+def dump_json(annotation: Any, value: Any) -> bytes:
+    """
+    Serialise already-validated models with pydantic-core, by alias, without validating them again.
+    """
+    return type_adapter(annotation).dump_json(value, by_alias=True)
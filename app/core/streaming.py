@@ -0,0 +1,33 @@
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, AsyncIterable, AsyncIterator, Mapping
+from uuid import UUID
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+NDJSON_ROWS_PER_CHUNK = 200
+
+def _json_default(value: Any) -> Any:
+    """
+    Convert the column types returned by MySQL that `json` does not know about.
+    """
+    if isinstance(value, Decimal):
+        return str(value)
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    if isinstance(value, UUID):
+        return str(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+async def ndjson_stream(rows: AsyncIterable[Mapping[str, Any]], rows_per_chunk: int = NDJSON_ROWS_PER_CHUNK) -> AsyncIterator[bytes]:
+    """
+    Encode rows as newline-delimited JSON, flushing a chunk every `rows_per_chunk` rows.
+    """
+    buffer = []
+    async for row in rows:
+        buffer.append(json.dumps(dict(row), default=_json_default))
+        if len(buffer) >= rows_per_chunk:
+            yield ("\n".join(buffer) + "\n").encode()
+            buffer = []
+    if buffer:
+        yield ("\n".join(buffer) + "\n").encode()
@@ -1,41 +1,338 @@
-from typing import TypeVar, Generic, List, Optional, Type
-from app.domain.BaseModel import BaseModel
+import base64
+import json
+from uuid import uuid4
+from typing import TypeVar, Generic, List, Optional, Type, Tuple, Dict, Any, AsyncIterator, AsyncContextManager, Mapping, Callable, Awaitable, Union
+from app.domain.BaseModel import BaseModel, Page, BulkResult, BulkRowError
+from app.data.Cache import Cache
+from app.data.StatementCache import statement_cache
+from app.data.UnitOfWork import UnitOfWork, after_commit, current_unit_of_work, unit_of_work
 from databases import Database
 
 T = TypeVar('T', bound=BaseModel)
 
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+EXPORT_CHUNK_SIZE = 1000
+BULK_CHUNK_SIZE = 500
+GET_MANY_CHUNK_SIZE = 500
+RETURNING_DIALECTS = {"postgresql", "sqlite"}  # MySQL não suporta INSERT/UPDATE ... RETURNING
+
+def encode_cursor(key_values: List[Any]) -> str:
+    """
+    Encode the key of the last row of a page as an opaque cursor.
+    """
+    payload = json.dumps([str(value) for value in key_values]).encode()
+    return base64.urlsafe_b64encode(payload).decode().rstrip("=")
+
+def decode_cursor(cursor: str, size: int) -> List[str]:
+    """
+    Decode a cursor produced by `encode_cursor`, raising ValueError if it is malformed.
+    """
+    try:
+        payload = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        key_values = json.loads(payload)
+    except (ValueError, TypeError):
+        raise ValueError("Invalid pagination cursor.")
+    if not isinstance(key_values, list) or len(key_values) != size:
+        raise ValueError("Invalid pagination cursor.")
+    return key_values
+
 class BaseRepository(Generic[T]):
     database: Database  # Banco de dados padrão compartilhado para todas as instâncias
+    key_columns: Tuple[str, ...] = ("id",)  # Chave primária usada na paginação por keyset
+    cache: Optional[Cache] = None  # Cache compartilhado, configurado em app.main
+    cache_reads: bool = False  # Repositórios de leitura intensa ativam o cache de leitura
+    generated_columns: Tuple[str, ...] = ()  # Colunas mantidas pelo banco (ex.: updated_at), nunca gravadas pela aplicação
+
 
     def __init__(self, table_name: str, model: Type[T]):
         self.table_name = table_name
         self.model = model
+        # (nome serializado, valor padrão) de cada campo, na ordem do modelo, para o caminho `raw`
+        self._response_fields = tuple((field.alias or name, field.default) for name, field in model.model_fields.items())
 
-    async def create(self, obj: T) -> T:
-        query = f"INSERT INTO {self.table_name} ({', '.join(obj.dict().keys())}) VALUES ({', '.join([':' + key for key in obj.dict().keys()])})"
-        values = obj.dict()
-        insert_id = await self.database.execute(query=query, values=values)
-        return await self.get(insert_id)
+    async def create(self, obj: T, return_representation: bool = True) -> T:
+        """
+        Insert a row without a follow-up SELECT. UUID keys are generated here because
+        `DEFAULT (UUID())` leaves the driver with no usable lastrowid. With RETURNING
+        support the stored row (including server defaults) is returned; otherwise the
+        model is built from the inserted values.
+        """
+        values = self._writable(obj.dict())
+        if self.key_columns == ("id",) and values.get("id") is None:
+            values["id"] = uuid4()
+        columns = tuple(values)
+        created = obj.model_copy(update={"id": values["id"]}) if "id" in values else obj
+        if return_representation and self._supports_returning():
+            query = statement_cache.get((self.table_name, "insert_returning", columns), lambda: self._insert_sql(columns) + " RETURNING *")
+            row = await self.database.fetch_one(query=query, values=values)
+            created = self.model(**row)
+        else:
+            query = statement_cache.get((self.table_name, "insert", columns), lambda: self._insert_sql(columns))
+            await self.database.execute(query=query, values=values)
+        await self._invalidate_rows([values])
+        return created
 
     async def get(self, obj_id: int) -> Optional[T]:
-        query = f"SELECT * FROM {self.table_name} WHERE id = :id"
-        row = await self.database.fetch_one(query=query, values={"id": obj_id})
-        return self.model(**row) if row else None
-
-    async def list(self) -> List[T]:
-        query = f"SELECT * FROM {self.table_name}"
-        rows = await self.database.fetch_all(query=query)
-        return [self.model(**row) for row in rows]
-
-    async def update(self, obj_id: int, obj: T) -> Optional[T]:
-        query = f"UPDATE {self.table_name} SET {', '.join([f'{key} = :{key}' for key in obj.dict().keys()])} WHERE id = :id"
-        values = {**obj.dict(), "id": obj_id}
-        await self.database.execute(query=query, values=values)
-        return await self.get(obj_id)
+        async def load():
+            query = statement_cache.get((self.table_name, "get"), lambda: f"SELECT * FROM {self.table_name} WHERE id = :id")
+            row = await self.database.fetch_one(query=query, values={"id": obj_id})
+            return self.model(**row) if row else None
+        return await self._read_through(self._cache_key("get", obj_id), load)
+
+    async def get_many(self, obj_ids: List[Any], chunk_size: int = GET_MANY_CHUNK_SIZE) -> List[T]:
+        """
+        Retrieve many rows by ID with `WHERE id IN (...)` queries of at most `chunk_size` IDs,
+        serving cached rows first. Missing IDs are skipped; order follows `obj_ids`.
+        """
+        unique_ids = list(dict.fromkeys(str(obj_id) for obj_id in obj_ids))
+        found: Dict[str, T] = {}
+        caching = self._reads_cached()
+        if caching:
+            for obj_id in unique_ids:
+                obj = await self.cache.get(self._cache_key("get", obj_id))
+                if obj is not None:
+                    found[obj_id] = obj
+        missing = [obj_id for obj_id in unique_ids if obj_id not in found]
+        for start in range(0, len(missing), chunk_size):
+            chunk = missing[start:start + chunk_size]
+            values = {f"id_{i}": obj_id for i, obj_id in enumerate(chunk)}
+            query = f"SELECT * FROM {self.table_name} WHERE id IN ({', '.join(':' + name for name in values)})"
+            for row in await self.database.fetch_all(query=query, values=values):
+                obj = self.model(**row)
+                found[str(obj.id)] = obj
+                if caching:
+                    await self.cache.set(self._cache_key("get", obj.id), obj)
+        return [found[obj_id] for obj_id in unique_ids if obj_id in found]
+
+    async def list(self, limit: int = DEFAULT_PAGE_SIZE, after: Optional[str] = None, raw: bool = False) -> Page[T]:
+        """
+        List one page of rows ordered by primary key, starting after the given cursor.
+        With `raw=True` the items are plain dicts (see `to_response_row`) instead of models.
+        """
+        return await self._list_page([], {}, limit, after, raw=raw)
+
+    async def _list_page(self, conditions: List[str], values: Dict[str, Any], limit: int, after: Optional[str], raw: bool = False) -> Page[T]:
+        """
+        Keyset-paginate the rows matching all `conditions` (SQL predicates bound by `values`).
+        """
+        limit = max(1, min(limit, MAX_PAGE_SIZE))
+        keyset, keyset_values = self._keyset_predicate(after)
+        conditions = conditions + [keyset] if keyset else conditions
+        where = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+        order_by = ", ".join(self.key_columns)
+        # Busca uma linha a mais para saber se existe próxima página
+        query = f"SELECT * FROM {self.table_name}{where} ORDER BY {order_by} LIMIT :limit"
+        rows = await self.database.fetch_all(query=query, values={**values, **keyset_values, "limit": limit + 1})
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor([rows[-1][column] for column in self.key_columns])
+        if raw:
+            return Page.model_construct(items=[self.to_response_row(row) for row in rows], next_cursor=next_cursor)
+        # Os itens já foram validados um a um; a página não precisa validá-los de novo
+        return Page[self.model].model_construct(items=[self.model(**row) for row in rows], next_cursor=next_cursor)
 
-    async def delete(self, obj_id: int) -> Optional[T]:
-        obj = await self.get(obj_id)
+    async def iterate(self, chunk_size: int = EXPORT_CHUNK_SIZE, columns: Optional[Tuple[str, ...]] = None) -> AsyncIterator[Mapping[str, Any]]:
+        """
+        Stream every row of the table as raw mappings, in primary key order.
+        Rows are read in keyset chunks so neither the driver nor the caller ever holds the whole table.
+        `columns` narrows the select list and must include the key columns.
+        """
+        after = None
+        order_by = ", ".join(self.key_columns)
+        select = ", ".join(columns) if columns else "*"
+        while True:
+            where, values = self._keyset_clause(after)
+            query = f"SELECT {select} FROM {self.table_name}{where} ORDER BY {order_by} LIMIT :limit"
+            last_row = None
+            count = 0
+            async for row in self.database.iterate(query=query, values={**values, "limit": chunk_size}):
+                last_row = row
+                count += 1
+                yield row
+            if count < chunk_size:
+                return
+            after = encode_cursor([last_row[column] for column in self.key_columns])
+
+    async def update(self, obj_id: int, obj: T, return_representation: bool = True) -> Union[Optional[T], bool]:
+        """
+        Update a row in a single statement. The returned model is the stored row when the
+        driver supports RETURNING, otherwise it is built from the values written; it is None
+        when there is no row with this id. With `return_representation=False` the result
+        only says whether the row exists.
+        """
+        values = self._writable(obj.dict())
+        columns = tuple(values)
+        values["id"] = obj_id
+        if return_representation and self._supports_returning():
+            query = statement_cache.get((self.table_name, "update_returning", columns), lambda: self._update_sql(columns) + " RETURNING *")
+            row = await self.database.fetch_one(query=query, values=values)
+            if row is None:
+                return None
+            updated = self.model(**row)
+        else:
+            query = statement_cache.get((self.table_name, "update", columns), lambda: self._update_sql(columns))
+            affected = await self.database.execute(query=query, values=values)
+            # Sem CLIENT.FOUND_ROWS o MySQL conta só linhas alteradas: 0 também é uma linha que já tinha esses valores
+            if not affected and not await self._exists(obj_id):
+                return None if return_representation else False
+            updated = obj.model_copy(update={"id": obj_id}) if return_representation else True
+        await self._invalidate_rows([values])
+        return updated
+
+    async def delete(self, obj_id: int, return_representation: bool = True) -> Union[Optional[T], bool]:
+        """
+        Delete a row and return it. With `return_representation=False` the row is not read
+        first and the result only says whether a row was deleted.
+        """
+        query = statement_cache.get((self.table_name, "delete"), lambda: f"DELETE FROM {self.table_name} WHERE id = :id")
+        if not return_representation:
+            deleted = await self.database.execute(query=query, values={"id": obj_id})
+            await self._invalidate_rows([{"id": obj_id}])
+            return bool(deleted)
+        if self._supports_returning():
+            row = await self.database.fetch_one(query=query + " RETURNING *", values={"id": obj_id})
+            obj = self.model(**row) if row else None
+        else:
+            obj = await self.get(obj_id)
+            if obj:
+                await self.database.execute(query=query, values={"id": obj_id})
         if obj:
-            query = f"DELETE FROM {self.table_name} WHERE id = :id"
-            await self.database.execute(query=query, values={"id": obj_id})
+            await self._invalidate_rows([{**obj.dict(), "id": obj_id}])
         return obj
+
+    async def bulk_upsert(self, rows: List[Dict[str, Any]], chunk_size: int = BULK_CHUNK_SIZE) -> BulkResult:
+        """
+        Insert or update many rows in one transaction using multi-row
+        `INSERT ... ON DUPLICATE KEY UPDATE` statements. A chunk that fails is retried
+        row by row so that only the offending rows are reported as failed.
+        """
+        result = BulkResult()
+        # Linhas com o mesmo conjunto de colunas compartilham o mesmo comando
+        groups: Dict[Tuple[str, ...], List[Tuple[int, Dict[str, Any]]]] = {}
+        for index, row in enumerate(self._writable(row) for row in rows):
+            groups.setdefault(tuple(row.keys()), []).append((index, row))
+
+        async with self._atomic():
+            for columns, indexed_rows in groups.items():
+                for start in range(0, len(indexed_rows), chunk_size):
+                    chunk = indexed_rows[start:start + chunk_size]
+                    try:
+                        async with self.database.transaction():
+                            await self._execute_upsert(columns, [row for _, row in chunk])
+                        result.processed += len(chunk)
+                    except Exception:
+                        await self._upsert_rows_individually(columns, chunk, result)
+        await self._invalidate_rows(rows)
+        return result
+
+    async def _upsert_rows_individually(self, columns: Tuple[str, ...], chunk: List[Tuple[int, Dict[str, Any]]], result: BulkResult):
+        """
+        Retry a failed chunk one row at a time, each inside its own savepoint.
+        """
+        for index, row in chunk:
+            try:
+                async with self.database.transaction():
+                    await self._execute_upsert(columns, [row])
+                result.processed += 1
+            except Exception as e:
+                result.failed.append(BulkRowError(index=index, error=str(e)))
+
+    async def _execute_upsert(self, columns: Tuple[str, ...], rows: List[Dict[str, Any]]):
+        # Um comando por (colunas, número de linhas): os lotes cheios do bulk reutilizam sempre o mesmo
+        query = statement_cache.get((self.table_name, "upsert", columns, len(rows)), lambda: self._upsert_sql(columns, len(rows)))
+        values = {f"{column}_{i}": row[column] for i, row in enumerate(rows) for column in columns}
+        await self.database.execute(query=query, values=values)
+
+    def _insert_sql(self, columns: Tuple[str, ...]) -> str:
+        return f"INSERT INTO {self.table_name} ({', '.join(columns)}) VALUES ({', '.join(':' + column for column in columns)})"
+
+    def _update_sql(self, columns: Tuple[str, ...]) -> str:
+        return f"UPDATE {self.table_name} SET {', '.join(f'{column} = :{column}' for column in columns)} WHERE id = :id"
+
+    def _upsert_sql(self, columns: Tuple[str, ...], row_count: int) -> str:
+        placeholders = ["(" + ", ".join(f":{column}_{i}" for column in columns) + ")" for i in range(row_count)]
+        update_columns = [column for column in columns if column not in self.key_columns] or list(self.key_columns[:1])
+        updates = ", ".join(f"{column} = VALUES({column})" for column in update_columns)
+        return f"INSERT INTO {self.table_name} ({', '.join(columns)}) VALUES {', '.join(placeholders)} ON DUPLICATE KEY UPDATE {updates}"
+
+    def to_response_row(self, row: Mapping[str, Any]) -> Dict[str, Any]:
+        """
+        Project a database row onto the model's serialised fields (aliases, model order, defaults for
+        missing columns) without building the model. Used by endpoints that serialise rows directly.
+        """
+        return {key: row[key] if key in row else default for key, default in self._response_fields}
+
+    async def _exists(self, obj_id: Any) -> bool:
+        query = statement_cache.get((self.table_name, "exists"), lambda: f"SELECT 1 FROM {self.table_name} WHERE id = :id")
+        return await self.database.fetch_one(query=query, values={"id": obj_id}) is not None
+
+    def _writable(self, values: Dict[str, Any]) -> Dict[str, Any]:
+        # Gravar updated_at com o valor lido (ex.: um PUT com o corpo do GET) congelaria a versão da linha
+        if not self.generated_columns:
+            return values
+        return {column: value for column, value in values.items() if column not in self.generated_columns}
+
+    def _atomic(self) -> AsyncContextManager[UnitOfWork]:
+        """
+        Transaction for a multi-statement write. Inside a unit of work it joins the unit (one commit
+        for the whole operation, no savepoint); otherwise it opens and commits its own.
+        """
+        return unit_of_work(self.database)
+
+    def _supports_returning(self) -> bool:
+        return self.database.url.dialect in RETURNING_DIALECTS
+
+    def _cache_key(self, *parts: Any) -> str:
+        return ":".join([self.table_name, *[str(part) for part in parts]])
+
+    def _cache_keys_for_row(self, row: Mapping[str, Any]) -> List[str]:
+        """
+        Cache keys made stale by writing `row`. Repositories that cache other reads extend this.
+        """
+        return [self._cache_key("get", row["id"])] if row.get("id") is not None else []
+
+    async def _read_through(self, key: str, load: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Return the cached value for `key`, loading and caching it on a miss. Inside a unit of work
+        the cache is bypassed, so the unit sees its own writes and uncommitted rows are never cached.
+        """
+        if not self._reads_cached():
+            return await load()
+        value = await self.cache.get(key)
+        if value is None:
+            value = await load()
+            if value is not None:
+                await self.cache.set(key, value)
+        return value
+
+    def _reads_cached(self) -> bool:
+        return bool(self.cache_reads and self.cache) and current_unit_of_work.get() is None
+
+    async def _invalidate_rows(self, rows: List[Mapping[str, Any]]):
+        if not (self.cache_reads and self.cache):
+            return
+        keys = {key for row in rows for key in self._cache_keys_for_row(row)}
+        if keys:
+            # Dentro de uma unidade de trabalho só invalida depois do commit
+            await after_commit(lambda: self.cache.delete(*keys))
+
+    def _keyset_predicate(self, after: Optional[str]) -> Tuple[str, Dict[str, Any]]:
+        """
+        Build the predicate that seeks past the row identified by `after`.
+        """
+        if not after:
+            return "", {}
+        key_values = decode_cursor(after, len(self.key_columns))
+        values = {f"after_{i}": value for i, value in enumerate(key_values)}
+        if len(self.key_columns) == 1:
+            return f"{self.key_columns[0]} > :after_0", values
+        # Comparação de tuplas usa o índice composto da chave primária no MySQL 8
+        columns = ", ".join(self.key_columns)
+        params = ", ".join(f":{name}" for name in values)
+        return f"({columns}) > ({params})", values
+
+    def _keyset_clause(self, after: Optional[str]) -> Tuple[str, Dict[str, Any]]:
+        predicate, values = self._keyset_predicate(after)
+        return (f" WHERE {predicate}" if predicate else ""), values
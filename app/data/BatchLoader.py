@@ -0,0 +1,67 @@
+# app/data/BatchLoader.py
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Generic, Hashable, List, Optional, Set, Tuple, TypeVar
+
+V = TypeVar('V')
+
+class BatchLoader(Generic[V]):
+    """
+    Request-scoped DataLoader: `load()` calls made in the same event-loop tick are coalesced
+    into one `load_many` call, and results are memoised for the rest of the request.
+    Create one per request; it is not safe to share between requests. A failed batch is
+    not memoised: the keys are loaded again on the next call.
+    """
+    def __init__(self, load_many: Callable[[List[Any]], Awaitable[List[V]]], key_of: Callable[[V], Hashable] = lambda obj: obj.id):
+        self.load_many = load_many
+        self.key_of = key_of
+        self._results: Dict[str, "asyncio.Future[Optional[V]]"] = {}
+        self._pending: List[Tuple[Any, "asyncio.Future[Optional[V]]"]] = []
+        self._dispatch_tasks: Set["asyncio.Task[None]"] = set()  # O loop só guarda referências fracas às tasks
+        self.batches = 0  # Quantas consultas em lote foram feitas, útil para detectar N+1
+
+    def load(self, key: Any) -> "asyncio.Future[Optional[V]]":
+        """
+        Return a future resolving to the object with this key, or None if it does not exist.
+        """
+        normalized = str(key)
+        future = self._results.get(normalized)
+        if future is None:
+            loop = asyncio.get_running_loop()
+            future = loop.create_future()
+            self._results[normalized] = future
+            if not self._pending:
+                # Despacha no próximo tick, depois que todas as chamadas concorrentes se registraram
+                loop.call_soon(self._start_dispatch)
+            self._pending.append((key, future))
+        return future
+
+    async def load_all(self, keys: List[Any]) -> List[Optional[V]]:
+        return list(await asyncio.gather(*[self.load(key) for key in keys]))
+
+    def clear(self, key: Any):
+        """
+        Forget a memoised result, e.g. after the object was written.
+        """
+        self._results.pop(str(key), None)
+
+    def _start_dispatch(self):
+        task = asyncio.get_running_loop().create_task(self._dispatch())
+        self._dispatch_tasks.add(task)
+        task.add_done_callback(self._dispatch_tasks.discard)
+
+    async def _dispatch(self):
+        pending, self._pending = self._pending, []
+        self.batches += 1
+        try:
+            found = {str(self.key_of(obj)): obj for obj in await self.load_many([key for key, _ in pending])}
+        except Exception as e:
+            for key, future in pending:
+                # Um erro transitório do banco não fica memorizado para o resto da requisição
+                if self._results.get(str(key)) is future:
+                    del self._results[str(key)]
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for key, future in pending:
+            if not future.done():
+                future.set_result(found.get(str(key)))
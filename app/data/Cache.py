@@ -0,0 +1,129 @@
+# app/data/Cache.py
+import pickle
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+class CacheMetrics:
+    """
+    Counters used to size the cache: hit ratio, evictions and explicit invalidations.
+    """
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def snapshot(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "invalidations": self.invalidations,
+        }
+
+class Cache(ABC):
+    """
+    Interface of the read-through cache used by the repositories.
+    A cached value of None is never stored, so `get` returning None always means a miss.
+    """
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self.metrics = CacheMetrics()
+
+    @abstractmethod
+    async def get(self, key: str) -> Optional[Any]:
+        ...
+
+    @abstractmethod
+    async def set(self, key: str, value: Any):
+        ...
+
+    @abstractmethod
+    async def delete(self, *keys: str):
+        ...
+
+    @abstractmethod
+    async def clear(self):
+        ...
+
+    def stats(self) -> Dict[str, Any]:
+        return {"backend": type(self).__name__, "ttl": self.ttl, **self.metrics.snapshot()}
+
+class LRUCache(Cache):
+    """
+    In-process LRU cache with a per-entry TTL. Cached objects are shared between
+    requests and must be treated as read-only.
+    """
+    def __init__(self, max_entries: int = 10000, ttl: float = 300):
+        super().__init__(ttl)
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+
+    async def get(self, key: str) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.metrics.misses += 1
+            return None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            self.metrics.expirations += 1
+            self.metrics.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.metrics.hits += 1
+        return value
+
+    async def set(self, key: str, value: Any):
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.metrics.evictions += 1
+
+    async def delete(self, *keys: str):
+        for key in keys:
+            if self._entries.pop(key, None) is not None:
+                self.metrics.invalidations += 1
+
+    async def clear(self):
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return {**super().stats(), "size": len(self._entries), "max_entries": self.max_entries}
+
+class RedisCache(Cache):
+    """
+    Cache backed by any client exposing the async redis-py `get`/`set`/`delete`/`scan_iter`
+    methods. Values are pickled; evictions are Redis' own and are not counted here.
+    """
+    def __init__(self, client, ttl: float = 300, prefix: str = "backend-bd2:"):
+        super().__init__(ttl)
+        self.client = client
+        self.prefix = prefix
+
+    async def get(self, key: str) -> Optional[Any]:
+        payload = await self.client.get(self.prefix + key)
+        if payload is None:
+            self.metrics.misses += 1
+            return None
+        self.metrics.hits += 1
+        return pickle.loads(payload)
+
+    async def set(self, key: str, value: Any):
+        await self.client.set(self.prefix + key, pickle.dumps(value), ex=max(1, int(self.ttl)))
+
+    async def delete(self, *keys: str):
+        if keys:
+            self.metrics.invalidations += await self.client.delete(*[self.prefix + key for key in keys])
+
+    async def clear(self):
+        keys = [key async for key in self.client.scan_iter(match=self.prefix + "*")]
+        if keys:
+            await self.client.delete(*keys)
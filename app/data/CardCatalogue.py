@@ -0,0 +1,209 @@
+# app/data/CardCatalogue.py
+from decimal import Decimal
+from typing import Any, Dict, Hashable, Iterable, List, Mapping, Optional, Tuple
+import numpy as np
+
+CATEGORICAL_COLUMNS = ("_type", "color", "_set")
+NUMERIC_COLUMNS = ("mana_cost", "power", "toughness", "price")
+CATALOGUE_COLUMNS = CATEGORICAL_COLUMNS + NUMERIC_COLUMNS
+GROUP_COLUMNS = {"type": "_type", "color": "color", "set": "_set"}  # Nome na API -> coluna
+DISTRIBUTION_COLUMNS = ("mana_cost", "power", "toughness")  # Colunas inteiras, contáveis por valor
+NULL = np.iinfo(np.int64).min  # Marca de NULL nas colunas numéricas
+INITIAL_CAPACITY = 1024
+COMPACT_MIN_DEAD = 1024  # Linhas removidas antes de considerar compactar os arrays
+
+class Dictionary:
+    """
+    Dictionary encoding of a text column: each distinct value gets a small integer code, 0 is NULL.
+    """
+    def __init__(self):
+        self.values: List[Optional[str]] = [None]
+        self._codes: Dict[Optional[str], int] = {None: 0}
+
+    def encode(self, value: Optional[str]) -> int:
+        code = self._codes.get(value)
+        if code is None:
+            code = self._codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+class CardCatalogue:
+    """
+    Columnar, in-memory snapshot of the card attributes used by the analytics endpoints. Text
+    columns are dictionary-encoded int32 codes, numeric columns are int64 arrays (prices in cents)
+    with NULL stored as a sentinel. Rows are appended as cards are written; deleted rows are
+    masked out and the arrays are compacted once most of them are dead.
+    """
+    def __init__(self, capacity: int = INITIAL_CAPACITY):
+        self._index: Dict[str, int] = {}
+        self._dictionaries = {column: Dictionary() for column in CATEGORICAL_COLUMNS}
+        self._columns: Dict[str, np.ndarray] = {}
+        self._alive = np.zeros(0, dtype=bool)
+        self._size = 0  # Linhas ocupadas, vivas ou removidas
+        self._dead = 0
+        self._allocate(capacity)
+        self.ready = False
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    @property
+    def nbytes(self) -> int:
+        """
+        Bytes held by the column arrays (the id index and the dictionaries are not counted).
+        """
+        return self._alive.nbytes + sum(column.nbytes for column in self._columns.values())
+
+    def build(self, rows: Iterable[Mapping[str, Any]]):
+        """
+        Replace the snapshot with these card rows (id plus the catalogue columns) and mark it ready.
+        """
+        self._index = {}
+        self._dictionaries = {column: Dictionary() for column in CATEGORICAL_COLUMNS}
+        encoded: Dict[str, List[int]] = {column: [] for column in CATALOGUE_COLUMNS}
+        for row in rows:
+            card_id = str(row["id"])
+            if card_id in self._index:
+                continue
+            self._index[card_id] = len(self._index)
+            for column in CATALOGUE_COLUMNS:
+                encoded[column].append(self._encode(column, row.get(column)))
+        size = len(self._index)
+        self._columns, self._alive, self._size, self._dead = {}, np.zeros(0, dtype=bool), 0, 0
+        self._allocate(max(size, INITIAL_CAPACITY))
+        for column, values in encoded.items():
+            self._columns[column][:size] = values
+        self._alive[:size] = True
+        self._size = size
+        self.ready = True
+
+    def upsert(self, card_id: Hashable, values: Mapping[str, Any]):
+        """
+        Insert a card or update the catalogue columns present in `values`, keeping the others.
+        """
+        row = self._index.get(str(card_id))
+        if row is None:
+            if self._size == len(self._alive):
+                self._allocate(2 * len(self._alive))
+            row = self._index[str(card_id)] = self._size
+            self._size += 1
+            self._alive[row] = True
+            for column in CATALOGUE_COLUMNS:
+                self._columns[column][row] = self._encode(column, None)
+        for column in CATALOGUE_COLUMNS:
+            if column in values:
+                self._columns[column][row] = self._encode(column, values[column])
+
+    def remove(self, card_id: Hashable):
+        row = self._index.pop(str(card_id), None)
+        if row is None:
+            return
+        self._alive[row] = False
+        self._dead += 1
+        if self._dead >= COMPACT_MIN_DEAD and self._dead * 2 >= self._size:
+            self._compact()
+
+    def aggregate(self, group_by: str, metric: str) -> List[Dict[str, Any]]:
+        """
+        Count, mean, min, max and total of a numeric column per group (type, color or set).
+        `cards` counts every card of the group; the other fields skip cards with a NULL value.
+        """
+        codes, labels = self._group(group_by)
+        values = self._live(self._numeric(metric))
+        groups = len(labels)
+        cards = np.bincount(codes, minlength=groups)
+        present = values != NULL
+        codes, values = codes[present], values[present].astype(np.float64)
+        if metric == "price":
+            values /= 100
+        count = np.bincount(codes, minlength=groups)
+        total = np.bincount(codes, weights=values, minlength=groups)
+        low = np.full(groups, np.inf)
+        high = np.full(groups, -np.inf)
+        np.minimum.at(low, codes, values)
+        np.maximum.at(high, codes, values)
+        stats = []
+        for code in np.flatnonzero(cards):
+            measured = count[code] > 0
+            stats.append({
+                "group": labels[code], "cards": int(cards[code]), "count": int(count[code]),
+                "mean": float(total[code] / count[code]) if measured else None,
+                "min": float(low[code]) if measured else None,
+                "max": float(high[code]) if measured else None,
+                "total": float(total[code]) if measured else None,
+            })
+        return self._sorted(stats)
+
+    def distribution(self, group_by: str, column: str) -> List[Dict[str, Any]]:
+        """
+        Number of cards per value of an integer column (e.g. the mana curve) per group. NULL values are skipped.
+        """
+        if column not in DISTRIBUTION_COLUMNS:
+            raise ValueError(f"Unknown column '{column}'; use one of {', '.join(DISTRIBUTION_COLUMNS)}.")
+        codes, labels = self._group(group_by)
+        values = self._live(self._columns[column])
+        present = values != NULL
+        codes, values = codes[present], values[present]
+        if not len(values):
+            return []
+        # Um par (grupo, valor) por chave inteira, contado de uma vez com np.unique
+        low = values.min()
+        span = int(values.max() - low) + 1
+        keys, counts = np.unique(codes.astype(np.int64) * span + (values - low), return_counts=True)
+        distributions: Dict[int, Dict[int, int]] = {}
+        for key, count in zip(keys.tolist(), counts.tolist()):
+            code, offset = divmod(key, span)
+            distributions.setdefault(code, {})[int(low) + offset] = count
+        return self._sorted([{"group": labels[code], "counts": by_value} for code, by_value in distributions.items()])
+
+    def _encode(self, column: str, value: Any) -> int:
+        if column in self._dictionaries:
+            return self._dictionaries[column].encode(value)
+        if value is None:
+            return NULL
+        if column == "price":
+            return int((Decimal(value) * 100).to_integral_value())
+        return int(value)
+
+    def _allocate(self, capacity: int):
+        # Cresce os arrays dobrando a capacidade, como uma lista, para inserções amortizadas O(1)
+        for column in CATALOGUE_COLUMNS:
+            dtype = np.int32 if column in CATEGORICAL_COLUMNS else np.int64
+            grown = np.zeros(capacity, dtype=dtype)
+            previous = self._columns.get(column)
+            if previous is not None:
+                grown[:self._size] = previous[:self._size]
+            self._columns[column] = grown
+        alive = np.zeros(capacity, dtype=bool)
+        alive[:self._size] = self._alive[:self._size]
+        self._alive = alive
+
+    def _compact(self):
+        keep = np.flatnonzero(self._alive[:self._size])
+        new_rows = np.full(self._size, -1, dtype=np.int64)
+        new_rows[keep] = np.arange(len(keep))
+        for column in CATALOGUE_COLUMNS:
+            self._columns[column][:len(keep)] = self._columns[column][keep]
+        self._alive[:] = False
+        self._alive[:len(keep)] = True
+        self._index = {card_id: int(new_rows[row]) for card_id, row in self._index.items()}
+        self._size, self._dead = len(keep), 0
+
+    def _live(self, column: np.ndarray) -> np.ndarray:
+        return column[:self._size][self._alive[:self._size]]
+
+    def _group(self, group_by: str) -> Tuple[np.ndarray, List[Optional[str]]]:
+        column = GROUP_COLUMNS.get(group_by)
+        if column is None:
+            raise ValueError(f"Unknown group '{group_by}'; use one of {', '.join(GROUP_COLUMNS)}.")
+        return self._live(self._columns[column]), self._dictionaries[column].values
+
+    def _numeric(self, metric: str) -> np.ndarray:
+        if metric not in NUMERIC_COLUMNS:
+            raise ValueError(f"Unknown metric '{metric}'; use one of {', '.join(NUMERIC_COLUMNS)}.")
+        return self._columns[metric]
+
+    @staticmethod
+    def _sorted(groups: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        # Ordem alfabética dos grupos, com o grupo NULL (ex.: cartas incolores) por último
+        return sorted(groups, key=lambda group: (group["group"] is None, group["group"] or ""))
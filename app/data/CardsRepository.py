@@ -1,24 +1,168 @@
-from app.data.BaseRepository import BaseRepository
-from app.domain.CardModel import Card, CardTheme, CardInteraction
+from app.data.BaseRepository import BaseRepository, BULK_CHUNK_SIZE, GET_MANY_CHUNK_SIZE
+from app.data.CardCatalogue import CATALOGUE_COLUMNS
+from app.domain.CardModel import Card, CardTheme, CardInteraction, CardFilter, PriceCandle
+from app.domain.BaseModel import Page, BulkResult
 from uuid import UUID
-from typing import List
+from typing import List, AsyncIterator, Mapping, Any, Dict, Optional, Tuple
 from databases import Database
 from app.domain.CardModel import PriceHistory
 from decimal import Decimal
-from datetime import date
+from datetime import date, datetime, timedelta
+
+PRICE_BUCKETS = ("day", "week", "month")
+NGRAM_TOKEN_SIZE = 2  # ngram_token_size padrão do MySQL, usado pelo índice ft_cards_name
+ROLLUP_BUCKETS = ("week", "month")  # "day" é servido direto de Price_History, que já tem um preço por dia
+
+def bucket_start(day: date, bucket: str) -> date:
+    """
+    First day of the bucket holding `day`: the day itself, the Monday of its week or the 1st of its month.
+    """
+    if bucket == "week":
+        return day - timedelta(days=day.weekday())
+    if bucket == "month":
+        return day.replace(day=1)
+    return day
+
+# Mesma regra de bucket_start em SQL; sem DATE_FORMAT porque '%' conflita com o paramstyle do driver
+BUCKET_START_SQL = {
+    "week": "DATE_SUB(date, INTERVAL WEEKDAY(date) DAY)",
+    "month": "DATE_SUB(date, INTERVAL DAYOFMONTH(date) - 1 DAY)",
+}
 
 class CardsRepository(BaseRepository[Card]):
+    cache_reads = True
+    generated_columns = ("updated_at",)
+
     def __init__(self):
         super().__init__("Cards", Card)
 
+    async def get_version(self, card_id: UUID) -> Optional[datetime]:
+        """
+        Last modification time of a card, or None if it does not exist. Reads one column by primary key.
+        """
+        query = f"SELECT updated_at FROM {self.table_name} WHERE id = :id"
+        row = await self.database.fetch_one(query=query, values={"id": card_id})
+        return row["updated_at"] if row else None
+
     async def get_cards_by_name(self, name: str) -> List[Card]:
         """
-        Retrieve cards by name (exact or partial match).
+        Retrieve cards by name (exact or partial match) through the ngram FULLTEXT index. Names
+        shorter than one ngram token have no token to match and are searched with LIKE instead.
         """
-        query = f"SELECT * FROM {self.table_name} WHERE name LIKE :name"
-        rows = await self.database.fetch_all(query=query, values={"name": f"%{name}%"})
+        name = name.strip()
+        if not name:
+            raise ValueError("Card name must not be empty.")
+        if len(name) < NGRAM_TOKEN_SIZE:
+            pattern = "%" + name.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+            query = f"SELECT * FROM {self.table_name} WHERE name LIKE :pattern"
+            values = {"pattern": pattern}
+        else:
+            # Frase entre aspas no modo booleano: os ngramas precisam aparecer em sequência, como no LIKE
+            query = f"SELECT * FROM {self.table_name} WHERE MATCH(name) AGAINST (:phrase IN BOOLEAN MODE)"
+            values = {"phrase": '"' + name.replace('"', ' ') + '"'}
+        rows = await self.database.fetch_all(query=query, values=values)
         return [self.model(**row) for row in rows]
 
+    async def filter_cards(self, card_filter: CardFilter, limit: int, after: Optional[str] = None, raw: bool = False) -> Page[Card]:
+        """
+        Retrieve one page of cards matching every attribute in `card_filter`, compiled into one query.
+        """
+        conditions, values = self._compile_filter(card_filter)
+        return await self._list_page(conditions, values, limit, after, raw=raw)
+
+    def _compile_filter(self, card_filter: CardFilter) -> Tuple[List[str], Dict[str, Any]]:
+        """
+        Translate a CardFilter into parameterised SQL predicates. Equality/IN predicates come
+        first so they line up with the leading columns of the composite indexes in init.sql.
+        """
+        conditions: List[str] = []
+        values: Dict[str, Any] = {}
+        for column, name, items in (("_type", "types", card_filter.types), ("color", "colors", card_filter.colors), ("_set", "sets", card_filter.sets)):
+            if items:
+                conditions.append(f"{column} IN ({self._bind_list(name, items, values)})")
+        ranges = (
+            ("mana_cost", card_filter.min_mana_cost, card_filter.max_mana_cost),
+            ("power", card_filter.min_power, card_filter.max_power),
+            ("toughness", card_filter.min_toughness, card_filter.max_toughness),
+            ("price", card_filter.min_price, card_filter.max_price),
+        )
+        for column, low, high in ranges:
+            if low is not None and low == high:
+                conditions.append(f"{column} = :{column}")
+                values[column] = low
+                continue
+            if low is not None:
+                conditions.append(f"{column} >= :min_{column}")
+                values[f"min_{column}"] = low
+            if high is not None:
+                conditions.append(f"{column} <= :max_{column}")
+                values[f"max_{column}"] = high
+        if card_filter.themes:
+            themes = self._bind_list("themes", card_filter.themes, values)
+            conditions.append(f"EXISTS (SELECT 1 FROM Card_Themes ct WHERE ct.card_id = {self.table_name}.id AND ct.theme IN ({themes}))")
+        return conditions, values
+
+    @staticmethod
+    def _bind_list(name: str, items: List[Any], values: Dict[str, Any]) -> str:
+        placeholders = []
+        for i, item in enumerate(items):
+            values[f"{name}_{i}"] = item
+            placeholders.append(f":{name}_{i}")
+        return ", ".join(placeholders)
+
+    async def search_cards(self, text: str, limit: int, offset: int) -> List[Dict[str, Any]]:
+        """
+        Rank cards by FULLTEXT relevance of their name and effect.
+        """
+        query = (
+            f"SELECT id, name, MATCH(name, effect) AGAINST (:text IN NATURAL LANGUAGE MODE) AS score "
+            f"FROM {self.table_name} WHERE MATCH(name, effect) AGAINST (:text IN NATURAL LANGUAGE MODE) "
+            "ORDER BY score DESC LIMIT :limit OFFSET :offset"
+        )
+        rows = await self.database.fetch_all(query=query, values={"text": text, "limit": limit, "offset": offset})
+        return [dict(row) for row in rows]
+
+    async def iterate_names(self) -> AsyncIterator[Mapping[str, Any]]:
+        """
+        Stream (id, name) for every card in keyset chunks, used to build the in-process search index.
+        """
+        async for row in self.iterate(columns=("id", "name")):
+            yield row
+
+    async def iterate_catalogue(self) -> AsyncIterator[Mapping[str, Any]]:
+        """
+        Stream the id and catalogue columns of every card in keyset chunks, used to build the columnar catalogue.
+        """
+        async for row in self.iterate(columns=("id", *CATALOGUE_COLUMNS)):
+            yield row
+
+    async def delete(self, obj_id: UUID, return_representation: bool = True):
+        """
+        Delete a card. The FK cascade also drops its interactions and price history, so the cached
+        interaction lists of its partners and its cached latest price are invalidated with it.
+        """
+        if not (self.cache_reads and self.cache):
+            return await super().delete(obj_id, return_representation=return_representation)
+        async with self._atomic():
+            # Parceiros lidos antes do DELETE: depois da cascata as interações já não existem
+            query = (
+                "SELECT card_id_2 AS partner FROM Card_Interactions WHERE card_id_1 = :card_id "
+                "UNION ALL SELECT card_id_1 FROM Card_Interactions WHERE card_id_2 = :card_id AND card_id_1 <> :card_id"
+            )
+            rows = await self.database.fetch_all(query=query, values={"card_id": obj_id})
+            deleted = await super().delete(obj_id, return_representation=return_representation)
+            if deleted:
+                await self._invalidate_rows([{"id": obj_id, "interaction_partners": [row["partner"] for row in rows]}])
+        return deleted
+
+    def _cache_keys_for_row(self, row: Mapping[str, Any]) -> List[str]:
+        keys = super()._cache_keys_for_row(row)
+        if "interaction_partners" in row:
+            # Linhas apagadas em cascata ficam no cache dos outros repositórios, com o prefixo das suas tabelas
+            keys.append(f"Price_History:latest:{row['id']}")
+            keys.extend(f"Card_Interactions:interactions:{card_id}" for card_id in (row["id"], *row["interaction_partners"]))
+        return keys
+
     async def get_cards_by_mana_cost(self, mana_cost: int) -> List[Card]:
         """
         Retrieve cards by mana cost.
@@ -46,6 +190,9 @@ class CardsThemeRepository(BaseRepository[CardTheme]):
         await self.database.execute(query=query, values={"card_id": card_id, "theme": theme})
 
 class CardIntereactionRepository(BaseRepository[CardInteraction]):
+    key_columns = ("card_id_1", "card_id_2")
+    cache_reads = True
+
     def __init__(self):
         super().__init__("Card_Interactions", CardInteraction)
 
@@ -54,29 +201,87 @@ class CardIntereactionRepository(BaseRepository[CardInteraction]):
         Define a new interaction between two cards.
         """
         query = f"INSERT INTO {self.table_name} (card_id_1, card_id_2, interaction_type) VALUES (:card_id_1, :card_id_2, :interaction_type)"
-        await self.database.execute(query=query, values={"card_id_1": card_id_1, "card_id_2": card_id_2, "interaction_type": interaction_type})
+        values = {"card_id_1": card_id_1, "card_id_2": card_id_2, "interaction_type": interaction_type}
+        await self.database.execute(query=query, values=values)
+        await self._invalidate_rows([values])
 
     async def get_interactions_for_card(self, card_id: UUID) -> List[CardInteraction]:
         """
         Retrieve all interactions for a given card.
         """
-        query = f"SELECT * FROM {self.table_name} WHERE card_id_1 = :card_id OR card_id_2 = :card_id"
-        rows = await self.database.fetch_all(query=query, values={"card_id": card_id})
-        return [self.model(**row) for row in rows]
+        async def load():
+            # UNION ALL em vez de OR: cada ramo usa o seu índice (PK e idx_card_interactions_card2)
+            query = (
+                f"SELECT * FROM {self.table_name} WHERE card_id_1 = :card_id "
+                f"UNION ALL SELECT * FROM {self.table_name} WHERE card_id_2 = :card_id AND card_id_1 <> :card_id"
+            )
+            rows = await self.database.fetch_all(query=query, values={"card_id": card_id})
+            return [self.model(**row) for row in rows]
+        return await self._read_through(self._cache_key("interactions", card_id), load)
+
+    async def iterate_edges(self) -> AsyncIterator[Mapping[str, Any]]:
+        """
+        Stream (card_id_1, card_id_2) for every interaction in keyset chunks, used to build the in-process graph.
+        """
+        async for row in self.iterate(columns=self.key_columns):
+            yield row
+
+    def _cache_keys_for_row(self, row: Mapping[str, Any]) -> List[str]:
+        # Uma interação aparece na lista de interações das duas cartas
+        return [self._cache_key("interactions", row[column]) for column in ("card_id_1", "card_id_2") if row.get(column) is not None]
 
 
 class PriceHistoryRepository(BaseRepository[PriceHistory]):
+    key_columns = ("card_id", "date")
+    cache_reads = True
+
     def __init__(self):
         super().__init__("Price_History", PriceHistory)
 
     async def get_latest_price(self, card_id: UUID) -> PriceHistory:
         """
-        Retrieve the most recent price record for a specific card.
+        Retrieve the most recent price record for a specific card from the Latest_Prices projection.
+        """
+        async def load():
+            query = "SELECT card_id, price, date FROM Latest_Prices WHERE card_id = :card_id"
+            row = await self.database.fetch_one(query=query, values={"card_id": card_id})
+            return self.model(**row) if row else None
+        return await self._read_through(self._cache_key("latest", card_id), load)
+
+    async def lock_latest_price(self, card_id: UUID) -> Optional[PriceHistory]:
+        """
+        Read a card's latest price with a locking read (`FOR UPDATE`), so concurrent price records
+        for the card wait for this transaction instead of computing a delta from the same value.
+        Must run inside a unit of work; bypasses the read cache.
         """
-        query = f"SELECT * FROM {self.table_name} WHERE card_id = :card_id ORDER BY date DESC LIMIT 1"
+        query = "SELECT card_id, price, date FROM Latest_Prices WHERE card_id = :card_id FOR UPDATE"
         row = await self.database.fetch_one(query=query, values={"card_id": card_id})
         return self.model(**row) if row else None
 
+    async def get_latest_prices(self, card_ids: List[UUID], chunk_size: int = GET_MANY_CHUNK_SIZE, raw: bool = False) -> Dict[str, PriceHistory]:
+        """
+        Retrieve the latest price of many cards with one Latest_Prices lookup per chunk of ids,
+        keyed by card id. Cards without any price record are left out. With `raw=True` the
+        values are plain dicts instead of models.
+        """
+        unique_ids = list(dict.fromkeys(str(card_id) for card_id in card_ids))
+        latest: Dict[str, PriceHistory] = {}
+        for start in range(0, len(unique_ids), chunk_size):
+            values = {f"card_id_{i}": card_id for i, card_id in enumerate(unique_ids[start:start + chunk_size])}
+            query = f"SELECT card_id, price, date FROM Latest_Prices WHERE card_id IN ({', '.join(':' + key for key in values)})"
+            for row in await self.database.fetch_all(query=query, values=values):
+                latest[str(row["card_id"])] = self.to_response_row(row) if raw else self.model(**row)
+        return latest
+
+    async def get_price_history_version(self, card_id: UUID) -> Tuple[Optional[datetime], int]:
+        """
+        Last modification time and row count of a card's price history, from the primary key alone.
+        The count catches deleted records, which leave no newer updated_at behind.
+        """
+        query = f"SELECT MAX(updated_at) AS updated_at, COUNT(*) AS records FROM {self.table_name} WHERE card_id = :card_id"
+        row = await self.database.fetch_one(query=query, values={"card_id": card_id})
+        return row["updated_at"], row["records"]
+
     async def get_price_history(self, card_id: UUID) -> List[PriceHistory]:
         """
         Retrieve the entire price history for a specific card.
@@ -85,9 +290,120 @@ class PriceHistoryRepository(BaseRepository[PriceHistory]):
         rows = await self.database.fetch_all(query=query, values={"card_id": card_id})
         return [self.model(**row) for row in rows]
 
+    async def get_first_price_date(self, card_id: UUID) -> Optional[date]:
+        """
+        Date of the card's oldest price record, or None without history. Reads the first entry of the primary key.
+        """
+        query = f"SELECT MIN(date) AS first_date FROM {self.table_name} WHERE card_id = :card_id"
+        row = await self.database.fetch_one(query=query, values={"card_id": card_id})
+        return row["first_date"] if row else None
+
+    async def get_price_candles(self, card_id: UUID, bucket: str, start: Optional[date], end: Optional[date]) -> List[PriceCandle]:
+        """
+        Retrieve OHLC candles of one bucket size between two dates (inclusive), oldest first.
+        Daily candles are read from Price_History, weekly and monthly ones from Price_Rollups;
+        both are primary key range scans.
+        """
+        values: Dict[str, Any] = {"card_id": card_id}
+        if bucket == "day":
+            query = (
+                f"SELECT date, price AS open, price AS high, price AS low, price AS close, 1 AS samples "
+                f"FROM {self.table_name} WHERE card_id = :card_id"
+            )
+            date_column = "date"
+        else:
+            query = (
+                "SELECT bucket_start AS date, open_price AS open, high_price AS high, low_price AS low, "
+                "close_price AS close, samples FROM Price_Rollups WHERE card_id = :card_id AND bucket = :bucket"
+            )
+            values["bucket"] = bucket
+            date_column = "bucket_start"
+        if start is not None:
+            query += f" AND {date_column} >= :start"
+            values["start"] = bucket_start(start, bucket)
+        if end is not None:
+            query += f" AND {date_column} <= :end"
+            values["end"] = end
+        rows = await self.database.fetch_all(query=query + f" ORDER BY {date_column}", values=values)
+        return [PriceCandle(**row) for row in rows]
+
+    async def iterate_price_history(self, card_id: UUID) -> AsyncIterator[Mapping[str, Any]]:
+        """
+        Stream the price history for a specific card as raw rows, oldest first.
+        """
+        query = f"SELECT * FROM {self.table_name} WHERE card_id = :card_id ORDER BY date"
+        async for row in self.database.iterate(query=query, values={"card_id": card_id}):
+            yield row
+
     async def add_price_record(self, card_id: UUID, price: Decimal, date: date):
         """
-        Add a new price record for a specific card.
+        Add a new price record for a specific card, moving the latest price and the
+        weekly/monthly candles forward in the same transaction.
         """
         query = f"INSERT INTO {self.table_name} (card_id, price, date) VALUES (:card_id, :price, :date)"
-        await self.database.execute(query=query, values={"card_id": card_id, "price": price, "date": date})
\ No newline at end of file
+        values = {"card_id": card_id, "price": price, "date": date}
+        # A ordem das atribuições importa: o MySQL avalia da esquerda para a direita, então o preço vem antes da data
+        latest_query = (
+            "INSERT INTO Latest_Prices (card_id, price, date) VALUES (:card_id, :price, :date) "
+            "ON DUPLICATE KEY UPDATE price = IF(VALUES(date) >= date, VALUES(price), price), date = GREATEST(date, VALUES(date))"
+        )
+        rollup_values = {**values, **{f"{bucket}_start": bucket_start(date, bucket) for bucket in ROLLUP_BUCKETS}}
+        rollup_query = (
+            "INSERT INTO Price_Rollups (card_id, bucket, bucket_start, open_price, open_date, high_price, low_price, close_price, close_date, samples) VALUES "
+            + ", ".join(f"(:card_id, '{bucket}', :{bucket}_start, :price, :date, :price, :price, :price, :date, 1)" for bucket in ROLLUP_BUCKETS)
+            + " ON DUPLICATE KEY UPDATE "
+            "open_price = IF(VALUES(open_date) < open_date, VALUES(open_price), open_price), open_date = LEAST(open_date, VALUES(open_date)), "
+            "high_price = GREATEST(high_price, VALUES(high_price)), low_price = LEAST(low_price, VALUES(low_price)), "
+            "close_price = IF(VALUES(close_date) >= close_date, VALUES(close_price), close_price), close_date = GREATEST(close_date, VALUES(close_date)), "
+            "samples = samples + 1"
+        )
+        async with self._atomic():
+            await self.database.execute(query=query, values=values)
+            await self.database.execute(query=latest_query, values=values)
+            await self.database.execute(query=rollup_query, values=rollup_values)
+        await self._invalidate_rows([values])
+
+    async def bulk_upsert(self, rows: List[Dict[str, Any]], chunk_size: int = BULK_CHUNK_SIZE) -> BulkResult:
+        """
+        Upsert many price records, then recompute the latest prices and candles of the cards touched,
+        since an upsert may overwrite an existing day.
+        """
+        result = await super().bulk_upsert(rows, chunk_size=chunk_size)
+        card_ids = list(dict.fromkeys(str(row["card_id"]) for row in rows if row.get("card_id") is not None))
+        await self.refresh_derived(card_ids)
+        return result
+
+    async def refresh_derived(self, card_ids: List[UUID], chunk_size: int = GET_MANY_CHUNK_SIZE):
+        """
+        Recompute Latest_Prices and Price_Rollups of these cards from Price_History.
+        """
+        for start in range(0, len(card_ids), chunk_size):
+            values = {f"card_id_{i}": card_id for i, card_id in enumerate(card_ids[start:start + chunk_size])}
+            in_list = ", ".join(":" + key for key in values)
+            latest_query = (
+                "INSERT INTO Latest_Prices (card_id, price, date) "
+                f"SELECT ph.card_id, ph.price, ph.date FROM {self.table_name} ph "
+                f"JOIN (SELECT card_id, MAX(date) AS date FROM {self.table_name} WHERE card_id IN ({in_list}) GROUP BY card_id) m "
+                "ON m.card_id = ph.card_id AND m.date = ph.date "
+                "ON DUPLICATE KEY UPDATE price = VALUES(price), date = VALUES(date)"
+            )
+            async with self.database.transaction():
+                await self.database.execute(query=latest_query, values=values)
+                for bucket in ROLLUP_BUCKETS:
+                    await self.database.execute(query=self._rollup_rebuild_query(bucket, in_list), values=values)
+            await self._invalidate_rows([{"card_id": card_id} for card_id in values.values()])
+
+    def _rollup_rebuild_query(self, bucket: str, in_list: str) -> str:
+        # Abertura e fechamento: primeiro e último preço do intervalo, via GROUP_CONCAT ordenado por data
+        return (
+            "INSERT INTO Price_Rollups (card_id, bucket, bucket_start, open_price, open_date, high_price, low_price, close_price, close_date, samples) "
+            f"SELECT card_id, '{bucket}', {BUCKET_START_SQL[bucket]} AS start_date, "
+            "CAST(SUBSTRING_INDEX(GROUP_CONCAT(price ORDER BY date), ',', 1) AS DECIMAL(10, 2)), MIN(date), MAX(price), MIN(price), "
+            "CAST(SUBSTRING_INDEX(GROUP_CONCAT(price ORDER BY date DESC), ',', 1) AS DECIMAL(10, 2)), MAX(date), COUNT(*) "
+            f"FROM {self.table_name} WHERE card_id IN ({in_list}) GROUP BY card_id, start_date "
+            "ON DUPLICATE KEY UPDATE open_price = VALUES(open_price), open_date = VALUES(open_date), high_price = VALUES(high_price), "
+            "low_price = VALUES(low_price), close_price = VALUES(close_price), close_date = VALUES(close_date), samples = VALUES(samples)"
+        )
+
+    def _cache_keys_for_row(self, row: Mapping[str, Any]) -> List[str]:
+        return [self._cache_key("latest", row["card_id"])] if row.get("card_id") is not None else []
@@ -0,0 +1,207 @@
+# app/data/DatabaseRouter.py
+import asyncio
+import itertools
+import logging
+import time
+from contextlib import asynccontextmanager, nullcontext
+from contextvars import ContextVar
+from typing import Any, AsyncContextManager, AsyncIterator, Dict, List, Mapping, Optional
+from databases import Database
+from pymysql.err import OperationalError
+
+logger = logging.getLogger(__name__)
+
+# Estado por requisição (cada requisição roda na sua própria task, com a sua cópia do contexto)
+_transaction_depth: ContextVar[int] = ContextVar("transaction_depth", default=0)
+_primary_until: ContextVar[float] = ContextVar("primary_until", default=0.0)
+_sticky_seconds: ContextVar[Optional[float]] = ContextVar("sticky_seconds", default=None)
+_pinned_read: ContextVar[Optional[Database]] = ContextVar("pinned_read", default=None)
+
+# Consultas que só leem; o resto (ex.: INSERT ... RETURNING via fetch_one) vai para o primário
+READ_PREFIXES = ("SELECT", "WITH", "SHOW", "EXPLAIN")
+
+# Falhas que indicam réplica indisponível (e não erro na consulta): a leitura é refeita no primário
+REPLICA_FAILURES = (OSError, asyncio.TimeoutError, OperationalError)
+
+class DatabaseRouter:
+    """
+    Drop-in replacement for `Database` that sends writes to the primary and reads to healthy
+    replicas in round-robin. Reads go to the primary inside a transaction, inside
+    `read_from_primary()`, and, when `sticky_seconds` > 0, for that long after the current
+    request wrote something (read-your-writes); a single request can opt in with `stick_to_primary()`.
+    """
+    def __init__(self, primary: Database, replicas: List[Database], sticky_seconds: float = 0.0):
+        self.primary = primary
+        self.replicas = replicas
+        self.sticky_seconds = sticky_seconds
+        self.healthy: List[bool] = [True] * len(replicas)
+        self._next_replica = itertools.count()
+        self._health_task: Optional[asyncio.Task] = None
+        self.routed: Dict[str, int] = {"primary": 0, "replica": 0, "fallback": 0}
+
+    @property
+    def url(self):
+        return self.primary.url
+
+    async def connect(self):
+        await self.primary.connect()
+        for replica in self.replicas:
+            await replica.connect()
+
+    async def disconnect(self):
+        await self.stop_health_checks()
+        for replica in self.replicas:
+            await replica.disconnect()
+        await self.primary.disconnect()
+
+    # Escritas
+
+    async def execute(self, query: Any, values: Optional[Dict[str, Any]] = None) -> Any:
+        result = await self.primary.execute(query=query, values=values)
+        self._mark_write()
+        return result
+
+    async def execute_many(self, query: Any, values: List[Dict[str, Any]]):
+        await self.primary.execute_many(query=query, values=values)
+        self._mark_write()
+
+    @asynccontextmanager
+    async def transaction(self, **kwargs: Any):
+        depth = _transaction_depth.get()
+        token = _transaction_depth.set(depth + 1)
+        try:
+            async with self.primary.transaction(**kwargs) as transaction:
+                yield transaction
+        finally:
+            _transaction_depth.reset(token)
+            self._mark_write()
+
+    # Leituras
+
+    async def fetch_one(self, query: Any, values: Optional[Dict[str, Any]] = None) -> Any:
+        return await self._read("fetch_one", query, values)
+
+    async def fetch_all(self, query: Any, values: Optional[Dict[str, Any]] = None) -> List[Any]:
+        return await self._read("fetch_all", query, values)
+
+    async def fetch_val(self, query: Any, values: Optional[Dict[str, Any]] = None, column: Any = 0) -> Any:
+        return await self._read("fetch_val", query, values, column=column)
+
+    async def iterate(self, query: Any, values: Optional[Dict[str, Any]] = None) -> AsyncIterator[Mapping[str, Any]]:
+        # Sem fallback no meio do fluxo: linhas já entregues não podem ser repetidas
+        database = self._database_for_read()
+        async for row in database.iterate(query=query, values=values):
+            yield row
+
+    @asynccontextmanager
+    async def read_from_primary(self):
+        """
+        Route every read in the block to the primary, e.g. right after a write whose result must be seen.
+        """
+        token = _transaction_depth.set(_transaction_depth.get() + 1)
+        try:
+            yield
+        finally:
+            _transaction_depth.reset(token)
+
+    @asynccontextmanager
+    async def pinned_reads(self):
+        """
+        Serve every read of the block from the same database, so reads that must agree (a version
+        and the rows it describes) are not split between replicas with different lag.
+        """
+        if _pinned_read.get() is not None:
+            yield
+            return
+        token = _pinned_read.set(self._database_for_read())
+        try:
+            yield
+        finally:
+            _pinned_read.reset(token)
+
+    def stick_to_primary(self, seconds: float):
+        """
+        Opt the current request into reading from the primary for `seconds` after each of its writes.
+        """
+        _sticky_seconds.set(seconds)
+
+    async def _read(self, method: str, query: Any, values: Optional[Dict[str, Any]], **kwargs: Any) -> Any:
+        if not str(query).lstrip().upper().startswith(READ_PREFIXES):
+            result = await getattr(self.primary, method)(query=query, values=values, **kwargs)
+            self._mark_write()
+            return result
+        database = self._database_for_read()
+        if database is self.primary:
+            return await getattr(database, method)(query=query, values=values, **kwargs)
+        try:
+            return await getattr(database, method)(query=query, values=values, **kwargs)
+        except REPLICA_FAILURES as e:
+            index = self.replicas.index(database)
+            logger.warning("Replica %d failed, reading from the primary: %s", index, e)
+            self.healthy[index] = False
+            self.routed["fallback"] += 1
+            return await getattr(self.primary, method)(query=query, values=values, **kwargs)
+
+    def _database_for_read(self) -> Database:
+        pinned = _pinned_read.get()
+        if pinned is not None:
+            return pinned
+        if _transaction_depth.get() > 0 or time.monotonic() < _primary_until.get():
+            self.routed["primary"] += 1
+            return self.primary
+        healthy = [replica for replica, ok in zip(self.replicas, self.healthy) if ok]
+        if not healthy:
+            self.routed["primary"] += 1
+            return self.primary
+        self.routed["replica"] += 1
+        return healthy[next(self._next_replica) % len(healthy)]
+
+    def _mark_write(self):
+        sticky_seconds = _sticky_seconds.get()
+        if sticky_seconds is None:
+            sticky_seconds = self.sticky_seconds
+        if sticky_seconds > 0:
+            _primary_until.set(time.monotonic() + sticky_seconds)
+
+    # Health checks
+
+    async def check_health(self, timeout: float = 2.0):
+        """
+        Ping every replica and update which ones may serve reads.
+        """
+        for index, replica in enumerate(self.replicas):
+            try:
+                await asyncio.wait_for(replica.fetch_one(query="SELECT 1"), timeout)
+                if not self.healthy[index]:
+                    logger.info("Replica %d is healthy again", index)
+                self.healthy[index] = True
+            except Exception as e:
+                if self.healthy[index]:
+                    logger.warning("Replica %d failed its health check: %s", index, e)
+                self.healthy[index] = False
+
+    def start_health_checks(self, interval: float):
+        async def run():
+            while True:
+                await asyncio.sleep(interval)
+                await self.check_health()
+        self._health_task = asyncio.get_running_loop().create_task(run())
+
+    async def stop_health_checks(self):
+        if self._health_task is not None:
+            self._health_task.cancel()
+            try:
+                await self._health_task
+            except asyncio.CancelledError:
+                pass
+            self._health_task = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {"replicas": len(self.replicas), "healthy": self.healthy, "sticky_seconds": self.sticky_seconds, "routed": dict(self.routed)}
+
+def pinned_reads(database: Any) -> AsyncContextManager:
+    """
+    `database.pinned_reads()` for a router (or a wrapper forwarding it); nothing to pin for a plain Database.
+    """
+    pin = getattr(type(database), "pinned_reads", None)
+    return pin(database) if pin is not None else nullcontext()
@@ -1,9 +1,25 @@
 # app/data/DeckRepository.py
-from app.data.BaseRepository import BaseRepository
-from app.domain.DeckModel import Deck, DeckCard, SynergyScore
-from typing import List
+import json
+from app.data.BaseRepository import BaseRepository, EXPORT_CHUNK_SIZE
+from app.domain.DeckModel import Deck, DeckCard, DeckCardDetail, SynergyScore, DeckSummary, DeckValue
+from app.domain.CardModel import Card
+from typing import List, Dict, Any, Mapping, Optional, Tuple
+from datetime import datetime
+from decimal import Decimal
 from uuid import UUID
 
+COLORLESS = "Colorless"
+
+# Preço atual de uma carta: último registro do histórico (projeção Latest_Prices) ou o preço do cadastro
+CARD_PRICE_SQL = "COALESCE((SELECT lp.price FROM Latest_Prices lp WHERE lp.card_id = c.id), c.price, 0)"
+
+def json_path(key: Any) -> str:
+    """
+    Build the MySQL JSON path of an object member, quoting the key so any name is valid.
+    """
+    escaped = str(key).replace("\\", "\\\\").replace('"', '\\"')
+    return f'$."{escaped}"'
+
 class DecksRepository(BaseRepository[Deck]):
     def __init__(self):
         super().__init__("Decks", Deck)
@@ -13,30 +29,124 @@ class DecksRepository(BaseRepository[Deck]):
         rows = await self.database.fetch_all(query=query, values={"user_id": user_id})
         return [self.model(**row) for row in rows]
 
+    async def get_deck_value(self, deck_id: UUID) -> Optional[DeckValue]:
+        """
+        Value a deck (quantity x latest price of each card) in one aggregate query.
+        """
+        row = await self.database.fetch_one(query=self._deck_value_query("d.id = :deck_id"), values={"deck_id": deck_id})
+        return DeckValue(**row) if row else None
+
+    async def get_user_deck_values(self, user_id: UUID) -> List[DeckValue]:
+        """
+        Value every deck of a user in one aggregate query.
+        """
+        rows = await self.database.fetch_all(query=self._deck_value_query("d.user_id = :user_id"), values={"user_id": user_id})
+        return [DeckValue(**row) for row in rows]
+
+    def _deck_value_query(self, condition: str) -> str:
+        # LEFT JOIN a partir de Decks: decks vazios aparecem com valor zero
+        return (
+            f"SELECT d.id AS deck_id, d.name, COALESCE(SUM(dc.quantity), 0) AS total_cards, "
+            "COALESCE(SUM(dc.quantity * COALESCE(lp.price, c.price, 0)), 0) AS deck_value "
+            f"FROM {self.table_name} d LEFT JOIN Deck_Cards dc ON dc.deck_id = d.id "
+            "LEFT JOIN Cards c ON c.id = dc.card_id LEFT JOIN Latest_Prices lp ON lp.card_id = dc.card_id "
+            f"WHERE {condition} GROUP BY d.id, d.name ORDER BY d.id"
+        )
+
 class DeckCardsRepository(BaseRepository[DeckCard]):
+    key_columns = ("deck_id", "card_id")
+
     def __init__(self):
         super().__init__("Deck_Cards", DeckCard)
 
     async def add_card_to_deck(self, deck_id: UUID, card_id: UUID, quantity: int):
-        query = f"SELECT * FROM {self.table_name} WHERE deck_id = :deck_id AND card_id = :card_id"
-        existing_card = await self.database.fetch_one(query=query, values={"deck_id": deck_id, "card_id": card_id})
-        if existing_card:
-            update_query = f"UPDATE {self.table_name} SET quantity = quantity + :quantity WHERE deck_id = :deck_id AND card_id = :card_id"
-            await self.database.execute(query=update_query, values={"deck_id": deck_id, "card_id": card_id, "quantity": quantity})
-        else:
-            insert_query = f"INSERT INTO {self.table_name} (deck_id, card_id, quantity) VALUES (:deck_id, :card_id, :quantity)"
-            await self.database.execute(query=insert_query, values={"deck_id": deck_id, "card_id": card_id, "quantity": quantity})
+        # Upsert atômico: um único comando, sem corrida entre o SELECT e o INSERT
+        query = (
+            f"INSERT INTO {self.table_name} (deck_id, card_id, quantity) VALUES (:deck_id, :card_id, :quantity) "
+            "ON DUPLICATE KEY UPDATE quantity = quantity + VALUES(quantity)"
+        )
+        await self.database.execute(query=query, values={"deck_id": deck_id, "card_id": card_id, "quantity": quantity})
 
-    async def remove_card_from_deck(self, deck_id: UUID, card_id: UUID):
-        query = f"DELETE FROM {self.table_name} WHERE deck_id = :deck_id AND card_id = :card_id"
-        await self.database.execute(query=query, values={"deck_id": deck_id, "card_id": card_id})
+    async def apply_quantity_changes(self, deck_id: UUID, changes: Dict[UUID, int]):
+        """
+        Add each delta to the card's quantity in one transaction: one multi-row upsert
+        followed by one DELETE of the cards whose quantity dropped to zero or below.
+        """
+        placeholders = []
+        values = {"deck_id": deck_id}
+        for i, (card_id, delta) in enumerate(changes.items()):
+            placeholders.append(f"(:deck_id, :card_id_{i}, :quantity_{i})")
+            values[f"card_id_{i}"] = card_id
+            values[f"quantity_{i}"] = delta
+        upsert_query = (
+            f"INSERT INTO {self.table_name} (deck_id, card_id, quantity) VALUES {', '.join(placeholders)} "
+            "ON DUPLICATE KEY UPDATE quantity = quantity + VALUES(quantity)"
+        )
+        delete_query = f"DELETE FROM {self.table_name} WHERE deck_id = :deck_id AND quantity <= 0"
+        async with self._atomic():
+            await self.database.execute(query=upsert_query, values=values)
+            if any(delta < 0 for delta in changes.values()):
+                await self.database.execute(query=delete_query, values={"deck_id": deck_id})
+
+    async def remove_card_from_deck(self, deck_id: UUID, card_id: UUID) -> int:
+        """
+        Remove a card from a deck and return how many copies were removed (0 if it was not in the deck).
+        """
+        values = {"deck_id": deck_id, "card_id": card_id}
+        select_query = f"SELECT quantity FROM {self.table_name} WHERE deck_id = :deck_id AND card_id = :card_id FOR UPDATE"
+        delete_query = f"DELETE FROM {self.table_name} WHERE deck_id = :deck_id AND card_id = :card_id"
+        async with self._atomic():
+            row = await self.database.fetch_one(query=select_query, values=values)
+            if row is None:
+                return 0
+            await self.database.execute(query=delete_query, values=values)
+            return row["quantity"]
+
+    async def touch_deck(self, deck_id: UUID):
+        """
+        Bump the deck's updated_at, the version of its card list. Deck_Cards has no timestamp of its own.
+        """
+        query = "UPDATE Decks SET updated_at = CURRENT_TIMESTAMP(6) WHERE id = :deck_id"
+        await self.database.execute(query=query, values={"deck_id": deck_id})
+
+    async def get_cards_version(self, deck_id: UUID, expand_cards: bool = False) -> Optional[Tuple[datetime, int]]:
+        """
+        Version of a deck's card list: the deck's updated_at (newest card row too when expanded) and
+        the number of cards, which also changes when a card deletion cascades into Deck_Cards.
+        None if the deck does not exist.
+        """
+        updated_at = "GREATEST(d.updated_at, COALESCE(MAX(c.updated_at), d.updated_at))" if expand_cards else "d.updated_at"
+        join = "LEFT JOIN Cards c ON c.id = dc.card_id " if expand_cards else ""
+        query = (
+            f"SELECT {updated_at} AS updated_at, COUNT(dc.card_id) AS cards "
+            f"FROM Decks d LEFT JOIN {self.table_name} dc ON dc.deck_id = d.id {join}"
+            "WHERE d.id = :deck_id GROUP BY d.id, d.updated_at"
+        )
+        row = await self.database.fetch_one(query=query, values={"deck_id": deck_id})
+        return (row["updated_at"], row["cards"]) if row else None
 
     async def get_cards_in_deck(self, deck_id: UUID) -> List[DeckCard]:
         query = f"SELECT * FROM {self.table_name} WHERE deck_id = :deck_id"
         rows = await self.database.fetch_all(query=query, values={"deck_id": deck_id})
         return [self.model(**row) for row in rows]
 
+    async def get_card_details_in_deck(self, deck_id: UUID) -> List[DeckCardDetail]:
+        """
+        Retrieve the cards in a deck together with their full card rows in one JOIN.
+        """
+        query = (
+            f"SELECT dc.deck_id, dc.card_id, dc.quantity, c.* FROM {self.table_name} dc "
+            "JOIN Cards c ON c.id = dc.card_id WHERE dc.deck_id = :deck_id"
+        )
+        rows = await self.database.fetch_all(query=query, values={"deck_id": deck_id})
+        return [
+            DeckCardDetail(deck_id=row["deck_id"], card_id=row["card_id"], quantity=row["quantity"], card=Card(**row))
+            for row in rows
+        ]
+
 class SynergyScoresRepository(BaseRepository[SynergyScore]):
+    key_columns = ("deck_id", "calculated_at")
+
     def __init__(self):
         super().__init__("Synergy_Scores", SynergyScore)
 
@@ -44,3 +154,199 @@ class SynergyScoresRepository(BaseRepository[SynergyScore]):
         query = f"SELECT * FROM {self.table_name} WHERE deck_id = :deck_id ORDER BY calculated_at DESC LIMIT 1"
         row = await self.database.fetch_one(query=query, values={"deck_id": deck_id})
         return self.model(**row) if row else None
+
+    async def get_deck_ids_after(self, after: Optional[str], limit: int, card_ids: Optional[List[UUID]] = None) -> List[str]:
+        """
+        Retrieve the next `limit` deck ids in primary key order, starting after `after`. With
+        `card_ids` only the decks holding any of these cards are returned, each once.
+        """
+        values: Dict[str, Any] = {"limit": limit, **({"after": after} if after is not None else {})}
+        if card_ids is None:
+            keyset = "WHERE id > :after " if after is not None else ""
+            query = f"SELECT id AS deck_id FROM Decks {keyset}ORDER BY id LIMIT :limit"
+        else:
+            cards = {f"card_id_{i}": card_id for i, card_id in enumerate(card_ids)}
+            values.update(cards)
+            keyset = "AND deck_id > :after " if after is not None else ""
+            query = (
+                f"SELECT DISTINCT deck_id FROM Deck_Cards WHERE card_id IN ({', '.join(':' + key for key in cards)}) "
+                f"{keyset}ORDER BY deck_id LIMIT :limit"
+            )
+        rows = await self.database.fetch_all(query=query, values=values)
+        return [str(row["deck_id"]) for row in rows]
+
+    async def load_synergy_rows(self, deck_ids: List[UUID]) -> Tuple[List[Mapping[str, Any]], List[Mapping[str, Any]], List[Mapping[str, Any]]]:
+        """
+        Load the cards, themes and in-deck interactions of these decks with three queries,
+        all driven by the (deck_id, card_id) primary key of Deck_Cards.
+        """
+        values = {f"deck_id_{i}": deck_id for i, deck_id in enumerate(deck_ids)}
+        in_list = ', '.join(':' + key for key in values)
+        cards_query = f"SELECT deck_id, card_id, quantity FROM Deck_Cards WHERE deck_id IN ({in_list})"
+        themes_query = (
+            "SELECT dc.deck_id, ct.card_id, ct.theme FROM Deck_Cards dc "
+            f"JOIN Card_Themes ct ON ct.card_id = dc.card_id WHERE dc.deck_id IN ({in_list})"
+        )
+        # Só interessam os pares em que as duas cartas estão no mesmo deck
+        interactions_query = (
+            "SELECT a.deck_id, ci.card_id_1, ci.card_id_2 FROM Deck_Cards a "
+            "JOIN Card_Interactions ci ON ci.card_id_1 = a.card_id "
+            "JOIN Deck_Cards b ON b.deck_id = a.deck_id AND b.card_id = ci.card_id_2 "
+            f"WHERE a.deck_id IN ({in_list})"
+        )
+        cards = await self.database.fetch_all(query=cards_query, values=values)
+        themes = await self.database.fetch_all(query=themes_query, values=values)
+        interactions = await self.database.fetch_all(query=interactions_query, values=values)
+        return cards, themes, interactions
+
+class DeckSummaryRepository(BaseRepository[DeckSummary]):
+    """
+    Materialised per-deck summary kept current with small deltas, so reading it is a primary key lookup.
+    """
+    key_columns = ("deck_id",)
+
+    def __init__(self):
+        super().__init__("Deck_Summary", DeckSummary)
+
+    async def get_summary(self, deck_id: UUID) -> Optional[DeckSummary]:
+        query = f"SELECT * FROM {self.table_name} WHERE deck_id = :deck_id"
+        row = await self.database.fetch_one(query=query, values={"deck_id": deck_id})
+        return self._to_summary(row) if row else None
+
+    async def get_summaries(self, deck_ids: List[UUID]) -> List[DeckSummary]:
+        """
+        Retrieve the summaries of many decks in one query, e.g. for a deck list page.
+        """
+        if not deck_ids:
+            return []
+        values = {f"deck_id_{i}": deck_id for i, deck_id in enumerate(deck_ids)}
+        query = f"SELECT * FROM {self.table_name} WHERE deck_id IN ({', '.join(':' + key for key in values)})"
+        rows = await self.database.fetch_all(query=query, values=values)
+        return [self._to_summary(row) for row in rows]
+
+    async def apply_card_delta(self, deck_id: UUID, card_id: UUID, delta: int):
+        """
+        Add `delta` copies of a card to the deck's summary: the card count, its mana cost
+        bucket, its color bucket and the deck value all move in one UPDATE. A deck with no
+        summary row yet gets it rebuilt from Deck_Cards, since the delta alone does not describe it.
+        """
+        if delta == 0:
+            return
+        card_query = f"SELECT c.mana_cost, c.color, {CARD_PRICE_SQL} AS price FROM Cards c WHERE c.id = :card_id"
+        card = await self.database.fetch_one(query=card_query, values={"card_id": card_id})
+        if card is None:
+            return
+        cost_key, color_key = str(card["mana_cost"]), card["color"] or COLORLESS
+        query = (
+            f"UPDATE {self.table_name} SET total_cards = total_cards + :delta, "
+            "mana_curve = JSON_SET(mana_curve, :cost_path, COALESCE(JSON_EXTRACT(mana_curve, :cost_path), 0) + :delta), "
+            "color_distribution = JSON_SET(color_distribution, :color_path, COALESCE(JSON_EXTRACT(color_distribution, :color_path), 0) + :delta), "
+            "deck_value = deck_value + :value_delta WHERE deck_id = :deck_id"
+        )
+        values = {
+            "deck_id": deck_id, "delta": delta, "cost_path": json_path(cost_key), "color_path": json_path(color_key),
+            "value_delta": Decimal(card["price"]) * delta,
+        }
+        async with self._atomic():
+            # delta != 0 sempre muda total_cards, então 0 linhas afetadas quer dizer que o resumo não existe
+            updated = await self.database.execute(query=query, values=values)
+            if not updated:
+                await self.rebuild([deck_id])
+
+    async def apply_price_change(self, card_id: UUID, price_delta: Decimal):
+        """
+        Move the value of every deck holding the card by quantity * price change, in one UPDATE.
+        """
+        if price_delta == 0:
+            return
+        query = (
+            f"UPDATE {self.table_name} ds JOIN Deck_Cards dc ON dc.deck_id = ds.deck_id "
+            "SET ds.deck_value = ds.deck_value + dc.quantity * :price_delta WHERE dc.card_id = :card_id"
+        )
+        await self.database.execute(query=query, values={"card_id": card_id, "price_delta": price_delta})
+
+    async def refresh_values_for_cards(self, card_ids: List[UUID]):
+        """
+        Recompute the value of the decks holding any of these cards, e.g. after a bulk price import.
+        """
+        if not card_ids:
+            return
+        values = {f"card_id_{i}": card_id for i, card_id in enumerate(card_ids)}
+        query = (
+            f"UPDATE {self.table_name} ds SET ds.deck_value = ("
+            f"SELECT COALESCE(SUM(dc.quantity * {CARD_PRICE_SQL}), 0) FROM Deck_Cards dc "
+            "JOIN Cards c ON c.id = dc.card_id WHERE dc.deck_id = ds.deck_id) "
+            f"WHERE ds.deck_id IN (SELECT deck_id FROM Deck_Cards WHERE card_id IN ({', '.join(':' + key for key in values)}))"
+        )
+        await self.database.execute(query=query, values=values)
+
+    async def rebuild(self, deck_ids: List[UUID]) -> List[DeckSummary]:
+        """
+        Recompute the summaries of these decks from Deck_Cards, Cards and Price_History,
+        replacing whatever drifted. Decks without cards get an empty summary; ids of decks
+        that do not exist are skipped.
+        """
+        if not deck_ids:
+            return []
+        values = {f"deck_id_{i}": deck_id for i, deck_id in enumerate(deck_ids)}
+        in_list = ', '.join(':' + key for key in values)
+        existing = await self.database.fetch_all(query=f"SELECT id FROM Decks WHERE id IN ({in_list})", values=values)
+        if not existing:
+            return []
+        values = {f"deck_id_{i}": row["id"] for i, row in enumerate(existing)}
+        query = (
+            f"SELECT dc.deck_id, dc.quantity, c.mana_cost, c.color, {CARD_PRICE_SQL} AS price "
+            f"FROM Deck_Cards dc JOIN Cards c ON c.id = dc.card_id WHERE dc.deck_id IN ({', '.join(':' + key for key in values)})"
+        )
+        rows = await self.database.fetch_all(query=query, values=values)
+        summaries = {str(deck_id): DeckSummary(deck_id=deck_id) for deck_id in values.values()}
+        for row in rows:
+            self._accumulate(summaries[str(row["deck_id"])], row)
+        placeholders, write_values = [], {}
+        for i, summary in enumerate(summaries.values()):
+            placeholders.append(f"(:deck_id_{i}, :total_cards_{i}, :mana_curve_{i}, :color_distribution_{i}, :deck_value_{i})")
+            write_values.update({
+                f"deck_id_{i}": summary.deck_id, f"total_cards_{i}": summary.total_cards,
+                f"mana_curve_{i}": json.dumps(summary.mana_curve), f"color_distribution_{i}": json.dumps(summary.color_distribution),
+                f"deck_value_{i}": summary.deck_value,
+            })
+        write_query = (
+            f"INSERT INTO {self.table_name} (deck_id, total_cards, mana_curve, color_distribution, deck_value) "
+            f"VALUES {', '.join(placeholders)} ON DUPLICATE KEY UPDATE total_cards = VALUES(total_cards), "
+            "mana_curve = VALUES(mana_curve), color_distribution = VALUES(color_distribution), deck_value = VALUES(deck_value)"
+        )
+        await self.database.execute(query=write_query, values=write_values)
+        return list(summaries.values())
+
+    async def rebuild_all(self, chunk_size: int = EXPORT_CHUNK_SIZE) -> int:
+        """
+        Rebuild the summary of every deck, walking Decks in keyset chunks. Returns how many were rebuilt.
+        """
+        rebuilt, after = 0, None
+        while True:
+            keyset = "WHERE id > :after " if after is not None else ""
+            query = f"SELECT id FROM Decks {keyset}ORDER BY id LIMIT :limit"
+            values = {"limit": chunk_size, **({"after": after} if after is not None else {})}
+            deck_ids = [row["id"] for row in await self.database.fetch_all(query=query, values=values)]
+            if not deck_ids:
+                return rebuilt
+            await self.rebuild(deck_ids)
+            rebuilt += len(deck_ids)
+            after = deck_ids[-1]
+
+    @staticmethod
+    def _accumulate(summary: DeckSummary, row: Mapping[str, Any]):
+        quantity = row["quantity"]
+        color = row["color"] or COLORLESS
+        summary.total_cards += quantity
+        summary.mana_curve[row["mana_cost"]] = summary.mana_curve.get(row["mana_cost"], 0) + quantity
+        summary.color_distribution[color] = summary.color_distribution.get(color, 0) + quantity
+        summary.deck_value += Decimal(row["price"]) * quantity
+
+    def _to_summary(self, row: Mapping[str, Any]) -> DeckSummary:
+        # O driver devolve colunas JSON como texto; baldes zerados por remoções são omitidos
+        data = dict(row)
+        for column in ("mana_curve", "color_distribution"):
+            histogram = json.loads(data[column]) if isinstance(data[column], (str, bytes)) else data[column]
+            data[column] = {key: count for key, count in histogram.items() if count}
+        return self.model(**data)
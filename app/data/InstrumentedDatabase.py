@@ -0,0 +1,133 @@
+# app/data/InstrumentedDatabase.py
+import asyncio
+import heapq
+import json
+import logging
+import time
+from contextvars import ContextVar
+from typing import Any, AsyncIterator, Dict, List, Mapping, Optional, Tuple
+from app.data.DatabaseRouter import pinned_reads
+
+logger = logging.getLogger(__name__)
+
+SLOWEST_KEPT = 3  # Consultas mais lentas guardadas por requisição
+EXPLAIN_PREFIXES = ("SELECT", "WITH")
+
+class QueryStats:
+    """
+    SQL statements issued while serving one request: count, total time and the slowest ones.
+    """
+    def __init__(self, keep_slowest: int = SLOWEST_KEPT):
+        self.keep_slowest = keep_slowest
+        self.count = 0
+        self.total_time = 0.0
+        self._slowest: List[Tuple[float, int, str]] = []  # min-heap de (duração, ordem, sql)
+
+    def record(self, sql: str, elapsed: float):
+        self.count += 1
+        self.total_time += elapsed
+        entry = (elapsed, self.count, sql)
+        if len(self._slowest) < self.keep_slowest:
+            heapq.heappush(self._slowest, entry)
+        elif elapsed > self._slowest[0][0]:
+            heapq.heapreplace(self._slowest, entry)
+
+    @property
+    def slowest(self) -> List[Tuple[float, str]]:
+        return [(elapsed, sql) for elapsed, _, sql in sorted(self._slowest, reverse=True)]
+
+# Estatísticas da requisição atual, criadas pelo middleware de app.core.instrumentation
+current_query_stats: ContextVar[Optional[QueryStats]] = ContextVar("current_query_stats", default=None)
+
+class InstrumentedDatabase:
+    """
+    Wrapper around `BaseRepository.database` that times every statement, adds it to the current
+    request's QueryStats and logs statements slower than `slow_query_seconds`, with their EXPLAIN plan.
+    Attributes it does not instrument (e.g. the DatabaseRouter methods) are delegated unchanged.
+    """
+    def __init__(self, database: Any, slow_query_seconds: float = 0.5, explain_slow_queries: bool = True):
+        self.database = database
+        self.slow_query_seconds = slow_query_seconds
+        self.explain_slow_queries = explain_slow_queries
+        self._explains: set = set()
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.database, name)
+
+    async def execute(self, query: Any, values: Optional[Dict[str, Any]] = None) -> Any:
+        started = time.perf_counter()
+        try:
+            return await self.database.execute(query=query, values=values)
+        finally:
+            self._record(query, values, time.perf_counter() - started)
+
+    async def execute_many(self, query: Any, values: List[Dict[str, Any]]):
+        started = time.perf_counter()
+        try:
+            await self.database.execute_many(query=query, values=values)
+        finally:
+            self._record(query, None, time.perf_counter() - started)
+
+    async def fetch_one(self, query: Any, values: Optional[Dict[str, Any]] = None) -> Any:
+        started = time.perf_counter()
+        try:
+            return await self.database.fetch_one(query=query, values=values)
+        finally:
+            self._record(query, values, time.perf_counter() - started)
+
+    async def fetch_all(self, query: Any, values: Optional[Dict[str, Any]] = None) -> List[Any]:
+        started = time.perf_counter()
+        try:
+            return await self.database.fetch_all(query=query, values=values)
+        finally:
+            self._record(query, values, time.perf_counter() - started)
+
+    async def fetch_val(self, query: Any, values: Optional[Dict[str, Any]] = None, column: Any = 0) -> Any:
+        started = time.perf_counter()
+        try:
+            return await self.database.fetch_val(query=query, values=values, column=column)
+        finally:
+            self._record(query, values, time.perf_counter() - started)
+
+    async def iterate(self, query: Any, values: Optional[Dict[str, Any]] = None) -> AsyncIterator[Mapping[str, Any]]:
+        # Conta só o tempo esperando linhas do banco, não o tempo do consumidor entre elas
+        elapsed = 0.0
+        rows = self.database.iterate(query=query, values=values).__aiter__()
+        try:
+            while True:
+                started = time.perf_counter()
+                try:
+                    row = await rows.__anext__()
+                except StopAsyncIteration:
+                    break
+                finally:
+                    elapsed += time.perf_counter() - started
+                yield row
+        finally:
+            self._record(query, values, elapsed)
+
+    def transaction(self, **kwargs: Any):
+        return self.database.transaction(**kwargs)
+
+    def pinned_reads(self):
+        return pinned_reads(self.database)
+
+    def _record(self, query: Any, values: Optional[Dict[str, Any]], elapsed: float):
+        sql = " ".join(str(query).split())
+        stats = current_query_stats.get()
+        if stats is not None:
+            stats.record(sql, elapsed)
+        if self.slow_query_seconds > 0 and elapsed >= self.slow_query_seconds:
+            # O EXPLAIN roda fora do caminho da requisição
+            task = asyncio.get_running_loop().create_task(self._log_slow_query(sql, values, elapsed))
+            self._explains.add(task)
+            task.add_done_callback(self._explains.discard)
+
+    async def _log_slow_query(self, sql: str, values: Optional[Dict[str, Any]], elapsed: float):
+        plan = None
+        if self.explain_slow_queries and sql.upper().startswith(EXPLAIN_PREFIXES):
+            try:
+                plan = [dict(row._mapping) if hasattr(row, "_mapping") else dict(row) for row in await self.database.fetch_all(query="EXPLAIN " + sql, values=values)]
+            except Exception as e:
+                plan = f"EXPLAIN failed: {e}"
+        logger.warning(json.dumps({"event": "slow_query", "duration_ms": round(1000 * elapsed, 3), "sql": sql, "explain": plan}, default=str))
@@ -0,0 +1,182 @@
+# app/data/InteractionGraph.py
+from typing import Dict, Hashable, Iterable, List, Set, Tuple
+import numpy as np
+
+COMPACT_THRESHOLD = 1024  # Arestas pendentes antes de reconstruir os arrays CSR
+
+class InteractionGraph:
+    """
+    In-memory, undirected card interaction graph. Card ids are remapped to dense integers and
+    adjacency is kept in CSR form (`indptr`, `indices`); edges added after the build go to a
+    small pending set that is merged into the CSR arrays once it grows past COMPACT_THRESHOLD.
+    Removed cards keep their dense slot, with no edges, until the next build.
+    """
+    def __init__(self, compact_threshold: int = COMPACT_THRESHOLD):
+        self.compact_threshold = compact_threshold
+        self._index: Dict[str, int] = {}
+        self._ids: List[str] = []
+        self._indptr = np.zeros(1, dtype=np.int64)
+        self._indices = np.zeros(0, dtype=np.int64)
+        self._pending: Dict[int, Set[int]] = {}
+        self._pending_edges = 0
+        self.ready = False
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    @property
+    def edge_count(self) -> int:
+        return len(self._indices) // 2 + self._pending_edges
+
+    def build(self, edges: Iterable[Tuple[Hashable, Hashable]]):
+        """
+        Build the CSR arrays from (card_id_1, card_id_2) pairs and mark the graph as ready.
+        """
+        sources, targets = [], []
+        for card_a, card_b in edges:
+            a, b = self._node(card_a), self._node(card_b)
+            if a != b:
+                sources.append(a)
+                targets.append(b)
+        self._compact(np.array(sources, dtype=np.int64), np.array(targets, dtype=np.int64))
+        self.ready = True
+
+    def add_edge(self, card_a: Hashable, card_b: Hashable):
+        """
+        Record a new interaction without rebuilding the CSR arrays.
+        """
+        a, b = self._node(card_a), self._node(card_b)
+        if a == b or b in self._pending.get(a, ()) or b in self._csr_row(a):
+            return
+        self._pending.setdefault(a, set()).add(b)
+        self._pending.setdefault(b, set()).add(a)
+        self._pending_edges += 1
+        if self._pending_edges >= self.compact_threshold:
+            self._compact(np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64))
+
+    def remove_node(self, card_id: Hashable):
+        """
+        Drop a card and every interaction it takes part in, e.g. after the card was deleted.
+        """
+        node = self._index.pop(str(card_id), None)
+        if node is None:
+            return
+        for neighbour in self._pending.pop(node, ()):
+            self._pending[neighbour].discard(node)
+            if not self._pending[neighbour]:
+                del self._pending[neighbour]
+            self._pending_edges -= 1
+        # Filtra as duas direções da linha no CSR sem reordenar: as linhas continuam ordenadas
+        rows = len(self._indptr) - 1
+        sources = np.repeat(np.arange(rows), np.diff(self._indptr))
+        keep = (sources != node) & (self._indices != node)
+        if not keep.all():
+            self._indptr = np.concatenate([[0], np.cumsum(np.bincount(sources[keep], minlength=rows))]).astype(np.int64)
+            self._indices = self._indices[keep]
+
+    def neighbourhood(self, card_id: Hashable, depth: int = 1, limit: int = 1000) -> List[Tuple[str, int]]:
+        """
+        Cards within `depth` hops of a card, as (card_id, distance) pairs, nearest first.
+        """
+        start = self._index.get(str(card_id))
+        if start is None:
+            return []
+        distance = np.full(len(self._ids), -1, dtype=np.int64)
+        distance[start] = 0
+        frontier = np.array([start], dtype=np.int64)
+        for hop in range(1, depth + 1):
+            reached = np.unique(self._neighbours(frontier))
+            frontier = reached[distance[reached] < 0]
+            if not len(frontier):
+                break
+            distance[frontier] = hop
+        found = np.flatnonzero(distance > 0)
+        found = found[np.argsort(distance[found], kind="stable")][:limit]
+        return [(self._ids[node], int(distance[node])) for node in found]
+
+    def common_neighbours(self, card_ids: List[Hashable], limit: int = 1000) -> List[str]:
+        """
+        Cards that interact with every one of `card_ids`.
+        """
+        nodes = [self._index.get(str(card_id)) for card_id in card_ids]
+        if not nodes or None in nodes:
+            return []
+        nodes = np.unique(np.array(nodes, dtype=np.int64))
+        counts = np.bincount(self._neighbours(nodes), minlength=len(self._ids))
+        counts[nodes] = 0
+        return [self._ids[node] for node in np.flatnonzero(counts == len(nodes))[:limit]]
+
+    def suggest(self, deck: List[Tuple[Hashable, int]], limit: int = 20) -> List[Tuple[str, float]]:
+        """
+        Top cards outside a partial deck, scored by how many copies in the deck they interact with.
+        """
+        known = [(self._index[str(card_id)], quantity) for card_id, quantity in deck if str(card_id) in self._index]
+        if not known:
+            return []
+        nodes = np.array([node for node, _ in known], dtype=np.int64)
+        quantities = np.array([quantity for _, quantity in known], dtype=np.float64)
+        neighbours, owners = self._neighbours(nodes, with_owners=True)
+        scores = np.bincount(neighbours, weights=quantities[owners], minlength=len(self._ids))
+        scores[nodes] = 0.0
+        candidates = np.flatnonzero(scores > 0)
+        if len(candidates) > limit:
+            candidates = candidates[np.argpartition(-scores[candidates], limit - 1)[:limit]]
+        candidates = candidates[np.argsort(-scores[candidates], kind="stable")]
+        return [(self._ids[node], float(scores[node])) for node in candidates]
+
+    def _node(self, card_id: Hashable) -> int:
+        key = str(card_id)
+        node = self._index.get(key)
+        if node is None:
+            node = self._index[key] = len(self._ids)
+            self._ids.append(key)
+        return node
+
+    def _csr_row(self, node: int) -> np.ndarray:
+        if node + 1 >= len(self._indptr):
+            return self._indices[:0]
+        return self._indices[self._indptr[node]:self._indptr[node + 1]]
+
+    def _neighbours(self, nodes: np.ndarray, with_owners: bool = False):
+        """
+        Concatenated adjacency rows of `nodes` (CSR plus pending edges), gathered without a Python loop
+        over the CSR part. With `with_owners` also returns, per neighbour, the position of its source node.
+        """
+        in_csr = nodes < len(self._indptr) - 1
+        rows = np.where(in_csr, nodes, 0)
+        starts = self._indptr[rows]
+        lengths = np.where(in_csr, self._indptr[rows + 1] - starts, 0)
+        total = int(lengths.sum())
+        # Posição de cada vizinho em `indices`: início da linha + deslocamento dentro dela
+        offsets = np.repeat(starts - np.cumsum(lengths) + lengths, lengths) + np.arange(total)
+        neighbours = self._indices[offsets]
+        owners = np.repeat(np.arange(len(nodes)), lengths)
+        if self._pending:
+            extra = [(position, neighbour) for position, node in enumerate(nodes.tolist()) for neighbour in self._pending.get(node, ())]
+            if extra:
+                extra_owners, extra_neighbours = np.array(extra, dtype=np.int64).T
+                neighbours = np.concatenate([neighbours, extra_neighbours])
+                owners = np.concatenate([owners, extra_owners])
+        return (neighbours, owners) if with_owners else neighbours
+
+    def _compact(self, sources: np.ndarray, targets: np.ndarray):
+        """
+        Rebuild the CSR arrays from the current arrays, the pending edges and the given new edges.
+        """
+        old_sources = np.repeat(np.arange(len(self._indptr) - 1), np.diff(self._indptr))
+        pending = [(a, b) for a, neighbours in self._pending.items() for b in neighbours]
+        pending_sources, pending_targets = (np.array(pending, dtype=np.int64).T if pending else (np.zeros(0, dtype=np.int64),) * 2)
+        # Arestas novas entram nos dois sentidos; as do CSR e as pendentes já estão simétricas
+        all_sources = np.concatenate([old_sources, pending_sources, sources, targets])
+        all_targets = np.concatenate([self._indices, pending_targets, targets, sources])
+        n = len(self._ids)
+        # Ordena por (origem, destino) e remove arestas repetidas
+        order = np.lexsort((all_targets, all_sources))
+        all_sources, all_targets = all_sources[order], all_targets[order]
+        keep = np.ones(len(all_sources), dtype=bool)
+        keep[1:] = (all_sources[1:] != all_sources[:-1]) | (all_targets[1:] != all_targets[:-1])
+        all_sources, all_targets = all_sources[keep], all_targets[keep]
+        self._indptr = np.concatenate([[0], np.cumsum(np.bincount(all_sources, minlength=n))]).astype(np.int64)
+        self._indices = all_targets
+        self._pending = {}
+        self._pending_edges = 0
@@ -0,0 +1,91 @@
+# app/data/SearchIndex.py
+import unicodedata
+from collections import Counter
+from typing import Any, Dict, Hashable, Iterable, List, Set, Tuple
+
+def normalize(text: str) -> str:
+    """
+    Lowercase, strip accents and collapse whitespace so "Éter  Vivo" matches "eter vivo".
+    """
+    decomposed = unicodedata.normalize("NFKD", text)
+    stripped = "".join(char for char in decomposed if not unicodedata.combining(char))
+    return " ".join(stripped.casefold().split())
+
+def trigrams(text: str) -> Set[str]:
+    # O preenchimento com espaços gera trigramas de início de palavra, que favorecem buscas por prefixo
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+class TrigramIndex:
+    """
+    In-memory trigram index over card names, answering prefix and fuzzy queries without the database.
+    Documents are kept under compact integer ids; postings map each trigram to the set of those ids.
+    """
+    def __init__(self):
+        self._postings: Dict[str, Set[int]] = {}
+        self._doc_ids: Dict[Hashable, int] = {}
+        self._docs: Dict[int, Tuple[Hashable, str, str, int]] = {}  # key, nome, nome normalizado, nº de trigramas
+        self._next_id = 0
+        self.ready = False
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    def build(self, documents: Iterable[Tuple[Hashable, str]]):
+        """
+        Index (key, name) pairs and mark the index as ready to serve queries.
+        """
+        for key, name in documents:
+            self.add(key, name)
+        self.ready = True
+
+    def add(self, key: Hashable, name: str):
+        """
+        Index a document, replacing its previous name if it was already indexed.
+        """
+        key = str(key)
+        self.remove(key)
+        doc_id = self._next_id
+        self._next_id += 1
+        normalized = normalize(name)
+        grams = trigrams(normalized)
+        for gram in grams:
+            self._postings.setdefault(gram, set()).add(doc_id)
+        self._doc_ids[key] = doc_id
+        self._docs[doc_id] = (key, name, normalized, len(grams))
+
+    def remove(self, key: Hashable):
+        doc_id = self._doc_ids.pop(str(key), None)
+        if doc_id is None:
+            return
+        _, _, normalized, _ = self._docs.pop(doc_id)
+        for gram in trigrams(normalized):
+            postings = self._postings.get(gram)
+            if postings is not None:
+                postings.discard(doc_id)
+                if not postings:
+                    del self._postings[gram]
+
+    def search(self, query: str, limit: int = 20, offset: int = 0, min_score: float = 0.2) -> List[Dict[str, Any]]:
+        """
+        Rank documents by trigram similarity to the query, boosting prefix and substring matches.
+        """
+        normalized = normalize(query)
+        if not normalized:
+            return []
+        query_grams = trigrams(normalized)
+        shared: Counter = Counter()
+        for gram in query_grams:
+            shared.update(self._postings.get(gram, ()))
+        results = []
+        for doc_id, count in shared.items():
+            key, name, doc_normalized, doc_size = self._docs[doc_id]
+            score = count / (len(query_grams) + doc_size - count)
+            if doc_normalized.startswith(normalized):
+                score += 1.0
+            elif normalized in doc_normalized:
+                score += 0.5
+            if score >= min_score:
+                results.append({"id": key, "name": name, "score": round(score, 4)})
+        results.sort(key=lambda result: (-result["score"], result["name"]))
+        return results[offset:offset + limit]
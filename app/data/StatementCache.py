@@ -0,0 +1,79 @@
+# app/data/StatementCache.py
+import re
+from typing import Any, Callable, Dict, Hashable, Mapping, Optional, Tuple
+from databases import Database
+
+_NAMED_PARAM = re.compile(r"(?<![:\w]):(\w+)")
+MAX_STATEMENTS = 4096  # Limite de comandos guardados; acima dele os novos são montados sem guardar
+
+class Statement(str):
+    """
+    SQL text with `:named` parameters (usable anywhere a query string is), plus the same
+    statement rewritten once for the MySQL driver: positional `%s` placeholders and the
+    parameter names in placeholder order.
+    """
+    params: Tuple[str, ...]
+    driver_sql: str
+
+    def __new__(cls, sql: str) -> "Statement":
+        statement = super().__new__(cls, sql)
+        statement.params = tuple(_NAMED_PARAM.findall(sql))
+        # O pyformat do driver trata % como especial, então literais % são escapados
+        statement.driver_sql = _NAMED_PARAM.sub("%s", sql.replace("%", "%%"))
+        return statement
+
+    def driver_args(self, values: Mapping[str, Any]) -> list:
+        return [values[name] for name in self.params]
+
+class StatementCache:
+    """
+    Statements built once per (table, operation, column set) key, with hit/miss counters.
+    """
+    def __init__(self, max_statements: int = MAX_STATEMENTS):
+        self.max_statements = max_statements
+        self._statements: Dict[Hashable, Statement] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable, build: Callable[[], str]) -> Statement:
+        statement = self._statements.get(key)
+        if statement is None:
+            self.misses += 1
+            statement = Statement(build())
+            if len(self._statements) < self.max_statements:
+                self._statements[key] = statement
+        else:
+            self.hits += 1
+        return statement
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "statements": len(self._statements),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+# Cache do processo, compartilhado pelos repositórios e exposto em /internal/metrics
+statement_cache = StatementCache()
+
+class StatementDatabase(Database):
+    """
+    Database that runs cached `Statement`s on MySQL straight through the driver cursor, skipping the
+    SQLAlchemy text parsing and compilation `databases` does for every call. Plain query strings, and
+    every statement on other backends, take the normal path.
+    """
+    async def execute(self, query: Any, values: Optional[Dict[str, Any]] = None) -> Any:
+        if not isinstance(query, Statement) or self.url.dialect != "mysql":
+            return await super().execute(query=query, values=values)
+        # Usa a conexão da task (a mesma de uma transação aberta) e o mesmo lock que o `databases`
+        async with self.connection() as connection:
+            async with connection._query_lock:
+                cursor = await connection.raw_connection.cursor()
+                try:
+                    await cursor.execute(query.driver_sql, query.driver_args(values or {}))
+                    # Mesmo retorno do MySQLConnection.execute: lastrowid, ou linhas afetadas
+                    return cursor.rowcount if cursor.lastrowid == 0 else cursor.lastrowid
+                finally:
+                    await cursor.close()
@@ -0,0 +1,62 @@
+# app/data/UnitOfWork.py
+import inspect
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from typing import Any, AsyncIterator, Awaitable, Callable, List, Optional, Union
+
+AfterCommit = Callable[[], Union[None, Awaitable[None]]]
+
+class UnitOfWork:
+    """
+    One business operation: every repository call made inside it, from the same task, runs on one
+    connection and commits once at the end. Work that must only happen if the operation commits
+    (cache invalidation, in-process indexes) is queued with `after_commit`.
+    """
+    def __init__(self, database: Any):
+        self.database = database
+        self._after_commit: List[AfterCommit] = []
+
+    def after_commit(self, callback: AfterCommit):
+        self._after_commit.append(callback)
+
+    async def _run_after_commit(self):
+        for callback in self._after_commit:
+            result = callback()
+            if inspect.isawaitable(result):
+                await result
+
+# Unidade aberta na task atual; tasks filhas (asyncio.gather) herdam o valor mas não a conexão
+current_unit_of_work: ContextVar[Optional[UnitOfWork]] = ContextVar("current_unit_of_work", default=None)
+
+@asynccontextmanager
+async def unit_of_work(database: Any) -> AsyncIterator[UnitOfWork]:
+    """
+    Open a unit of work on `database`, or join the one already open in this task so that nested
+    service calls share its single commit instead of each committing (or opening a savepoint).
+    Transactions the repositories open inside it become savepoints. Statements must be awaited
+    in this task: `asyncio.gather` children get their own connection, outside the transaction.
+    """
+    current = current_unit_of_work.get()
+    if current is not None:
+        yield current
+        return
+    unit = UnitOfWork(database)
+    token = current_unit_of_work.set(unit)
+    try:
+        async with database.transaction():
+            yield unit
+    finally:
+        current_unit_of_work.reset(token)
+    await unit._run_after_commit()
+
+async def after_commit(callback: AfterCommit):
+    """
+    Run `callback` once the current unit of work commits, or right away outside of one.
+    """
+    unit = current_unit_of_work.get()
+    if unit is not None:
+        unit.after_commit(callback)
+        return
+    result = callback()
+    if inspect.isawaitable(result):
+        await result
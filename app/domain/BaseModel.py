@@ -1,10 +1,34 @@
 from pydantic import BaseModel as PydanticBaseModel
-from typing import Optional
+from typing import Generic, List, Optional, TypeVar
+from uuid import UUID
 
 class BaseModel(PydanticBaseModel):
-    id: Optional[int] = None
+    id: Optional[UUID] = None  # As chaves das tabelas são CHAR(36) com DEFAULT (UUID())
 
     # Método para conversão para dicionário com `dict()`
     def dict(self, *args, **kwargs):
         # Inclui 'id' no dicionário apenas se estiver definido
+        # Usa os aliases para que as chaves coincidam com os nomes das colunas (ex.: `_type`)
+        kwargs.setdefault("by_alias", True)
         return super().dict(*args, exclude_unset=True, *args, **kwargs)
+
+T = TypeVar('T')
+
+class Page(PydanticBaseModel, Generic[T]):
+    """
+    One page of a keyset-paginated listing. `next_cursor` is passed back as `after`
+    to fetch the following page and is None on the last page.
+    """
+    items: List[T]
+    next_cursor: Optional[str] = None
+
+class BulkRowError(PydanticBaseModel):
+    index: int  # Posição da linha no corpo da requisição
+    error: str
+
+class BulkResult(PydanticBaseModel):
+    """
+    Outcome of a bulk upsert: how many rows were written and which ones failed.
+    """
+    processed: int = 0
+    failed: List[BulkRowError] = []
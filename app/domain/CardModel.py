@@ -1,20 +1,25 @@
 from decimal import Decimal
-from datetime import date
+from datetime import date, datetime
 from app.domain.BaseModel import BaseModel
-from typing import Optional
+from pydantic import BaseModel as PydanticBaseModel, ConfigDict, Field
+from typing import Dict, List, Optional
 from uuid import UUID
 
 class Card(BaseModel):
+    # `_type` e `_set` seriam atributos privados no Pydantic, por isso usamos aliases
+    model_config = ConfigDict(populate_by_name=True)
+
     id: UUID  # Primary identifier is a UUID
     name: str
-    _type: str
+    type_: str = Field(alias="_type")
     mana_cost: int
     color: Optional[str] = None
     power: Optional[int] = None
     toughness: Optional[int] = None
     effect: Optional[str] = None
-    _set: Optional[str] = None
+    set_: Optional[str] = Field(None, alias="_set")
     price: Optional[Decimal] = None
+    updated_at: Optional[datetime] = None  # Mantido pelo MySQL; é a versão usada no ETag
 
 class CardTheme(BaseModel):
     card_id: UUID  # Changed to UUID
@@ -28,4 +33,63 @@ class CardInteraction(BaseModel):
 class PriceHistory(BaseModel):
     card_id: UUID  # Changed from str to UUID
     price: Decimal
-    date: date
\ No newline at end of file
+    date: date
+
+class PriceCandle(PydanticBaseModel):
+    date: date  # Início do intervalo (dia, segunda-feira da semana ou dia 1 do mês)
+    open: Decimal
+    high: Decimal
+    low: Decimal
+    close: Decimal
+    samples: int = 1  # Registros de preço agregados no intervalo
+
+class CardSearchResult(BaseModel):
+    id: UUID
+    name: str
+    score: float  # Relevância; maior é melhor
+
+class InteractionNeighbour(PydanticBaseModel):
+    card_id: UUID
+    distance: int  # Número de saltos a partir da carta consultada
+
+class CardSuggestion(PydanticBaseModel):
+    card_id: UUID
+    score: float  # Cópias do deck com que a carta interage
+
+class CardFilter(PydanticBaseModel):
+    """
+    Combination of card attribute filters. Every field is optional; lists match any of their values
+    and ranges are inclusive.
+    """
+    min_mana_cost: Optional[int] = Field(None, ge=0)
+    max_mana_cost: Optional[int] = Field(None, ge=0)
+    types: Optional[List[str]] = Field(None, max_length=50)
+    colors: Optional[List[str]] = Field(None, max_length=50)
+    min_power: Optional[int] = None
+    max_power: Optional[int] = None
+    min_toughness: Optional[int] = None
+    max_toughness: Optional[int] = None
+    sets: Optional[List[str]] = Field(None, max_length=50)
+    min_price: Optional[Decimal] = Field(None, ge=0)
+    max_price: Optional[Decimal] = Field(None, ge=0)
+    themes: Optional[List[str]] = Field(None, max_length=50)
+
+class CardStats(PydanticBaseModel):
+    """
+    Aggregate of one numeric card attribute over the cards of a group (a type, color or set).
+    Cards with no value for the attribute count in `cards` but not in the other fields.
+    """
+    group: Optional[str]  # None agrupa as cartas sem valor na coluna (ex.: incolores)
+    cards: int
+    count: int
+    mean: Optional[float] = None
+    min: Optional[float] = None
+    max: Optional[float] = None
+    total: Optional[float] = None
+
+class CardDistribution(PydanticBaseModel):
+    """
+    Number of cards per value of an integer attribute (e.g. the mana curve) in a group.
+    """
+    group: Optional[str]
+    counts: Dict[int, int]
@@ -1,11 +1,13 @@
 from app.domain.BaseModel import BaseModel
-from typing import Optional
+from app.domain.CardModel import Card
+from pydantic import BaseModel as PydanticBaseModel
+from typing import Dict, List, Optional
 from decimal import Decimal
-from datetime import date
+from datetime import date, datetime
 from uuid import UUID
 
 class Deck(BaseModel):
-    id: UUID  # Primary identifier is a UUID
+    id: Optional[UUID] = None  # Primary identifier is a UUID, generated on create when missing
     user_id: UUID  # Changed from str to UUID
     name: str
 
@@ -13,8 +15,30 @@ class DeckCard(BaseModel):
     deck_id: UUID  # Changed from str to UUID
     card_id: UUID  # Changed from str to UUID
     quantity: Optional[int] = 1
-    
+
+class DeckCardDetail(DeckCard):
+    card: Card  # Linha completa da carta, carregada no mesmo JOIN
+
 class SynergyScore(BaseModel):
     deck_id: UUID  # Changed from str to UUID
     synergy_score: Decimal
     calculated_at: Optional[date] = None
+
+class DeckSummary(PydanticBaseModel):
+    deck_id: UUID
+    total_cards: int = 0
+    mana_curve: Dict[int, int] = {}  # Custo de mana -> quantidade de cartas
+    color_distribution: Dict[str, int] = {}  # Cor -> quantidade de cartas
+    deck_value: Decimal = Decimal("0")
+    updated_at: Optional[datetime] = None
+
+class DeckValue(PydanticBaseModel):
+    deck_id: UUID
+    name: str
+    total_cards: int = 0
+    deck_value: Decimal = Decimal("0")  # Soma de quantidade x preço mais recente
+
+class UserDecksValue(PydanticBaseModel):
+    user_id: UUID
+    total_value: Decimal = Decimal("0")
+    decks: List[DeckValue] = []
@@ -1,19 +1,41 @@
 # app/main.py
-import databases
 from fastapi import FastAPI
-from app.api.v1 import UserController,CardController, DeckController
+from app.api.v1 import UserController,CardController, DeckController, InternalController
 from app.core import config
+from app.core.container import Container
+from app.core.pool import register_pool
+from app.core.instrumentation import instrument_requests
 from app.data.BaseRepository import BaseRepository
+from app.data.DatabaseRouter import DatabaseRouter
+from app.data.InstrumentedDatabase import InstrumentedDatabase
 
-# Configuração da conexão com o banco de dados
-database = databases.Database(config.DATABASE_URL)
-BaseRepository.database = database  # Define o banco de dados padrão para o repositório
+# Configuração da conexão com o banco de dados: um pool do primário e um por réplica, compartilhados pelo processo
+database = config.create_routed_database()
+# Define o banco de dados padrão para o repositório, medindo cada consulta
+BaseRepository.database = InstrumentedDatabase(database, config.SLOW_QUERY_SECONDS, config.SLOW_QUERY_EXPLAIN)
+BaseRepository.cache = config.create_cache()  # Cache de leitura compartilhado pelos repositórios
 app = FastAPI()
+app.middleware("http")(instrument_requests)  # Server-Timing, log estruturado e histogramas por rota
 
 # Configura eventos de startup e shutdown para conectar/desconectar do banco
 @app.on_event("startup")
 async def startup():
     await database.connect()
+    if isinstance(database, DatabaseRouter):
+        register_pool("primary").attach(database.primary, acquire_timeout=config.DB_ACQUIRE_TIMEOUT_SECONDS)
+        for index, replica in enumerate(database.replicas):
+            register_pool(f"replica-{index}").attach(replica, acquire_timeout=config.DB_ACQUIRE_TIMEOUT_SECONDS)
+        database.start_health_checks(config.DB_REPLICA_HEALTH_INTERVAL_SECONDS)
+    else:
+        register_pool("primary").attach(database, acquire_timeout=config.DB_ACQUIRE_TIMEOUT_SECONDS)
+    # Repositórios e serviços da aplicação, criados uma única vez e compartilhados pelas requisições
+    container = config.container = Container(config.card_search_index, config.card_interaction_graph, config.card_catalogue)
+    # Carrega os nomes das cartas no índice de busca em memória
+    await container.cards_service.build_search_index()
+    # Carrega as interações no grafo em memória
+    await container.card_interaction_service.build_graph()
+    # Carrega o catálogo colunar usado pelas estatísticas de cartas
+    await container.cards_service.build_catalogue()
 
 @app.on_event("shutdown")
 async def shutdown():
@@ -23,3 +45,4 @@ async def shutdown():
 app.include_router(UserController.router, prefix="/api/v1", tags=["users"])
 app.include_router(CardController.router, prefix="/api/v1", tags=["cards"])
 app.include_router(DeckController.router, prefix="/api/v1", tags=["decks"])
+app.include_router(InternalController.router, tags=["internal"])
@@ -1,24 +1,88 @@
-from typing import TypeVar, Generic, List, Optional
-from app.data.BaseRepository import BaseRepository
-from app.domain.BaseModel import BaseModel
+from typing import TypeVar, Generic, List, Optional, AsyncIterator, AsyncContextManager, Mapping, Any, Dict, Union
+from pydantic import ValidationError
+from app.data.BaseRepository import BaseRepository, DEFAULT_PAGE_SIZE
+from app.data.BatchLoader import BatchLoader
+from app.data.DatabaseRouter import pinned_reads
+from app.data.UnitOfWork import UnitOfWork, unit_of_work
+from app.domain.BaseModel import BaseModel, Page, BulkResult, BulkRowError
+
+BULK_MAX_ROWS = 10000
 
 T = TypeVar('T', bound=BaseModel)
 
 class BaseService(Generic[T]):
-    def __init__(self, repository):
+    def __init__(self, repository, loader: Optional[BatchLoader[T]] = None):
         self.repository = repository
+        self.loader = loader  # Agrupa chamadas concorrentes de get() da mesma requisição
+
+    def with_loader(self, loader: BatchLoader[T]) -> "BaseService[T]":
+        """
+        Shallow copy of this (application-scoped) service that reads through a request-scoped loader.
+        """
+        scoped = object.__new__(type(self))  # Mais barato que copy.copy, que passa por __reduce_ex__
+        scoped.__dict__.update(self.__dict__, loader=loader)
+        return scoped
+
+    def unit_of_work(self) -> AsyncContextManager[UnitOfWork]:
+        """
+        Run several repository calls as one transaction with a single commit, joining the
+        unit of work of the caller if there is one.
+        """
+        return unit_of_work(self.repository.database)
+
+    def pinned_reads(self) -> AsyncContextManager[Any]:
+        """
+        Send every read of the block to the same database, so a version looked up for an ETag and
+        the body read after it come from the same replica.
+        """
+        return pinned_reads(self.repository.database)
 
-    async def create(self, obj: T) -> T:
-        return await self.repository.create(obj)
+    async def create(self, obj: T, return_representation: bool = True) -> T:
+        return await self.repository.create(obj, return_representation=return_representation)
 
     async def get(self, obj_id: int) -> Optional[T]:
+        if self.loader is not None:
+            return await self.loader.load(obj_id)
         return await self.repository.get(obj_id)
 
-    async def list(self) -> List[T]:
-        return await self.repository.list()
+    async def get_many(self, obj_ids: List[Any]) -> List[T]:
+        return await self.repository.get_many(obj_ids)
+
+    async def list(self, limit: int = DEFAULT_PAGE_SIZE, after: Optional[str] = None, raw: bool = False) -> Page[T]:
+        return await self.repository.list(limit=limit, after=after, raw=raw)
+
+    def iterate(self) -> AsyncIterator[Mapping[str, Any]]:
+        return self.repository.iterate()
+
+    async def bulk_upsert(self, rows: List[Dict[str, Any]]) -> BulkResult:
+        """
+        Validate each row independently and upsert the valid ones in a single transaction.
+        Rows that fail validation or the database write are reported by index.
+        """
+        if len(rows) > BULK_MAX_ROWS:
+            raise ValueError(f"A bulk request accepts at most {BULK_MAX_ROWS} rows.")
+        valid_rows = []
+        valid_indexes = []
+        failed = []
+        for index, row in enumerate(rows):
+            try:
+                valid_rows.append(self.repository.model(**row).dict())
+                valid_indexes.append(index)
+            except (ValidationError, TypeError) as e:
+                failed.append(BulkRowError(index=index, error=str(e)))
+        result = await self.repository.bulk_upsert(valid_rows) if valid_rows else BulkResult()
+        # Traduz os índices das linhas válidas de volta para as posições originais
+        for error in result.failed:
+            error.index = valid_indexes[error.index]
+        result.failed = sorted(failed + result.failed, key=lambda error: error.index)
+        return result
 
-    async def update(self, obj_id: int, obj: T) -> T:
-        return await self.repository.update(obj_id, obj)
+    async def update(self, obj_id: int, obj: T, return_representation: bool = True) -> Union[Optional[T], bool]:
+        if self.loader is not None:
+            self.loader.clear(obj_id)
+        return await self.repository.update(obj_id, obj, return_representation=return_representation)
 
-    async def delete(self, obj_id: int) -> Optional[T]:
-        return await self.repository.delete(obj_id)
+    async def delete(self, obj_id: int, return_representation: bool = True) -> Union[Optional[T], bool]:
+        if self.loader is not None:
+            self.loader.clear(obj_id)
+        return await self.repository.delete(obj_id, return_representation=return_representation)
@@ -2,27 +2,155 @@ from app.services.BaseService import BaseService
 from app.data.CardsRepository import CardsRepository,CardsThemeRepository,CardIntereactionRepository
 from app.domain.CardModel import Card,CardTheme,CardInteraction
 from app.services.BaseService import BaseService
-from app.data.CardsRepository import PriceHistoryRepository
-from app.domain.CardModel import PriceHistory
-from typing import Optional, List
+from app.data.CardsRepository import PriceHistoryRepository, PRICE_BUCKETS
+from app.data.DeckRepository import DeckSummaryRepository
+from app.domain.CardModel import PriceHistory, PriceCandle, CardSearchResult, CardFilter, InteractionNeighbour, CardSuggestion, CardStats, CardDistribution
+from app.domain.DeckModel import DeckCard
+from app.domain.BaseModel import BulkResult, Page
+from app.data.BaseRepository import DEFAULT_PAGE_SIZE
+from app.data.SearchIndex import TrigramIndex
+from app.data.InteractionGraph import InteractionGraph
+from app.data.CardCatalogue import CardCatalogue
+from app.data.BatchLoader import BatchLoader
+from app.data.UnitOfWork import after_commit
+from typing import Optional, List, AsyncIterator, Mapping, Any, Dict, Tuple, Union
 from uuid import UUID
 from decimal import Decimal
-from datetime import date
+from datetime import date, datetime
+
+PRICE_CHART_MAX_POINTS = 500  # Limite de candles por gráfico antes de agregar em intervalos maiores
+
 class CardsService(BaseService[Card]):
-    def __init__(self, repository: CardsRepository):
-        super().__init__(repository)
+    def __init__(
+        self, repository: CardsRepository, search_index: Optional[TrigramIndex] = None,
+        loader: Optional[BatchLoader[Card]] = None, catalogue: Optional[CardCatalogue] = None,
+        interaction_graph: Optional[InteractionGraph] = None
+    ):
+        super().__init__(repository, loader)
+        self.search_index = search_index
+        self.catalogue = catalogue
+        self.interaction_graph = interaction_graph  # A FK apaga as interações da carta junto com ela
+
+    async def create(self, obj: Card, return_representation: bool = True) -> Card:
+        # Uma unidade de trabalho: o índice e o catálogo só mudam se a escrita for confirmada
+        async with self.unit_of_work():
+            card = await super().create(obj, return_representation=return_representation)
+            if self.search_index is not None:
+                await after_commit(lambda: self.search_index.add(card.id, card.name))
+            if self.catalogue is not None:
+                await after_commit(lambda: self.catalogue.upsert(card.id, obj.dict()))
+        return card
+
+    async def update(self, obj_id: UUID, obj: Card, return_representation: bool = True) -> Union[Optional[Card], bool]:
+        async with self.unit_of_work():
+            card = await super().update(obj_id, obj, return_representation=return_representation)
+            if card and self.search_index is not None:
+                await after_commit(lambda: self.search_index.add(obj_id, obj.name))
+            if card and self.catalogue is not None:
+                await after_commit(lambda: self.catalogue.upsert(obj_id, obj.dict()))
+        return card
+
+    async def delete(self, obj_id: UUID, return_representation: bool = True) -> Union[Optional[Card], bool]:
+        # A leitura dos parceiros, o DELETE e a cascata da FK para interações e preços formam uma unidade
+        async with self.unit_of_work():
+            deleted = await super().delete(obj_id, return_representation=return_representation)
+            if deleted and self.search_index is not None:
+                await after_commit(lambda: self.search_index.remove(obj_id))
+            if deleted and self.catalogue is not None:
+                await after_commit(lambda: self.catalogue.remove(obj_id))
+            if deleted and self.interaction_graph is not None:
+                await after_commit(lambda: self.interaction_graph.remove_node(obj_id))
+        return deleted
+
+    async def bulk_upsert(self, rows: List[Dict[str, Any]]) -> BulkResult:
+        async with self.unit_of_work():
+            result = await super().bulk_upsert(rows)
+            failed = {error.index for error in result.failed}
+
+            def index_rows():
+                for index, row in enumerate(rows):
+                    if index in failed:
+                        continue
+                    if self.search_index is not None:
+                        self.search_index.add(row["id"], row["name"])
+                    if self.catalogue is not None:
+                        # Mesma validação do bulk, para gravar as colunas com os nomes e tipos do banco
+                        self.catalogue.upsert(row["id"], self.repository.model(**row).dict())
+            if self.search_index is not None or self.catalogue is not None:
+                await after_commit(index_rows)
+        return result
 
-    async def get_cards_by_theme(self, theme_id: int) -> List[Card]:
+    async def get_version(self, card_id: UUID) -> Optional[datetime]:
         """
-        Retrieve all cards associated with a specific theme.
+        Last modification time of a card for conditional requests, without loading the card.
         """
-        return await self.repository.get_cards_by_theme(theme_id)
+        return await self.repository.get_version(card_id)
 
-    async def filter_cards(self, mana_cost: Optional[int] = None, card_type: Optional[str] = None) -> List[Card]:
+    async def build_search_index(self):
         """
-        Filter cards by optional parameters like mana cost or card type.
+        Load every card name into the in-process search index.
         """
-        return await self.repository.filter_cards(mana_cost=mana_cost, card_type=card_type)
+        if self.search_index is not None:
+            self.search_index.build([(row["id"], row["name"]) async for row in self.repository.iterate_names()])
+
+    async def build_catalogue(self):
+        """
+        Load the catalogue columns of every card into the in-process columnar snapshot.
+        """
+        if self.catalogue is not None:
+            self.catalogue.build([row async for row in self.repository.iterate_catalogue()])
+
+    async def get_card_stats(self, group_by: str, metric: str) -> List[CardStats]:
+        """
+        Count, mean, min, max and total of `metric` per type, color or set, computed on the columnar snapshot.
+        """
+        catalogue = await self._ready_catalogue()
+        return [CardStats(**stats) for stats in catalogue.aggregate(group_by, metric)]
+
+    async def get_card_distribution(self, group_by: str, column: str) -> List[CardDistribution]:
+        """
+        Number of cards per value of `column` (e.g. the mana curve) per type, color or set.
+        """
+        catalogue = await self._ready_catalogue()
+        return [CardDistribution(**distribution) for distribution in catalogue.distribution(group_by, column)]
+
+    async def _ready_catalogue(self) -> CardCatalogue:
+        if self.catalogue is None:
+            raise ValueError("The card catalogue is disabled.")
+        if not self.catalogue.ready:
+            await self.build_catalogue()
+        return self.catalogue
+
+    async def search(self, text: str, limit: int = 20, offset: int = 0) -> List[CardSearchResult]:
+        """
+        Ranked card search. Served by the in-process trigram index on names once it is built,
+        falling back to the MySQL FULLTEXT index on name and effect.
+        """
+        if self.search_index is not None and self.search_index.ready:
+            results = self.search_index.search(text, limit=limit, offset=offset)
+        else:
+            results = await self.repository.search_cards(text, limit=limit, offset=offset)
+        return [CardSearchResult(**result) for result in results]
+
+    async def get_cards_by_theme(self, theme: str, limit: int = DEFAULT_PAGE_SIZE, after: Optional[str] = None) -> Page[Card]:
+        """
+        Retrieve the cards associated with a specific theme.
+        """
+        return await self.repository.filter_cards(CardFilter(themes=[theme]), limit=limit, after=after)
+
+    async def filter_cards(self, card_filter: CardFilter, limit: int = DEFAULT_PAGE_SIZE, after: Optional[str] = None, raw: bool = False) -> Page[Card]:
+        """
+        Filter cards by any combination of mana cost, type, color, power/toughness, set, price and themes.
+        """
+        for low, high in (
+            (card_filter.min_mana_cost, card_filter.max_mana_cost),
+            (card_filter.min_power, card_filter.max_power),
+            (card_filter.min_toughness, card_filter.max_toughness),
+            (card_filter.min_price, card_filter.max_price),
+        ):
+            if low is not None and high is not None and low > high:
+                raise ValueError("Filter range minimum must not exceed its maximum.")
+        return await self.repository.filter_cards(card_filter, limit=limit, after=after, raw=raw)
 
     async def calculate_card_value(self, card_id: int) -> float:
         """
@@ -69,14 +197,59 @@ class CardsThemeService(BaseService[CardTheme]):
 
         
 class CardIntereactionService(BaseService[CardInteraction]):
-    def __init__(self, repository: CardIntereactionRepository):
+    def __init__(self, repository: CardIntereactionRepository, graph: Optional[InteractionGraph] = None):
         super().__init__(repository)
+        self.graph = graph
+
+    async def create(self, obj: CardInteraction, return_representation: bool = True) -> CardInteraction:
+        interaction = await super().create(obj, return_representation=return_representation)
+        if self.graph is not None:
+            await after_commit(lambda: self.graph.add_edge(obj.card_id_1, obj.card_id_2))
+        return interaction
 
     async def define_interaction(self, card_id: int, related_card_id: int, effectiveness_score: float):
         """
         Define a new interaction between two cards with a given effectiveness score.
         """
         await self.repository.create_interaction(card_id, related_card_id, effectiveness_score)
+        if self.graph is not None:
+            await after_commit(lambda: self.graph.add_edge(card_id, related_card_id))
+
+    async def build_graph(self):
+        """
+        Load every interaction into the in-process interaction graph.
+        """
+        if self.graph is not None:
+            self.graph.build([(row["card_id_1"], row["card_id_2"]) async for row in self.repository.iterate_edges()])
+
+    async def get_interaction_graph(self, card_id: UUID, depth: int = 1, limit: int = 1000) -> List[InteractionNeighbour]:
+        """
+        Retrieve the cards within `depth` interaction hops of a card, nearest first.
+        """
+        graph = await self._ready_graph()
+        return [InteractionNeighbour(card_id=neighbour, distance=distance) for neighbour, distance in graph.neighbourhood(card_id, depth, limit)]
+
+    async def get_common_interactions(self, card_ids: List[UUID], limit: int = 1000) -> List[UUID]:
+        """
+        Retrieve the cards that interact with every one of `card_ids`.
+        """
+        graph = await self._ready_graph()
+        return [UUID(card_id) for card_id in graph.common_neighbours(card_ids, limit)]
+
+    async def suggest_cards(self, deck_cards: List[DeckCard], limit: int = 20) -> List[CardSuggestion]:
+        """
+        Suggest cards for a partial deck, ranked by how many copies in the deck they interact with.
+        """
+        graph = await self._ready_graph()
+        deck = [(deck_card.card_id, deck_card.quantity or 1) for deck_card in deck_cards]
+        return [CardSuggestion(card_id=card_id, score=score) for card_id, score in graph.suggest(deck, limit)]
+
+    async def _ready_graph(self) -> InteractionGraph:
+        if self.graph is None:
+            raise ValueError("The interaction graph is disabled.")
+        if not self.graph.ready:
+            await self.build_graph()
+        return self.graph
 
     async def get_interactions_for_card(self, card_id: int) -> List[CardInteraction]:
         """
@@ -93,14 +266,35 @@ class CardIntereactionService(BaseService[CardInteraction]):
         return sum(interaction.effectiveness_score for interaction in interactions)
 
 class PriceService(BaseService[PriceHistory]):
-    def __init__(self, repository: PriceHistoryRepository):
+    def __init__(self, repository: PriceHistoryRepository, summary_repository: Optional[DeckSummaryRepository] = None):
         super().__init__(repository)
+        self.summary_repository = summary_repository
 
     async def record_price(self, card_id: UUID, price: Decimal, date: date):
         """
-        Record a new price for a card.
+        Record a new price for a card and move the value of the decks holding it.
         """
-        await self.repository.add_price_record(card_id, price, date)
+        if self.summary_repository is None:
+            await self.repository.add_price_record(card_id, price, date)
+            return
+        async with self.unit_of_work():
+            # Leitura com lock: dois registros simultâneos aplicariam o mesmo delta duas vezes
+            previous = await self.repository.lock_latest_price(card_id)
+            await self.repository.add_price_record(card_id, price, date)
+            if previous is None:
+                # Sem histórico o valor vinha do cadastro da carta, então recalcula os decks afetados
+                await self.summary_repository.refresh_values_for_cards([card_id])
+            elif date >= previous.date:
+                await self.summary_repository.apply_price_change(card_id, price - previous.price)
+
+    async def bulk_upsert(self, rows: List[Dict[str, Any]]) -> BulkResult:
+        if self.summary_repository is None:
+            return await super().bulk_upsert(rows)
+        async with self.unit_of_work():
+            result = await super().bulk_upsert(rows)
+            card_ids = list(dict.fromkeys(str(row["card_id"]) for row in rows if row.get("card_id") is not None))
+            await self.summary_repository.refresh_values_for_cards(card_ids)
+        return result
 
     async def get_latest_price(self, card_id: UUID) -> PriceHistory:
         """
@@ -108,8 +302,52 @@ class PriceService(BaseService[PriceHistory]):
         """
         return await self.repository.get_latest_price(card_id)
 
+    async def get_latest_prices(self, card_ids: List[UUID], raw: bool = False) -> Dict[str, PriceHistory]:
+        """
+        Retrieve the latest price of many cards at once, keyed by card id.
+        """
+        return await self.repository.get_latest_prices(card_ids, raw=raw)
+
+    async def get_price_history_version(self, card_id: UUID) -> Tuple[Optional[datetime], int]:
+        """
+        Version of a card's price history (newest updated_at, record count) for conditional requests.
+        """
+        return await self.repository.get_price_history_version(card_id)
+
     async def get_price_history(self, card_id: UUID) -> List[PriceHistory]:
         """
         Retrieve the price history for a specific card.
         """
         return await self.repository.get_price_history(card_id)
+
+    async def get_price_candles(
+        self, card_id: UUID, start: Optional[date] = None, end: Optional[date] = None,
+        bucket: Optional[str] = None, max_points: int = PRICE_CHART_MAX_POINTS
+    ) -> List[PriceCandle]:
+        """
+        Retrieve OHLC candles for a date range. Without an explicit bucket the finest one
+        that fits the range in `max_points` candles is used, so long ranges are downsampled.
+        Without `start` the range begins at the card's first price record.
+        """
+        if bucket is not None and bucket not in PRICE_BUCKETS:
+            raise ValueError(f"Unknown bucket '{bucket}'; use one of {', '.join(PRICE_BUCKETS)}.")
+        if start is not None and end is not None and start > end:
+            raise ValueError("'from' must not be after 'to'.")
+        if bucket is None:
+            # Sem 'from' o intervalo é o histórico da carta: um histórico curto continua em dias
+            first = start if start is not None else await self.repository.get_first_price_date(card_id)
+            days = ((end or date.today()) - first).days + 1 if first is not None else 1
+            bucket = next((name for name, length in (("day", 1), ("week", 7)) if days / length <= max_points), "month")
+        return await self.repository.get_price_candles(card_id, bucket, start, end)
+
+    async def rebuild_price_rollups(self, card_ids: List[UUID]):
+        """
+        Recompute the latest prices and candles of these cards from the raw price history.
+        """
+        await self.repository.refresh_derived(card_ids)
+
+    def iterate_price_history(self, card_id: UUID) -> AsyncIterator[Mapping[str, Any]]:
+        """
+        Stream the price history for a specific card without loading it into memory.
+        """
+        return self.repository.iterate_price_history(card_id)
@@ -1,22 +1,41 @@
 from app.services.BaseService import BaseService
-from app.data.DeckRepository import DeckCardsRepository,DecksRepository,SynergyScoresRepository
-from app.domain.DeckModel import Deck,DeckCard,SynergyScore
+from app.services.SynergyEngine import SynergyInputs, group_inputs, score_deck
+from app.data.DeckRepository import DeckCardsRepository,DecksRepository,SynergyScoresRepository,DeckSummaryRepository
+from app.domain.DeckModel import Deck,DeckCard,DeckCardDetail,SynergyScore,DeckSummary,DeckValue,UserDecksValue
+from app.domain.BaseModel import BulkResult
+from app.data.BaseRepository import EXPORT_CHUNK_SIZE
 from uuid import UUID
-from typing import List
+from typing import List, Dict, Any, Tuple, Union, Optional
+from datetime import datetime
 from decimal import Decimal
 
 
 
 class DeckService(BaseService[Deck]):
-    def __init__(self, repository: DecksRepository):
+    def __init__(self, repository: DecksRepository, deck_cards_service: Optional["DeckCardsService"] = None):
         super().__init__(repository)
+        self.deck_cards_service = deck_cards_service
 
-    async def create_deck_for_user(self, user_id: UUID, name: str) -> Deck:
+    async def create_deck_for_user(self, user_id: UUID, name: str, return_representation: bool = True) -> Deck:
         """
         Create a new deck for a specific user.
         """
         deck = Deck(user_id=user_id, name=name)
-        return await self.create(deck)
+        return await self.create(deck, return_representation=return_representation)
+
+    async def create_deck_with_cards(self, user_id: UUID, name: str, cards: List[Dict[str, Any]], return_representation: bool = True) -> Deck:
+        """
+        Create a deck and fill it with (card_id, quantity) rows as one unit of work:
+        if any row is rejected, neither the deck nor its cards are written.
+        """
+        if self.deck_cards_service is None:
+            raise ValueError("Creating a deck with cards is not supported.")
+        async with self.unit_of_work():
+            deck = await self.create_deck_for_user(user_id, name, return_representation=return_representation)
+            result = await self.deck_cards_service.set_cards_in_deck(deck.id, cards)
+            if result.failed:
+                raise ValueError(f"Card row {result.failed[0].index} was rejected: {result.failed[0].error}")
+        return deck
 
     async def get_decks_by_user(self, user_id: UUID) -> List[Deck]:
         """
@@ -24,29 +43,126 @@ class DeckService(BaseService[Deck]):
         """
         return await self.repository.get_decks_by_user(user_id)
 
+    async def get_deck_value(self, deck_id: UUID) -> Optional[DeckValue]:
+        """
+        Retrieve the current value of a deck, or None if the deck does not exist.
+        """
+        return await self.repository.get_deck_value(deck_id)
+
+    async def get_user_decks_value(self, user_id: UUID) -> UserDecksValue:
+        """
+        Retrieve the current value of every deck of a user and their total.
+        """
+        decks = await self.repository.get_user_deck_values(user_id)
+        return UserDecksValue(user_id=user_id, total_value=sum((deck.deck_value for deck in decks), Decimal("0")), decks=decks)
+
 
 class DeckCardsService(BaseService[DeckCard]):
-    def __init__(self, repository: DeckCardsRepository):
+    def __init__(self, repository: DeckCardsRepository, summary_repository: Optional[DeckSummaryRepository] = None):
         super().__init__(repository)
+        self.summary_repository = summary_repository
 
     async def add_card_to_deck(self, deck_id: UUID, card_id: UUID, quantity: int = 1):
         """
         Add a card to a specific deck. If it already exists, update the quantity.
         """
-        await self.repository.add_card_to_deck(deck_id, card_id, quantity)
+        async with self.unit_of_work():
+            await self.repository.add_card_to_deck(deck_id, card_id, quantity)
+            await self.repository.touch_deck(deck_id)
+            if self.summary_repository is not None:
+                await self.summary_repository.apply_card_delta(deck_id, card_id, quantity)
+
+    async def apply_deck_diff(self, deck_id: UUID, changes: List[Tuple[UUID, int]]):
+        """
+        Apply a burst of quantity changes to a deck in a single transaction.
+        Positive deltas add copies, negative deltas remove them, and cards that
+        reach zero copies are removed from the deck.
+        """
+        merged: Dict[UUID, int] = {}
+        for card_id, delta in changes:
+            merged[card_id] = merged.get(card_id, 0) + delta
+        merged = {card_id: delta for card_id, delta in merged.items() if delta != 0}
+        if merged:
+            async with self.unit_of_work():
+                await self.repository.apply_quantity_changes(deck_id, merged)
+                await self.repository.touch_deck(deck_id)
+                await self._rebuild_summary(deck_id)
 
     async def remove_card_from_deck(self, deck_id: UUID, card_id: UUID):
         """
         Remove a card from a specific deck.
         """
-        await self.repository.remove_card_from_deck(deck_id, card_id)
+        async with self.unit_of_work():
+            removed = await self.repository.remove_card_from_deck(deck_id, card_id)
+            if not removed:
+                return
+            await self.repository.touch_deck(deck_id)
+            if self.summary_repository is not None:
+                await self.summary_repository.apply_card_delta(deck_id, card_id, -removed)
 
-    async def get_cards_in_deck(self, deck_id: UUID) -> List[DeckCard]:
+    async def get_cards_in_deck(self, deck_id: UUID, expand_cards: bool = False) -> Union[List[DeckCard], List[DeckCardDetail]]:
         """
-        Retrieve all cards in a specified deck.
+        Retrieve all cards in a specified deck, optionally with the full card rows.
         """
+        if expand_cards:
+            return await self.repository.get_card_details_in_deck(deck_id)
         return await self.repository.get_cards_in_deck(deck_id)
 
+    async def get_cards_version(self, deck_id: UUID, expand_cards: bool = False) -> Optional[Tuple[datetime, int]]:
+        """
+        Version of the deck's card list (updated_at, card count) for conditional requests, or None if there is no such deck.
+        """
+        return await self.repository.get_cards_version(deck_id, expand_cards)
+
+    async def set_cards_in_deck(self, deck_id: UUID, rows: List[Dict[str, Any]]) -> BulkResult:
+        """
+        Set the quantity of many cards in a deck at once, inserting the ones not yet in it.
+        """
+        async with self.unit_of_work():
+            result = await self.bulk_upsert([{**row, "deck_id": deck_id} for row in rows])
+            if result.processed:
+                await self.repository.touch_deck(deck_id)
+            await self._rebuild_summary(deck_id)
+        return result
+
+    async def _rebuild_summary(self, deck_id: UUID):
+        # Diffs e cargas em lote podem zerar ou sobrescrever quantidades, então o resumo é recalculado
+        if self.summary_repository is not None:
+            await self.summary_repository.rebuild([deck_id])
+
+
+class DeckSummaryService(BaseService[DeckSummary]):
+    def __init__(self, repository: DeckSummaryRepository):
+        super().__init__(repository)
+
+    async def get_summary(self, deck_id: UUID) -> Optional[DeckSummary]:
+        """
+        Retrieve the materialised summary of a deck, building it on first access.
+        Returns None if the deck does not exist.
+        """
+        summary = await self.repository.get_summary(deck_id)
+        if summary is None:
+            rebuilt = await self.repository.rebuild([deck_id])
+            summary = rebuilt[0] if rebuilt else None
+        return summary
+
+    async def get_summaries(self, deck_ids: List[UUID]) -> List[DeckSummary]:
+        """
+        Retrieve the summaries of many decks at once, building the missing ones.
+        Decks that do not exist are left out.
+        """
+        summaries = {str(summary.deck_id): summary for summary in await self.repository.get_summaries(deck_ids)}
+        missing = [deck_id for deck_id in deck_ids if str(deck_id) not in summaries]
+        for summary in await self.repository.rebuild(missing):
+            summaries[str(summary.deck_id)] = summary
+        return [summaries[str(deck_id)] for deck_id in deck_ids if str(deck_id) in summaries]
+
+    async def rebuild_all(self, chunk_size: int = EXPORT_CHUNK_SIZE) -> int:
+        """
+        Recompute every deck summary from the source tables to repair drift.
+        """
+        return await self.repository.rebuild_all(chunk_size=chunk_size)
+
         
 class SynergyScoresService(BaseService[SynergyScore]):
     def __init__(self, repository: SynergyScoresRepository):
@@ -56,15 +172,7 @@ class SynergyScoresService(BaseService[SynergyScore]):
         """
         Calculate and store the synergy score for a given deck.
         """
-        # Example placeholder logic to retrieve deck cards and calculate synergy
-        deck_cards = await self.repository.get_cards_in_deck(deck_id)
-        score = self._calculate_score(deck_cards)
-        synergy_score = SynergyScore(deck_id=deck_id, synergy_score=score)
+        cards, themes, interactions = await self.repository.load_synergy_rows([deck_id])
+        inputs = group_inputs(cards, themes, interactions).get(str(deck_id), SynergyInputs([], [], []))
+        synergy_score = SynergyScore(deck_id=deck_id, synergy_score=score_deck(inputs))
         return await self.create(synergy_score)
-
-    def _calculate_score(self, deck_cards: List[DeckCard]) -> Decimal:
-        """
-        Placeholder method for calculating synergy score based on deck cards.
-        """
-        # Replace with your actual logic for synergy calculation
-        return Decimal(len(deck_cards))  # Example: simple count of cards
@@ -0,0 +1,95 @@
+# app/services/SynergyEngine.py
+from decimal import Decimal
+from typing import Any, Dict, Hashable, Iterable, List, NamedTuple, Tuple
+import numpy as np
+
+# Peso de cada componente na nota final (0 a 100)
+THEME_WEIGHT = 0.4
+INTERACTION_COVERAGE_WEIGHT = 0.3
+INTERACTION_DENSITY_WEIGHT = 0.3
+
+class DeckMatrices(NamedTuple):
+    quantities: np.ndarray  # (n,) cópias de cada carta
+    themes: np.ndarray  # (n, m) incidência carta x tema
+    interactions: np.ndarray  # (n, n) adjacência simétrica carta x carta
+
+class SynergyInputs(NamedTuple):
+    cards: List[Tuple[Hashable, int]]  # (card_id, quantity)
+    themes: List[Tuple[Hashable, str]]  # (card_id, theme)
+    interactions: List[Tuple[Hashable, Hashable]]  # (card_id_1, card_id_2)
+
+def build_matrices(inputs: SynergyInputs) -> DeckMatrices:
+    """
+    Remap card ids and themes to dense indexes and build the quantity vector, the theme
+    incidence matrix and the interaction adjacency matrix of a deck.
+    """
+    index = {str(card_id): i for i, (card_id, _) in enumerate(inputs.cards)}
+    quantities = np.fromiter((quantity for _, quantity in inputs.cards), dtype=np.float64, count=len(inputs.cards))
+    theme_index: Dict[str, int] = {}
+    theme_rows, theme_cols = [], []
+    for card_id, theme in inputs.themes:
+        row = index.get(str(card_id))
+        if row is not None:
+            theme_rows.append(row)
+            theme_cols.append(theme_index.setdefault(theme, len(theme_index)))
+    themes = np.zeros((len(index), len(theme_index)), dtype=np.float64)
+    themes[theme_rows, theme_cols] = 1.0
+    pairs = [(index[str(a)], index[str(b)]) for a, b in inputs.interactions if str(a) in index and str(b) in index]
+    interactions = np.zeros((len(index), len(index)), dtype=np.float64)
+    if pairs:
+        rows, cols = np.array(pairs).T
+        interactions[rows, cols] = 1.0
+        interactions[cols, rows] = 1.0
+        np.fill_diagonal(interactions, 0.0)
+    return DeckMatrices(quantities, themes, interactions)
+
+def score_matrices(matrices: DeckMatrices) -> float:
+    """
+    Score a deck from 0 to 100 with array operations only:
+    - theme overlap: share of copy pairs (i != j) whose cards have a theme in common;
+    - interaction coverage: share of copies that interact with another card of the deck;
+    - interaction density: share of copy pairs that interact, weighting the adjacency by quantity.
+    """
+    quantities, themes, interactions = matrices
+    total_copies = quantities.sum()
+    # Pares de cópias de cartas diferentes: (soma q)^2 - soma q^2
+    pair_total = total_copies ** 2 - quantities @ quantities
+    if pair_total <= 0:
+        return 0.0
+    shared_themes = (themes @ themes.T) > 0
+    np.fill_diagonal(shared_themes, False)
+    theme_overlap = quantities @ shared_themes @ quantities / pair_total
+    weighted_degree = interactions @ quantities
+    interaction_coverage = quantities[weighted_degree > 0].sum() / total_copies
+    interaction_density = quantities @ weighted_degree / pair_total
+    score = (
+        THEME_WEIGHT * theme_overlap
+        + INTERACTION_COVERAGE_WEIGHT * interaction_coverage
+        + INTERACTION_DENSITY_WEIGHT * interaction_density
+    )
+    return float(100.0 * score)
+
+def score_deck(inputs: SynergyInputs) -> Decimal:
+    """
+    Score a deck and round it to the precision of Synergy_Scores.synergy_score.
+    """
+    return Decimal(str(round(score_matrices(build_matrices(inputs)), 2)))
+
+def score_decks(batch: List[SynergyInputs]) -> List[Decimal]:
+    """
+    Score many decks; a module-level function so it can run on a process pool.
+    """
+    return [score_deck(inputs) for inputs in batch]
+
+def group_inputs(cards: Iterable[Any], themes: Iterable[Any], interactions: Iterable[Any]) -> Dict[str, SynergyInputs]:
+    """
+    Split rows loaded for many decks at once (each carrying a deck_id) into per-deck inputs.
+    """
+    grouped: Dict[str, SynergyInputs] = {}
+    for row in cards:
+        grouped.setdefault(str(row["deck_id"]), SynergyInputs([], [], [])).cards.append((row["card_id"], row["quantity"]))
+    for row in themes:
+        grouped[str(row["deck_id"])].themes.append((row["card_id"], row["theme"]))
+    for row in interactions:
+        grouped[str(row["deck_id"])].interactions.append((row["card_id_1"], row["card_id_2"]))
+    return grouped
@@ -0,0 +1,126 @@
+# app/services/SynergyRescoreJob.py
+import asyncio
+import json
+import os
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor
+from datetime import datetime
+from decimal import Decimal
+from typing import AsyncIterator, Callable, List, Optional
+from uuid import UUID
+from app.data.DeckRepository import SynergyScoresRepository
+from app.services.SynergyEngine import SynergyInputs, group_inputs, score_decks
+
+RESCORE_CHUNK_SIZE = 500
+
+class SynergyRescoreJob:
+    """
+    Recompute Synergy_Scores for many decks: deck ids are streamed in chunks, the next chunk
+    is loaded while the process pool scores the current one, and each scored chunk is
+    bulk-inserted before its last deck id is saved to the checkpoint file.
+    """
+    def __init__(
+        self,
+        repository: SynergyScoresRepository,
+        chunk_size: int = RESCORE_CHUNK_SIZE,
+        workers: Optional[int] = None,
+        checkpoint_path: Optional[str] = None,
+        report: Callable[[str], None] = print,
+    ):
+        self.repository = repository
+        self.chunk_size = chunk_size
+        self.workers = (os.cpu_count() or 1) if workers is None else workers  # 0 pontua no próprio processo
+        self.checkpoint_path = checkpoint_path
+        self.report = report
+
+    async def run(self, card_ids: Optional[List[UUID]] = None, resume: bool = False) -> int:
+        """
+        Rescore the decks holding any of `card_ids`, or every deck when no card is given.
+        With `resume=True` a matching checkpoint skips the decks already rescored.
+        Returns how many decks were rescored by this run.
+        """
+        card_key = sorted(str(card_id) for card_id in card_ids) if card_ids else None
+        checkpoint = self._load_checkpoint(card_key) if resume else None
+        # Um mesmo calculated_at para o job inteiro torna a retomada idempotente (mesma PK)
+        calculated_at = datetime.fromisoformat(checkpoint["calculated_at"]) if checkpoint else datetime.now().replace(microsecond=0)
+        after = checkpoint["after"] if checkpoint else None
+        self.processed = self.failed = 0
+        self.started = time.monotonic()
+
+        pool: Optional[Executor] = ProcessPoolExecutor(self.workers) if self.workers > 0 else None
+        try:
+            pending = None
+            async for deck_ids in self._deck_id_chunks(card_key, after):
+                # Carrega o próximo lote enquanto o anterior é pontuado
+                scoring = await self._start_scoring(pool, deck_ids)
+                if pending is not None:
+                    await self._write(*pending, card_key, calculated_at)
+                pending = (deck_ids, scoring)
+            if pending is not None:
+                await self._write(*pending, card_key, calculated_at)
+        finally:
+            if pool is not None:
+                pool.shutdown()
+        self._clear_checkpoint()
+        self._report_progress(done=True)
+        return self.processed
+
+    async def _deck_id_chunks(self, card_key: Optional[List[str]], after: Optional[str]) -> AsyncIterator[List[str]]:
+        # Keyset em ordem de deck_id, com ou sem filtro de cartas: o checkpoint é só o último deck processado
+        while True:
+            deck_ids = await self.repository.get_deck_ids_after(after, self.chunk_size, card_ids=card_key)
+            if not deck_ids:
+                return
+            yield deck_ids
+            after = deck_ids[-1]
+
+    async def _start_scoring(self, pool: Optional[Executor], deck_ids: List[str]) -> "asyncio.Future[List[List[Decimal]]]":
+        grouped = group_inputs(*await self.repository.load_synergy_rows(deck_ids))
+        batch = [grouped.get(deck_id, SynergyInputs([], [], [])) for deck_id in deck_ids]
+        if pool is None:
+            future = asyncio.get_running_loop().create_future()
+            future.set_result([score_decks(batch)])
+            return future
+        loop = asyncio.get_running_loop()
+        step = -(-len(batch) // self.workers)
+        return asyncio.gather(*[loop.run_in_executor(pool, score_decks, batch[i:i + step]) for i in range(0, len(batch), step)])
+
+    async def _write(self, deck_ids: List[str], scoring: "asyncio.Future[List[List[Decimal]]]", card_key: Optional[List[str]], calculated_at: datetime):
+        scores = [score for part in await scoring for score in part]
+        rows = [
+            {"deck_id": deck_id, "synergy_score": score, "calculated_at": calculated_at}
+            for deck_id, score in zip(deck_ids, scores)
+        ]
+        result = await self.repository.bulk_upsert(rows)
+        self.processed += result.processed
+        self.failed += len(result.failed)
+        self._save_checkpoint(card_key, deck_ids[-1], calculated_at)
+        self._report_progress()
+
+    def _report_progress(self, done: bool = False):
+        elapsed = time.monotonic() - self.started
+        rate = self.processed / elapsed if elapsed > 0 else 0.0
+        status = "done" if done else "progress"
+        self.report(f"[{status}] {self.processed} decks rescored, {self.failed} failed, {elapsed:.1f}s, {rate:.0f} decks/s")
+
+    def _load_checkpoint(self, card_key: Optional[List[str]]) -> Optional[dict]:
+        if not self.checkpoint_path or not os.path.exists(self.checkpoint_path):
+            return None
+        with open(self.checkpoint_path) as file:
+            checkpoint = json.load(file)
+        if checkpoint.get("card_ids") != card_key:
+            raise ValueError("Checkpoint was written for a different set of cards; run without --resume.")
+        return checkpoint
+
+    def _save_checkpoint(self, card_key: Optional[List[str]], after: str, calculated_at: datetime):
+        if not self.checkpoint_path:
+            return
+        # Grava em arquivo temporário e renomeia, para nunca deixar um checkpoint pela metade
+        temporary = self.checkpoint_path + ".tmp"
+        with open(temporary, "w") as file:
+            json.dump({"card_ids": card_key, "after": after, "calculated_at": calculated_at.isoformat()}, file)
+        os.replace(temporary, self.checkpoint_path)
+
+    def _clear_checkpoint(self):
+        if self.checkpoint_path and os.path.exists(self.checkpoint_path):
+            os.remove(self.checkpoint_path)
@@ -2,7 +2,7 @@
 from app.services.BaseService import BaseService
 from app.data.UserRepository import UserRepository
 from app.domain.UserModel import User
-from typing import Optional, List
+from typing import Optional, List, Union
 from pydantic import ValidationError
 from fastapi import HTTPException, status
 
@@ -10,7 +10,7 @@ class UserService(BaseService[User]):
     def __init__(self, repository: UserRepository):
         super().__init__(repository)
 
-    async def create(self, user: User) -> User:
+    async def create(self, user: User, return_representation: bool = True) -> User:
         """
         Create a new user with validation and optional logic for setting default values.
         """
@@ -22,10 +22,10 @@ class UserService(BaseService[User]):
             )
 
         # Additional logic (e.g., hashing password if applicable)
-        user.password = self._hash_password(user.password)
+        user.password_hash = self._hash_password(user.password_hash)
         
         # Create user using the base service's create method
-        return await super().create(user)
+        return await super().create(user, return_representation=return_representation)
 
     async def get_by_email(self, email: str) -> Optional[User]:
         """
@@ -39,7 +39,7 @@ class UserService(BaseService[User]):
             )
         return user
 
-    async def update_user(self, user_id: int, user_data: dict) -> User:
+    async def update_user(self, user_id: int, user_data: dict, return_representation: bool = True) -> Union[Optional[User], bool]:
         """
         Update user data with validation and integrity checks.
         """
@@ -56,7 +56,7 @@ class UserService(BaseService[User]):
                 setattr(existing_user, key, value)
 
         # Save the updated user
-        return await self.repository.update(user_id, existing_user)
+        return await self.repository.update(user_id, existing_user, return_representation=return_representation)
 
     def _hash_password(self, password: str) -> str:
         """
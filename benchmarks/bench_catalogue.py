@@ -0,0 +1,84 @@
+# benchmarks/bench_catalogue.py
+# Memória e tempo das estatísticas de cartas, sem banco de dados:
+#   python -m benchmarks.bench_catalogue --cards 100000
+# "antes": um modelo Card por carta (como CardsRepository.list) e agregação com laços em Python
+# "depois": CardCatalogue colunar (NumPy) e agregação vetorizada
+import argparse
+import random
+import time
+import tracemalloc
+from collections import defaultdict
+from decimal import Decimal
+from typing import Any, Callable, Dict, List
+from uuid import uuid4
+from app.data.CardCatalogue import CardCatalogue
+from app.domain.CardModel import Card
+
+TYPES = ["Creature", "Instant", "Sorcery", "Artifact", "Enchantment", "Land", "Planeswalker"]
+COLORS = ["White", "Blue", "Black", "Red", "Green", None]
+
+def card_rows(count: int, rng: random.Random) -> List[Dict[str, Any]]:
+    return [{
+        "id": str(uuid4()), "name": f"Card {i}", "_type": rng.choice(TYPES), "mana_cost": rng.randint(0, 10),
+        "color": rng.choice(COLORS), "power": rng.randint(0, 12) if rng.random() < 0.6 else None,
+        "toughness": rng.randint(1, 12) if rng.random() < 0.6 else None, "effect": "When this enters, draw a card.",
+        "_set": f"SET{rng.randint(1, 80):02d}", "price": Decimal(rng.randint(1, 50000)) / 100,
+    } for i in range(count)]
+
+def allocated(build: Callable[[], Any]):
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    kept = build()
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    return kept, sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+
+def best_of(run: Callable[[], Any], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        run()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+def price_per_color_models(cards: List[Card]) -> Dict[Any, float]:
+    totals, counts = defaultdict(Decimal), defaultdict(int)
+    for card in cards:
+        if card.price is not None:
+            totals[card.color] += card.price
+            counts[card.color] += 1
+    return {color: float(totals[color] / counts[color]) for color in counts}
+
+def mana_curve_per_set_models(cards: List[Card]) -> Dict[Any, Dict[int, int]]:
+    curves: Dict[Any, Dict[int, int]] = defaultdict(lambda: defaultdict(int))
+    for card in cards:
+        curves[card.set_][card.mana_cost] += 1
+    return curves
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare card analytics on Pydantic models and on the columnar catalogue.")
+    parser.add_argument("--cards", type=int, default=100000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    rows = card_rows(args.cards, random.Random(42))
+
+    models, model_bytes = allocated(lambda: [Card(**row) for row in rows])
+    catalogue, _ = allocated(lambda: CardCatalogue())
+    started = time.perf_counter()
+    catalogue.build(rows)
+    build_time = time.perf_counter() - started
+
+    print(f"{args.cards} cards")
+    print(f"memory: models {model_bytes / 2 ** 20:.1f} MiB, catalogue arrays {catalogue.nbytes / 2 ** 20:.1f} MiB "
+          f"({model_bytes / catalogue.nbytes:.0f}x smaller); catalogue built in {build_time * 1000:.0f} ms")
+    cases = [
+        ("avg price per color", lambda: price_per_color_models(models), lambda: catalogue.aggregate("color", "price")),
+        ("mana curve per set", lambda: mana_curve_per_set_models(models), lambda: catalogue.distribution("set", "mana_cost")),
+    ]
+    print(f"{'aggregate':<22}{'models':>12}{'catalogue':>13}{'speedup':>10}")
+    for name, before, after in cases:
+        old, new = best_of(before, args.repeat), best_of(after, args.repeat)
+        print(f"{name:<22}{old * 1000:>9.2f} ms{new * 1000:>10.2f} ms{old / new:>9.1f}x")
+
+if __name__ == "__main__":
+    main()
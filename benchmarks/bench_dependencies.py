@@ -0,0 +1,66 @@
+# benchmarks/bench_dependencies.py
+# Custo por requisição das dependências de serviço, sem banco de dados:
+#   python -m benchmarks.bench_dependencies --repeat 100000
+# Compara a construção por requisição (como app.core.config fazia) com o container criado no startup.
+import argparse
+import asyncio
+import time
+import tracemalloc
+from typing import Awaitable, Callable, Dict
+from app.core import config
+from app.data.BatchLoader import BatchLoader
+from app.data.CardsRepository import CardsRepository, PriceHistoryRepository
+from app.data.DeckRepository import DeckCardsRepository, DeckSummaryRepository
+from app.services.CardService import CardsService, PriceService
+from app.services.DeckService import DeckCardsService
+
+# Construção por requisição, como era antes do container
+async def per_request_cards_service() -> CardsService:
+    cards_repository = CardsRepository()
+    PriceService(PriceHistoryRepository())  # Serviço montado e descartado em toda requisição
+    return CardsService(cards_repository, config.card_search_index, BatchLoader(cards_repository.get_many))
+
+async def per_request_price_service() -> PriceService:
+    return PriceService(PriceHistoryRepository(), DeckSummaryRepository())
+
+async def per_request_deck_cards_service() -> DeckCardsService:
+    return DeckCardsService(DeckCardsRepository(), DeckSummaryRepository())
+
+CASES: Dict[str, Dict[str, Callable[[], Awaitable[object]]]] = {
+    "cards": {"per-request": per_request_cards_service, "container": config.get_cards_service},
+    "cards+loader": {"per-request": per_request_cards_service, "container": config.get_request_cards_service},
+    "prices": {"per-request": per_request_price_service, "container": config.get_price_service},
+    "deck cards": {"per-request": per_request_deck_cards_service, "container": config.get_deck_cards_service},
+}
+
+async def measure(factory: Callable[[], Awaitable[object]], repeat: int):
+    for _ in range(1000):
+        await factory()
+    started = time.perf_counter()
+    for _ in range(repeat):
+        await factory()
+    elapsed = (time.perf_counter() - started) / repeat
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    kept = [await factory() for _ in range(1000)]  # Mantém os objetos vivos para medir o que cada chamada aloca
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    allocated = sum(stat.size_diff for stat in after.compare_to(before, "filename")) / len(kept)
+    return elapsed, allocated
+
+async def run(repeat: int):
+    config.get_container()
+    print(f"{'dependency':<14}{'per-request':>16}{'container':>14}{'saved':>10}{'bytes/req':>12}{'bytes/req':>12}")
+    for name, factories in CASES.items():
+        old_time, old_bytes = await measure(factories["per-request"], repeat)
+        new_time, new_bytes = await measure(factories["container"], repeat)
+        print(f"{name:<14}{old_time * 1e6:>13.2f} us{new_time * 1e6:>11.2f} us{old_time / new_time:>9.1f}x{old_bytes:>12.0f}{new_bytes:>12.0f}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Time building the service dependencies of one request.")
+    parser.add_argument("--repeat", type=int, default=100000)
+    args = parser.parse_args()
+    asyncio.run(run(args.repeat))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,38 @@
+# benchmarks/bench_interaction_graph.py
+# Micro-benchmark das consultas do grafo de interações, sem banco de dados:
+#   python -m benchmarks.bench_interaction_graph --cards 30000 --edges 300000
+import argparse
+import random
+import time
+import timeit
+from app.data.InteractionGraph import InteractionGraph
+
+def main():
+    parser = argparse.ArgumentParser(description="Time interaction graph queries.")
+    parser.add_argument("--cards", type=int, default=30000)
+    parser.add_argument("--edges", type=int, default=300000)
+    parser.add_argument("--repeat", type=int, default=1000)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    card_ids = [f"card-{i}" for i in range(args.cards)]
+    edges = [(rng.choice(card_ids), rng.choice(card_ids)) for _ in range(args.edges)]
+    graph = InteractionGraph()
+    started = time.perf_counter()
+    graph.build(edges)
+    print(f"graph: {len(graph)} cards, {graph.edge_count} edges, built in {time.perf_counter() - started:.2f}s")
+
+    deck = [(card_id, rng.randint(1, 4)) for card_id in rng.sample(card_ids, 40)]
+    queries = {
+        "neighbourhood depth=1": lambda: graph.neighbourhood(card_ids[0], depth=1),
+        "neighbourhood depth=2": lambda: graph.neighbourhood(card_ids[0], depth=2, limit=100),
+        "common neighbours (2)": lambda: graph.common_neighbours(card_ids[:2]),
+        "suggest (40-card deck)": lambda: graph.suggest(deck, limit=20),
+        "add edge": lambda: graph.add_edge(rng.choice(card_ids), rng.choice(card_ids)),
+    }
+    for name, query in queries.items():
+        seconds = min(timeit.repeat(query, number=args.repeat, repeat=3)) / args.repeat
+        print(f"{name:24} {seconds * 1e6:8.1f} us")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+# benchmarks/bench_serialization.py
+# Custo por linha da serialização das respostas de listagem, sem banco de dados:
+#   python -m benchmarks.bench_serialization --rows 5000
+# "antes": modelo por linha no repositório + validação/serialização do response_model pelo FastAPI + JSONResponse
+# "depois": linhas cruas projetadas nos campos do modelo + FastJSONResponse (orjson), ou TypeAdapter.dump_json para modelos
+import argparse
+import asyncio
+import random
+import time
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from typing import Any, Callable, Dict, List
+from uuid import uuid4
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_model_field
+from app.core.serialization import FastJSONResponse, dump_json
+from app.data.CardsRepository import CardsRepository, PriceHistoryRepository
+from app.domain.CardModel import Card, PriceHistory
+
+def card_rows(count: int, rng: random.Random) -> List[Dict[str, Any]]:
+    return [{
+        "id": str(uuid4()), "name": f"Card {i}", "_type": rng.choice(["Creature", "Instant", "Artifact"]),
+        "mana_cost": rng.randint(0, 8), "color": rng.choice(["Red", "Blue", None]), "power": rng.randint(0, 8),
+        "toughness": rng.randint(1, 8), "effect": "When this enters, draw a card.", "_set": "SET01",
+        "price": Decimal(rng.randint(1, 10000)) / 100, "created_at": datetime(2024, 1, 1),
+    } for i in range(count)]
+
+def price_rows(count: int, rng: random.Random) -> List[Dict[str, Any]]:
+    card_id = str(uuid4())
+    return [{"card_id": card_id, "price": Decimal(rng.randint(1, 10000)) / 100, "date": date(2024, 1, 1) + timedelta(days=i)} for i in range(count)]
+
+def per_row(run: Callable[[], Any], rows: int, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        run()
+        best = min(best, time.perf_counter() - started)
+    return best / rows
+
+def main():
+    parser = argparse.ArgumentParser(description="Time serialising list responses, per row.")
+    parser.add_argument("--rows", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    rng = random.Random(42)
+    loop = asyncio.new_event_loop()
+
+    cases = [
+        ("Card", Card, CardsRepository(), card_rows(args.rows, rng)),
+        ("PriceHistory", PriceHistory, PriceHistoryRepository(), price_rows(args.rows, rng)),
+    ]
+    print(f"{args.rows} rows per response")
+    print(f"{'model':<14}{'before':>12}{'models+adapter':>17}{'raw+orjson':>13}{'speedup':>10}")
+    for name, model, repository, rows in cases:
+        field = create_model_field(name="Response", type_=List[model], mode="serialization")
+
+        def before():
+            # Repositório constrói os modelos; o FastAPI valida de novo e serializa para JSONResponse
+            models = [model(**row) for row in rows]
+            content = loop.run_until_complete(serialize_response(field=field, response_content=models))
+            return JSONResponse(content).body
+
+        def models_with_adapter():
+            return FastJSONResponse(dump_json(List[model], [model(**row) for row in rows])).body
+
+        def raw_rows():
+            return FastJSONResponse([repository.to_response_row(row) for row in rows]).body
+
+        old = per_row(before, args.rows, args.repeat)
+        adapter = per_row(models_with_adapter, args.rows, args.repeat)
+        raw = per_row(raw_rows, args.rows, args.repeat)
+        print(f"{name:<14}{old * 1e6:>9.2f} us{adapter * 1e6:>14.2f} us{raw * 1e6:>10.2f} us{old / raw:>9.1f}x")
+    loop.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+# benchmarks/bench_statements.py
+# Custo de preparar um comando de escrita do BaseRepository até os argumentos do driver, sem banco de dados:
+#   python -m benchmarks.bench_statements --repeat 2000
+# "antes": f-string montada a cada chamada + text()/compile do SQLAlchemy feitos pelo `databases`
+# "depois": Statement do cache (SQL do driver com %s já pronto) + lista de argumentos posicionais
+import argparse
+import time
+from typing import Any, Callable, Dict, List, Tuple
+from uuid import uuid4
+from databases.backends.mysql import MySQLBackend
+from sqlalchemy import text
+from app.data.CardsRepository import CardsRepository
+from app.data.StatementCache import StatementCache
+
+def compile_like_databases(dialect, sql: str, values: Dict[str, Any]) -> Tuple[str, Any]:
+    # O mesmo caminho de databases.core.Connection._build_query + MySQLConnection._compile
+    compiled = text(sql).bindparams(**values).compile(dialect=dialect, compile_kwargs={"render_postcompile": True})
+    return compiled.string, compiled.construct_params()
+
+def per_call(run: Callable[[], Any], repeat: int) -> float:
+    for _ in range(min(repeat, 100)):
+        run()
+    started = time.perf_counter()
+    for _ in range(repeat):
+        run()
+    return (time.perf_counter() - started) / repeat
+
+def main():
+    parser = argparse.ArgumentParser(description="Time building repository write statements, per call.")
+    parser.add_argument("--repeat", type=int, default=2000)
+    parser.add_argument("--rows", type=int, default=500, help="Rows per bulk upsert.")
+    args = parser.parse_args()
+    dialect = MySQLBackend("mysql://user@localhost/db")._dialect
+    repository = CardsRepository()
+    cache = StatementCache()
+
+    insert_values = {"id": uuid4(), "name": "Card", "_type": "Creature", "mana_cost": 3, "price": 1.5}
+    insert_columns = tuple(insert_values)
+    upsert_columns = ("id", "price")
+    upsert_rows: List[Dict[str, Any]] = [{"id": str(uuid4()), "price": i} for i in range(args.rows)]
+
+    def insert_before():
+        return compile_like_databases(dialect, repository._insert_sql(insert_columns), insert_values)
+
+    def insert_after():
+        statement = cache.get(("Cards", "insert", insert_columns), lambda: repository._insert_sql(insert_columns))
+        return statement.driver_sql, statement.driver_args(insert_values)
+
+    def upsert_values():
+        return {f"{column}_{i}": row[column] for i, row in enumerate(upsert_rows) for column in upsert_columns}
+
+    def upsert_before():
+        return compile_like_databases(dialect, repository._upsert_sql(upsert_columns, len(upsert_rows)), upsert_values())
+
+    def upsert_after():
+        statement = cache.get(("Cards", "upsert", upsert_columns, len(upsert_rows)), lambda: repository._upsert_sql(upsert_columns, len(upsert_rows)))
+        return statement.driver_sql, statement.driver_args(upsert_values())
+
+    cases = [("insert", insert_before, insert_after, args.repeat), (f"upsert x{args.rows}", upsert_before, upsert_after, max(args.repeat // 100, 5))]
+    print(f"{'statement':<16}{'before':>14}{'cached':>14}{'speedup':>10}")
+    for name, before, after, repeat in cases:
+        old = per_call(before, repeat)
+        new = per_call(after, repeat)
+        print(f"{name:<16}{old * 1e6:>11.1f} us{new * 1e6:>11.1f} us{old / new:>9.1f}x")
+    print(f"cache: {cache.stats()}")
+
+if __name__ == "__main__":
+    main()
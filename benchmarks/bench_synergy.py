@@ -0,0 +1,35 @@
+# benchmarks/bench_synergy.py
+# Micro-benchmark do motor de sinergia, sem banco de dados:
+#   python -m benchmarks.bench_synergy --cards 100 --repeat 2000
+import argparse
+import random
+import timeit
+from app.services.SynergyEngine import SynergyInputs, build_matrices, score_matrices
+
+def random_deck(cards: int, themes: int, interactions: int, seed: int = 42) -> SynergyInputs:
+    rng = random.Random(seed)
+    card_ids = [f"card-{i}" for i in range(cards)]
+    return SynergyInputs(
+        cards=[(card_id, rng.randint(1, 4)) for card_id in card_ids],
+        themes=[(card_id, f"theme-{rng.randrange(themes)}") for card_id in card_ids for _ in range(rng.randint(1, 3))],
+        interactions=[tuple(rng.sample(card_ids, 2)) for _ in range(interactions)],
+    )
+
+def main():
+    parser = argparse.ArgumentParser(description="Time synergy scoring of one deck.")
+    parser.add_argument("--cards", type=int, default=100)
+    parser.add_argument("--themes", type=int, default=30)
+    parser.add_argument("--interactions", type=int, default=300)
+    parser.add_argument("--repeat", type=int, default=2000)
+    args = parser.parse_args()
+
+    inputs = random_deck(args.cards, args.themes, args.interactions)
+    matrices = build_matrices(inputs)
+    build = min(timeit.repeat(lambda: build_matrices(inputs), number=args.repeat // 10, repeat=5)) / (args.repeat // 10)
+    score = min(timeit.repeat(lambda: score_matrices(matrices), number=args.repeat, repeat=5)) / args.repeat
+    print(f"deck: {args.cards} cards, {args.themes} themes, {args.interactions} interactions")
+    print(f"build matrices: {build * 1e6:8.1f} us/deck")
+    print(f"score:          {score * 1e6:8.1f} us/deck  (score = {score_matrices(matrices):.2f})")
+
+if __name__ == "__main__":
+    main()
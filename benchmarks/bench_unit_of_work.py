@@ -0,0 +1,109 @@
+# benchmarks/bench_unit_of_work.py
+# Commits e idas ao banco por operação de negócio, com e sem unidade de trabalho, sem MySQL:
+#   python -m benchmarks.bench_unit_of_work --fsync-ms 2 --rtt-ms 0.3
+# O banco falso segue o autocommit do InnoDB: cada escrita fora de transação é um commit (um fsync com
+# innodb_flush_log_at_trx_commit=1), uma transação externa é um commit e as internas viram savepoints.
+import argparse
+import asyncio
+from contextlib import asynccontextmanager
+from datetime import date
+from decimal import Decimal
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+from unittest.mock import patch
+from uuid import uuid4
+from app.data.BaseRepository import BaseRepository
+from app.services.BaseService import BaseService
+from app.core.container import Container
+
+READ_PREFIXES = ("SELECT", "WITH")
+
+class CountingDatabase:
+    """
+    Stand-in for `databases.Database` that counts statements, round trips and durable commits.
+    """
+    url = type("URL", (), {"dialect": "mysql"})()
+
+    def __init__(self):
+        self.depth = 0
+        self.wrote = False
+        self.statements = self.round_trips = self.commits = 0
+
+    def _statement(self, query: str):
+        self.statements += 1
+        self.round_trips += 1
+        is_write = not str(query).lstrip().upper().startswith(READ_PREFIXES)
+        if is_write and self.depth == 0:
+            self.commits += 1  # Autocommit
+        self.wrote = self.wrote or is_write
+
+    @asynccontextmanager
+    async def transaction(self):
+        self.round_trips += 1  # BEGIN ou SAVEPOINT
+        if self.depth == 0:
+            self.wrote = False
+        self.depth += 1
+        try:
+            yield
+        finally:
+            self.depth -= 1
+            self.round_trips += 1  # COMMIT ou RELEASE SAVEPOINT
+            if self.depth == 0 and self.wrote:
+                self.commits += 1
+
+    async def execute(self, query: str, values: Optional[Dict[str, Any]] = None) -> int:
+        self._statement(query)
+        return 1
+
+    async def fetch_one(self, query: str, values: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        self._statement(query)
+        return {"quantity": 2, "mana_cost": 2, "color": "Red", "price": Decimal("1.50"), "card_id": uuid4(), "date": date(2024, 1, 1)}
+
+    async def fetch_all(self, query: str, values: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        self._statement(query)
+        deck_id = (values or {}).get("deck_id_0")
+        if deck_id is None:
+            return []
+        return [{"id": deck_id, "deck_id": deck_id, "quantity": 2, "mana_cost": 2, "color": "Red", "price": Decimal("1.50")}]
+
+@asynccontextmanager
+async def no_unit_of_work(self):
+    # Como era antes: cada chamada de repositório confirma sozinha
+    yield None
+
+def operations(container: Container) -> Dict[str, Callable[[], Awaitable[Any]]]:
+    deck_cards = [{"card_id": uuid4(), "quantity": 1 + i % 4} for i in range(60)]
+    return {
+        "add card to deck": lambda: container.deck_cards_service.add_card_to_deck(uuid4(), uuid4(), 2),
+        "remove card from deck": lambda: container.deck_cards_service.remove_card_from_deck(uuid4(), uuid4()),
+        "apply deck diff": lambda: container.deck_cards_service.apply_deck_diff(uuid4(), [(uuid4(), 2), (uuid4(), -1), (uuid4(), 1)]),
+        "create deck, 60 cards": lambda: container.deck_service.create_deck_with_cards(uuid4(), "Deck", deck_cards, return_representation=False),
+        "record price": lambda: container.price_service.record_price(uuid4(), Decimal("2.00"), date(2024, 2, 1)),
+    }
+
+async def count(run: Callable[[], Awaitable[Any]]) -> CountingDatabase:
+    database = BaseRepository.database = CountingDatabase()
+    await run()
+    return database
+
+async def run(rtt_ms: float, fsync_ms: float):
+    container = Container()
+    cost = lambda database: database.round_trips * rtt_ms + database.commits * fsync_ms
+    print(f"{'operation':<24}{'commits':>14}{'round trips':>16}{'est. ms':>18}")
+    for name, operation in operations(container).items():
+        with patch.object(BaseService, "unit_of_work", no_unit_of_work):
+            before = await count(operation)
+        after = await count(operation)
+        print(
+            f"{name:<24}{before.commits:>7} -> {after.commits:<4}{before.round_trips:>9} -> {after.round_trips:<4}"
+            f"{cost(before):>9.1f} -> {cost(after):<6.1f}"
+        )
+
+def main():
+    parser = argparse.ArgumentParser(description="Count commits per business operation with and without a unit of work.")
+    parser.add_argument("--rtt-ms", type=float, default=0.3, help="Network round trip to MySQL.")
+    parser.add_argument("--fsync-ms", type=float, default=2.0, help="Redo log flush per durable commit.")
+    args = parser.parse_args()
+    asyncio.run(run(args.rtt_ms, args.fsync_ms))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+# benchmarks/load_test.py
+# Teste de carga da API contra o MySQL local populado por benchmarks.seed:
+#   uvicorn app.main:app --port 8000
+#   python -m benchmarks.load_test --duration 60 --concurrency 32 --save-baseline benchmarks/results/baseline.json
+#   python -m benchmarks.load_test --duration 60 --concurrency 32 --baseline benchmarks/results/baseline.json
+# Sai com código 1 quando alguma operação regrediu além de --max-regression em relação ao baseline.
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+from collections import defaultdict
+from datetime import date, timedelta
+from typing import Awaitable, Callable, Dict, List, Optional
+import httpx
+from benchmarks.report import compare, format_table, load_baseline, save_baseline, summarize
+
+class Recorder:
+    """
+    Latency samples (seconds) and error counts per operation.
+    """
+    def __init__(self):
+        self.samples: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Dict[str, int] = defaultdict(int)
+
+    async def request(self, client: httpx.AsyncClient, name: str, method: str, url: str, **kwargs) -> Optional[httpx.Response]:
+        started = time.perf_counter()
+        try:
+            response = await client.request(method, url, **kwargs)
+        except httpx.HTTPError:
+            self.errors[name] += 1
+            return None
+        elapsed = time.perf_counter() - started
+        if response.status_code >= 400:
+            self.errors[name] += 1
+        else:
+            self.samples[name].append(elapsed)
+        return response
+
+# Cenários: cada um é uma sequência curta de requisições de um usuário real
+
+async def card_search(client, recorder: Recorder, rng: random.Random, dataset: dict):
+    name = rng.choice(dataset["card_names"])
+    words = name.split()
+    query = words[0][:rng.randint(3, len(words[0]))] if rng.random() < 0.5 else " ".join(words[:2])
+    await recorder.request(client, "card_search", "GET", "/api/v1/cards/search", params={"q": query, "limit": 20})
+
+async def deck_render(client, recorder: Recorder, rng: random.Random, dataset: dict):
+    deck_id = rng.choice(dataset["deck_ids"])
+    await asyncio.gather(
+        recorder.request(client, "deck_render.cards", "GET", f"/api/v1/decks/{deck_id}/cards", params={"expand": "card"}),
+        recorder.request(client, "deck_render.summary", "GET", f"/api/v1/decks/{deck_id}/summary"),
+    )
+
+async def deck_edit_burst(client, recorder: Recorder, rng: random.Random, dataset: dict):
+    # Rajada de edições concorrentes no mesmo deck, desfeitas no fim para o dataset não crescer
+    deck_id = rng.choice(dataset["deck_ids"])
+    card_ids = rng.sample(dataset["card_ids"], 5)
+    await asyncio.gather(*[
+        recorder.request(client, "deck_edit.add", "POST", f"/api/v1/decks/{deck_id}/cards/", params={"card_id": card_id, "quantity": 1})
+        for card_id in card_ids
+    ])
+    await recorder.request(client, "deck_edit.diff", "PATCH", f"/api/v1/decks/{deck_id}/cards",
+                           json=[{"card_id": card_id, "delta": -1} for card_id in card_ids])
+
+async def price_history(client, recorder: Recorder, rng: random.Random, dataset: dict):
+    card_id = rng.choice(dataset["card_ids"])
+    start = date.today() - timedelta(days=rng.choice([30, 90, dataset.get("price_days", 365)]))
+    await recorder.request(client, "price_history.chart", "GET", f"/api/v1/cards/{card_id}/price-history",
+                           params={"from": start.isoformat(), "max_points": 200})
+    await recorder.request(client, "price_history.weekly", "GET", f"/api/v1/cards/{card_id}/price-history", params={"bucket": "week"})
+
+SCENARIOS: Dict[str, Callable[..., Awaitable[None]]] = {
+    "card_search": card_search,
+    "deck_render": deck_render,
+    "deck_edit_burst": deck_edit_burst,
+    "price_history": price_history,
+}
+# Mistura padrão: leitura domina, edições em rajada são raras
+DEFAULT_WEIGHTS = {"card_search": 4, "deck_render": 3, "deck_edit_burst": 1, "price_history": 2}
+
+async def run(args: argparse.Namespace) -> int:
+    with open(args.dataset) as file:
+        dataset = json.load(file)
+    weights = {name: DEFAULT_WEIGHTS[name] for name in (args.scenario or DEFAULT_WEIGHTS)}
+    names, scenario_weights = list(weights), list(weights.values())
+    recorder = Recorder()
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+
+    async with httpx.AsyncClient(base_url=args.url, limits=limits, timeout=args.timeout) as client:
+        async def user(index: int, deadline: float):
+            rng = random.Random(args.seed + index)
+            while time.monotonic() < deadline:
+                scenario = rng.choices(names, scenario_weights)[0]
+                await SCENARIOS[scenario](client, recorder, rng, dataset)
+
+        if args.warmup > 0:
+            await asyncio.gather(*[user(i, time.monotonic() + args.warmup) for i in range(args.concurrency)])
+            recorder = Recorder()
+        started = time.monotonic()
+        await asyncio.gather(*[user(i, started + args.duration) for i in range(args.concurrency)])
+        elapsed = time.monotonic() - started
+
+    summary = summarize(recorder.samples, recorder.errors, elapsed)
+    print(f"{args.url}: {args.concurrency} concurrent users, {elapsed:.1f}s, scenarios: {', '.join(names)}")
+    print(format_table(summary))
+
+    settings = {"concurrency": args.concurrency, "duration": args.duration, "scenarios": names, "seed": args.seed}
+    if args.save_baseline:
+        save_baseline(args.save_baseline, summary, settings)
+        print(f"Baseline saved to {args.save_baseline}")
+    if args.baseline:
+        baseline = load_baseline(args.baseline)
+        if baseline is None:
+            print(f"No baseline at {args.baseline}; run with --save-baseline first.")
+            return 1
+        regressions = compare(summary, baseline, max_regression=args.max_regression)
+        if regressions:
+            print("Regressions against the baseline:")
+            for regression in regressions:
+                print(f"  {regression}")
+            return 1
+        print("No regressions against the baseline.")
+    return 0
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the API with scripted user scenarios.")
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--dataset", default="benchmarks/results/dataset.json", help="Manifest written by benchmarks.seed.")
+    parser.add_argument("--scenario", action="append", choices=sorted(SCENARIOS), help="Run only this scenario; repeat for several.")
+    parser.add_argument("--concurrency", type=int, default=32, help="Simulated users running scenarios back to back.")
+    parser.add_argument("--duration", type=float, default=60.0, help="Measured seconds.")
+    parser.add_argument("--warmup", type=float, default=5.0, help="Unmeasured seconds before the run (caches, pools).")
+    parser.add_argument("--timeout", type=float, default=10.0)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--save-baseline", help="Write this run's results as the baseline.")
+    parser.add_argument("--baseline", help="Compare against this baseline and fail on regressions.")
+    parser.add_argument("--max-regression", type=float, default=0.15, help="Allowed p95/throughput change (0.15 = 15%%).")
+    sys.exit(asyncio.run(run(parser.parse_args())))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+# benchmarks/report.py
+# Percentis, vazão e comparação com o baseline salvo dos testes de carga (benchmarks.load_test)
+import json
+import math
+import os
+from typing import Dict, List, Optional
+
+PERCENTILES = (50, 90, 95, 99)
+
+def percentile(sorted_samples: List[float], q: float) -> float:
+    """
+    Nearest-rank percentile of already sorted samples.
+    """
+    if not sorted_samples:
+        return 0.0
+    rank = max(1, math.ceil(q / 100 * len(sorted_samples)))
+    return sorted_samples[rank - 1]
+
+def summarize(samples: Dict[str, List[float]], errors: Dict[str, int], elapsed: float) -> Dict[str, dict]:
+    """
+    Latency percentiles (ms), throughput (req/s) and error count of each operation.
+    """
+    summary = {}
+    for name in sorted(set(samples) | set(errors)):
+        latencies = sorted(samples.get(name, []))
+        summary[name] = {
+            "requests": len(latencies),
+            "errors": errors.get(name, 0),
+            "throughput": round(len(latencies) / elapsed, 2) if elapsed > 0 else 0.0,
+            **{f"p{q}_ms": round(1000 * percentile(latencies, q), 3) for q in PERCENTILES},
+            "max_ms": round(1000 * latencies[-1], 3) if latencies else 0.0,
+        }
+    return summary
+
+def format_table(summary: Dict[str, dict]) -> str:
+    header = f"{'operation':<28}{'reqs':>8}{'errs':>6}{'req/s':>9}" + "".join(f"{'p' + str(q):>10}" for q in PERCENTILES) + f"{'max':>10}"
+    lines = [header, "-" * len(header)]
+    for name, row in summary.items():
+        lines.append(
+            f"{name:<28}{row['requests']:>8}{row['errors']:>6}{row['throughput']:>9.1f}"
+            + "".join(f"{row[f'p{q}_ms']:>10.1f}" for q in PERCENTILES)
+            + f"{row['max_ms']:>10.1f}"
+        )
+    return "\n".join(lines)
+
+def compare(summary: Dict[str, dict], baseline: Dict[str, dict], max_regression: float = 0.15, min_delta_ms: float = 1.0) -> List[str]:
+    """
+    Operations whose p95 grew, or whose throughput fell, by more than `max_regression` against the baseline.
+    Latency changes under `min_delta_ms` are ignored as noise.
+    """
+    regressions = []
+    for name, row in summary.items():
+        before = baseline.get(name)
+        if before is None:
+            continue
+        if row["p95_ms"] - before["p95_ms"] > max(min_delta_ms, max_regression * before["p95_ms"]):
+            regressions.append(f"{name}: p95 {before['p95_ms']:.1f} ms -> {row['p95_ms']:.1f} ms")
+        if before["throughput"] > 0 and row["throughput"] < (1 - max_regression) * before["throughput"]:
+            regressions.append(f"{name}: throughput {before['throughput']:.1f} -> {row['throughput']:.1f} req/s")
+        if row["errors"] > before["errors"]:
+            regressions.append(f"{name}: errors {before['errors']} -> {row['errors']}")
+    return regressions
+
+def load_baseline(path: str) -> Optional[Dict[str, dict]]:
+    try:
+        with open(path) as file:
+            return json.load(file)["operations"]
+    except FileNotFoundError:
+        return None
+
+def save_baseline(path: str, summary: Dict[str, dict], settings: dict):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w") as file:
+        json.dump({"settings": settings, "operations": summary}, file, indent=2, sort_keys=True)
@@ -0,0 +1,163 @@
+# benchmarks/seed.py
+# Popula o schema de mysql-init com volumes realistas para os testes de carga:
+#   python -m benchmarks.seed --cards 100000 --prices 1000000 --decks 50000
+# Os dados são determinísticos (--seed) e uma amostra dos ids vai para o manifesto lido por benchmarks.load_test.
+import argparse
+import asyncio
+import json
+import os
+import random
+import time
+import uuid
+from datetime import date, timedelta
+from decimal import Decimal
+from typing import Any, Dict, List, Sequence
+from app.core import config
+from app.data.BaseRepository import BaseRepository
+from app.data.CardsRepository import PriceHistoryRepository
+from app.data.DeckRepository import DeckSummaryRepository
+from app.services.CardService import PriceService
+from app.services.DeckService import DeckSummaryService
+
+INSERT_CHUNK_SIZE = 1000
+MANIFEST_SAMPLE_SIZE = 2000
+
+TYPES = ["Creature", "Instant", "Sorcery", "Enchantment", "Artifact", "Planeswalker", "Land"]
+COLORS = ["White", "Blue", "Black", "Red", "Green", None]
+SETS = [f"SET{i:02d}" for i in range(40)]
+THEMES = ["Aggro", "Control", "Ramp", "Tokens", "Graveyard", "Lifegain", "Counters", "Spells", "Artifacts", "Tribal", "Mill", "Burn"]
+INTERACTION_TYPES = ["combo", "synergy", "counter", "enabler"]
+ADJECTIVES = ["Ancient", "Blazing", "Silent", "Feral", "Radiant", "Hollow", "Savage", "Gilded", "Frozen", "Verdant", "Shadow", "Storm", "Iron", "Crimson", "Astral"]
+NOUNS = ["Dragon", "Sentinel", "Wurm", "Oracle", "Knight", "Specter", "Golem", "Hydra", "Phoenix", "Shaman", "Reaver", "Titan", "Warden", "Angel", "Lich"]
+PLACES = ["the Wastes", "Dawn", "the Deep", "Ash", "the Vale", "Ruin", "the Spire", "Thorns", "the Tides", "Embers"]
+
+def make_id(rng: random.Random) -> str:
+    return str(uuid.UUID(int=rng.getrandbits(128), version=4))
+
+def card_name(rng: random.Random, i: int) -> str:
+    name = f"{rng.choice(ADJECTIVES)} {rng.choice(NOUNS)}"
+    if rng.random() < 0.5:
+        name += f" of {rng.choice(PLACES)}"
+    return f"{name} {i}"  # Sufixo garante nomes distintos, como reimpressões numeradas
+
+async def insert_rows(connection, table: str, columns: Sequence[str], rows: List[Sequence[Any]]):
+    """
+    Insert rows with multi-row INSERTs of INSERT_CHUNK_SIZE rows.
+    """
+    for start in range(0, len(rows), INSERT_CHUNK_SIZE):
+        chunk = rows[start:start + INSERT_CHUNK_SIZE]
+        values: Dict[str, Any] = {}
+        placeholders = []
+        for i, row in enumerate(chunk):
+            placeholders.append("(" + ", ".join(f":{column}_{i}" for column in columns) + ")")
+            values.update({f"{column}_{i}": value for column, value in zip(columns, row)})
+        query = f"INSERT INTO {table} ({', '.join(columns)}) VALUES {', '.join(placeholders)}"
+        await connection.execute(query=query, values=values)
+
+async def seed(args: argparse.Namespace):
+    rng = random.Random(args.seed)
+    today = date.today()
+    started = time.monotonic()
+
+    def report(message: str):
+        print(f"[{time.monotonic() - started:7.1f}s] {message}")
+
+    users = [(make_id(rng), f"user{i}", f"user{i}@example.com", "hashed_password") for i in range(args.users)]
+    cards = []
+    for i in range(args.cards):
+        card_type = rng.choice(TYPES)
+        is_creature = card_type == "Creature"
+        cards.append((
+            make_id(rng), card_name(rng, i), card_type, 0 if card_type == "Land" else rng.randint(1, 8), rng.choice(COLORS),
+            rng.randint(0, 8) if is_creature else None, rng.randint(1, 8) if is_creature else None,
+            f"When this enters, {rng.choice(['draw a card', 'gain 2 life', 'deal 2 damage', 'create a token', 'scry 2'])}.",
+            rng.choice(SETS), Decimal(rng.lognormvariate(0, 1.2)).quantize(Decimal("0.01")),
+        ))
+    card_ids = [card[0] for card in cards]
+
+    database = config.create_database()
+    BaseRepository.database = database
+    await database.connect()
+    try:
+        async with database.connection() as connection:
+            # Carga em massa: sem checagem de FK/unicidade por linha nesta sessão
+            await connection.execute("SET SESSION foreign_key_checks = 0, unique_checks = 0")
+            await insert_rows(connection, "Users", ("id", "username", "email", "password_hash"), users)
+            report(f"{len(users)} users")
+            await insert_rows(connection, "Cards", ("id", "name", "_type", "mana_cost", "color", "power", "toughness", "effect", "_set", "price"), cards)
+            report(f"{len(cards)} cards")
+
+            themes = [(make_id(rng), card_id, theme) for card_id in card_ids for theme in rng.sample(THEMES, rng.randint(1, 3))]
+            await insert_rows(connection, "Card_Themes", ("id", "card_id", "theme"), themes)
+            report(f"{len(themes)} card themes")
+
+            pairs = set()
+            while len(pairs) < args.interactions:
+                card_a, card_b = rng.sample(card_ids, 2)
+                pairs.add((card_a, card_b))
+            await insert_rows(connection, "Card_Interactions", ("card_id_1", "card_id_2", "interaction_type"),
+                              [(card_a, card_b, rng.choice(INTERACTION_TYPES)) for card_a, card_b in pairs])
+            report(f"{len(pairs)} card interactions")
+
+            # Histórico diário consecutivo terminando hoje, como um random walk a partir do preço atual
+            days = max(1, args.prices // max(1, args.cards))
+            price_rows = []
+            for card in cards:
+                price = float(card[-1])
+                for day in range(days):
+                    price_rows.append((card[0], Decimal(max(0.01, price)).quantize(Decimal("0.01")), today - timedelta(days=day)))
+                    price *= rng.uniform(0.95, 1.05)
+                if len(price_rows) >= 50 * INSERT_CHUNK_SIZE:
+                    await insert_rows(connection, "Price_History", ("card_id", "price", "date"), price_rows)
+                    price_rows = []
+            await insert_rows(connection, "Price_History", ("card_id", "price", "date"), price_rows)
+            report(f"{days * len(cards)} price history rows")
+
+            decks = [(make_id(rng), rng.choice(users)[0], f"Deck {i}") for i in range(args.decks)]
+            await insert_rows(connection, "Decks", ("id", "user_id", "name"), decks)
+            deck_cards = []
+            for deck_id, _, _ in decks:
+                for card_id in rng.sample(card_ids, args.cards_per_deck):
+                    deck_cards.append((deck_id, card_id, rng.randint(1, 4)))
+                if len(deck_cards) >= 50 * INSERT_CHUNK_SIZE:
+                    await insert_rows(connection, "Deck_Cards", ("deck_id", "card_id", "quantity"), deck_cards)
+                    deck_cards = []
+            await insert_rows(connection, "Deck_Cards", ("deck_id", "card_id", "quantity"), deck_cards)
+            report(f"{len(decks)} decks with {args.cards_per_deck} cards each")
+
+        # Projeções derivadas, pelos mesmos caminhos de código da aplicação
+        price_service = PriceService(PriceHistoryRepository())
+        for start in range(0, len(card_ids), INSERT_CHUNK_SIZE):
+            await price_service.rebuild_price_rollups(card_ids[start:start + INSERT_CHUNK_SIZE])
+        report("latest prices and price rollups")
+        await DeckSummaryService(DeckSummaryRepository()).rebuild_all()
+        report("deck summaries")
+    finally:
+        await database.disconnect()
+
+    manifest = {
+        "seed": args.seed,
+        "card_ids": rng.sample(card_ids, min(MANIFEST_SAMPLE_SIZE, len(card_ids))),
+        "card_names": [card[1] for card in rng.sample(cards, min(MANIFEST_SAMPLE_SIZE, len(cards)))],
+        "deck_ids": [deck[0] for deck in rng.sample(decks, min(MANIFEST_SAMPLE_SIZE, len(decks)))],
+        "price_days": days,
+    }
+    os.makedirs(os.path.dirname(args.manifest) or ".", exist_ok=True)
+    with open(args.manifest, "w") as file:
+        json.dump(manifest, file)
+    report(f"manifest written to {args.manifest}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Seed the database with a realistic dataset for load testing.")
+    parser.add_argument("--users", type=int, default=5000)
+    parser.add_argument("--cards", type=int, default=100000)
+    parser.add_argument("--prices", type=int, default=1000000, help="Price_History rows, spread evenly as daily history per card.")
+    parser.add_argument("--decks", type=int, default=50000)
+    parser.add_argument("--cards-per-deck", type=int, default=40)
+    parser.add_argument("--interactions", type=int, default=200000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--manifest", default="benchmarks/results/dataset.json", help="Sample of seeded ids used by the load test.")
+    asyncio.run(seed(parser.parse_args()))
+
+if __name__ == "__main__":
+    main()
@@ -19,7 +19,20 @@ CREATE TABLE Cards (
     effect TEXT,
     _set VARCHAR(50),  -- 'set' é palavra reservada em MySQL, coloquei entre crases
     price DECIMAL(10, 2),
-    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    -- Versão da linha para ETag/Last-Modified; microssegundos para distinguir escritas no mesmo segundo
+    updated_at TIMESTAMP(6) NOT NULL DEFAULT CURRENT_TIMESTAMP(6) ON UPDATE CURRENT_TIMESTAMP(6),
+    -- Índices de texto completo com parser ngram para busca por nome/efeito sem LIKE '%...%'
+    FULLTEXT INDEX ft_cards_name (name) WITH PARSER ngram,
+    FULLTEXT INDEX ft_cards_name_effect (name, effect) WITH PARSER ngram,
+    -- Índices compostos do motor de filtros (CardsRepository.filter_cards):
+    -- igualdade/IN na primeira coluna, faixa de custo de mana na segunda
+    INDEX idx_cards_type_cost (_type, mana_cost),
+    INDEX idx_cards_color_cost (color, mana_cost),
+    INDEX idx_cards_set_cost (_set, mana_cost),
+    INDEX idx_cards_cost (mana_cost),
+    INDEX idx_cards_power_toughness (power, toughness),
+    INDEX idx_cards_price (price)
 );
 
 -- Tabela de decks
@@ -28,6 +41,8 @@ CREATE TABLE Decks (
     user_id CHAR(36) NOT NULL,
     name VARCHAR(100) NOT NULL,
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    -- Versão do deck e das suas cartas: DeckCardsService atualiza a cada mudança em Deck_Cards
+    updated_at TIMESTAMP(6) NOT NULL DEFAULT CURRENT_TIMESTAMP(6) ON UPDATE CURRENT_TIMESTAMP(6),
     FOREIGN KEY (user_id) REFERENCES Users(id) ON DELETE CASCADE
 );
 
@@ -37,6 +52,7 @@ CREATE TABLE Deck_Cards (
     card_id CHAR(36) NOT NULL,
     quantity INT DEFAULT 1,
     PRIMARY KEY (deck_id, card_id),
+    INDEX idx_deck_cards_card_deck (card_id, deck_id),  -- Índice reverso: decks que contêm uma carta
     FOREIGN KEY (deck_id) REFERENCES Decks(id) ON DELETE CASCADE,
     FOREIGN KEY (card_id) REFERENCES Cards(id) ON DELETE CASCADE
 );
@@ -46,6 +62,7 @@ CREATE TABLE Card_Themes (
     id CHAR(36) PRIMARY KEY DEFAULT (UUID()),
     card_id CHAR(36) NOT NULL,
     theme VARCHAR(50) NOT NULL,
+    INDEX idx_card_themes_theme_card (theme, card_id),  -- Filtro por tema
     FOREIGN KEY (card_id) REFERENCES Cards(id) ON DELETE CASCADE
 );
 
@@ -55,6 +72,7 @@ CREATE TABLE Card_Interactions (
     card_id_2 CHAR(36) NOT NULL,
     interaction_type VARCHAR(50) NOT NULL,
     PRIMARY KEY (card_id_1, card_id_2),
+    INDEX idx_card_interactions_card2 (card_id_2, card_id_1),  -- Busca pelo segundo lado do par
     FOREIGN KEY (card_id_1) REFERENCES Cards(id) ON DELETE CASCADE,
     FOREIGN KEY (card_id_2) REFERENCES Cards(id) ON DELETE CASCADE
 );
@@ -64,10 +82,35 @@ CREATE TABLE Price_History (
     card_id CHAR(36) NOT NULL,
     price DECIMAL(10, 2) NOT NULL,
     date DATE NOT NULL,
+    updated_at TIMESTAMP(6) NOT NULL DEFAULT CURRENT_TIMESTAMP(6) ON UPDATE CURRENT_TIMESTAMP(6),
     PRIMARY KEY (card_id, date),
     FOREIGN KEY (card_id) REFERENCES Cards(id) ON DELETE CASCADE
 );
 
+-- Preço mais recente de cada carta, mantido a cada novo registro em Price_History
+CREATE TABLE Latest_Prices (
+    card_id CHAR(36) PRIMARY KEY,
+    price DECIMAL(10, 2) NOT NULL,
+    date DATE NOT NULL,
+    FOREIGN KEY (card_id) REFERENCES Cards(id) ON DELETE CASCADE
+);
+
+-- Candles OHLC semanais e mensais de Price_History (o diário é a própria Price_History)
+CREATE TABLE Price_Rollups (
+    card_id CHAR(36) NOT NULL,
+    bucket ENUM('week', 'month') NOT NULL,
+    bucket_start DATE NOT NULL,
+    open_price DECIMAL(10, 2) NOT NULL,
+    open_date DATE NOT NULL,
+    high_price DECIMAL(10, 2) NOT NULL,
+    low_price DECIMAL(10, 2) NOT NULL,
+    close_price DECIMAL(10, 2) NOT NULL,
+    close_date DATE NOT NULL,
+    samples INT NOT NULL DEFAULT 1,
+    PRIMARY KEY (card_id, bucket, bucket_start),
+    FOREIGN KEY (card_id) REFERENCES Cards(id) ON DELETE CASCADE
+);
+
 -- Tabela de pontuações de sinergia
 CREATE TABLE Synergy_Scores (
     deck_id CHAR(36) NOT NULL,
@@ -76,3 +119,15 @@ CREATE TABLE Synergy_Scores (
     PRIMARY KEY (deck_id, calculated_at),
     FOREIGN KEY (deck_id) REFERENCES Decks(id) ON DELETE CASCADE
 );
+
+-- Projeção materializada do resumo de cada deck, mantida incrementalmente
+-- por DeckCardsService/PriceService e reconstruída por `python -m app.cli rebuild-deck-summaries`
+CREATE TABLE Deck_Summary (
+    deck_id CHAR(36) PRIMARY KEY,
+    total_cards INT NOT NULL DEFAULT 0,
+    mana_curve JSON NOT NULL,          -- {"custo de mana": quantidade}
+    color_distribution JSON NOT NULL,  -- {"cor": quantidade}
+    deck_value DECIMAL(12, 2) NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    FOREIGN KEY (deck_id) REFERENCES Decks(id) ON DELETE CASCADE
+);
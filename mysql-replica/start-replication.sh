@@ -0,0 +1,23 @@
+#!/bin/bash
+# Executado pelo entrypoint da réplica depois do init.sql: aponta a réplica para o primário,
+# a partir da posição atual do binlog (o schema já foi criado localmente), e liga a replicação.
+set -e
+
+until mysqladmin ping -h mysql -uroot -p"$MYSQL_ROOT_PASSWORD" --silent; do
+    echo "Waiting for the primary..."
+    sleep 2
+done
+
+read -r SOURCE_FILE SOURCE_POSITION < <(mysql -h mysql -uroot -p"$MYSQL_ROOT_PASSWORD" -N -e "SHOW MASTER STATUS" | awk '{print $1, $2}')
+
+mysql -uroot -p"$MYSQL_ROOT_PASSWORD" <<SQL
+CHANGE REPLICATION SOURCE TO
+    SOURCE_HOST = 'mysql',
+    SOURCE_USER = 'root',
+    SOURCE_PASSWORD = '$MYSQL_ROOT_PASSWORD',
+    SOURCE_LOG_FILE = '$SOURCE_FILE',
+    SOURCE_LOG_POS = $SOURCE_POSITION,
+    GET_SOURCE_PUBLIC_KEY = 1;
+START REPLICA;
+SET PERSIST read_only = ON;
+SQL
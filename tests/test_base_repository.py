@@ -0,0 +1,248 @@
+import pytest
+from datetime import date
+from decimal import Decimal
+from contextlib import asynccontextmanager
+from unittest.mock import AsyncMock
+from uuid import UUID, uuid4
+from app.core.streaming import ndjson_stream
+from app.data.BaseRepository import encode_cursor, decode_cursor
+from app.data.CardsRepository import CardsRepository, PriceHistoryRepository
+from app.data.DeckRepository import DecksRepository
+from app.domain.CardModel import Card
+from app.domain.DeckModel import Deck
+from app.services.CardService import PriceService
+
+def card_row(card_id):
+    return {"id": card_id, "name": "Card", "_type": "Creature", "mana_cost": 1}
+
+@asynccontextmanager
+async def fake_transaction():
+    yield
+
+@pytest.fixture
+def cards_repository():
+    # Repositório com um banco de dados falso
+    repository = CardsRepository()
+    repository.database = AsyncMock()
+    repository.database.transaction = fake_transaction
+    return repository
+
+@pytest.mark.asyncio
+async def test_list_returns_next_cursor_when_more_rows(cards_repository):
+    ids = sorted(str(uuid4()) for _ in range(3))
+    cards_repository.database.fetch_all.return_value = [card_row(card_id) for card_id in ids]
+
+    page = await cards_repository.list(limit=2)
+
+    query = cards_repository.database.fetch_all.call_args.kwargs["query"]
+    values = cards_repository.database.fetch_all.call_args.kwargs["values"]
+    assert query == "SELECT * FROM Cards ORDER BY id LIMIT :limit"
+    assert values == {"limit": 3}
+    assert [str(card.id) for card in page.items] == ids[:2]
+    assert decode_cursor(page.next_cursor, 1) == [ids[1]]
+
+@pytest.mark.asyncio
+async def test_list_last_page_has_no_cursor(cards_repository):
+    card_id = str(uuid4())
+    cards_repository.database.fetch_all.return_value = [card_row(card_id)]
+
+    page = await cards_repository.list(limit=2, after=encode_cursor(["0"]))
+
+    query = cards_repository.database.fetch_all.call_args.kwargs["query"]
+    values = cards_repository.database.fetch_all.call_args.kwargs["values"]
+    assert query == "SELECT * FROM Cards WHERE id > :after_0 ORDER BY id LIMIT :limit"
+    assert values == {"after_0": "0", "limit": 3}
+    assert page.next_cursor is None
+
+@pytest.mark.asyncio
+async def test_list_composite_key_uses_row_comparison():
+    repository = PriceHistoryRepository()
+    repository.database = AsyncMock()
+    repository.database.fetch_all.return_value = []
+
+    await repository.list(after=encode_cursor(["abc", "2024-01-01"]))
+
+    query = repository.database.fetch_all.call_args.kwargs["query"]
+    assert "WHERE (card_id, date) > (:after_0, :after_1) ORDER BY card_id, date" in query
+
+@pytest.mark.asyncio
+async def test_list_rejects_malformed_cursor(cards_repository):
+    with pytest.raises(ValueError):
+        await cards_repository.list(after="not-a-cursor")
+
+@pytest.mark.asyncio
+async def test_iterate_walks_table_in_keyset_chunks(cards_repository):
+    ids = sorted(str(uuid4()) for _ in range(5))
+    queries = []
+
+    async def fake_iterate(query, values):
+        # Simula o banco aplicando o keyset e o LIMIT
+        queries.append((query, values))
+        start = ids.index(values["after_0"]) + 1 if "after_0" in values else 0
+        for card_id in ids[start:start + values["limit"]]:
+            yield card_row(card_id)
+
+    cards_repository.database.iterate = fake_iterate
+
+    rows = [row async for row in cards_repository.iterate(chunk_size=2)]
+
+    assert [row["id"] for row in rows] == ids
+    assert len(queries) == 3
+    assert queries[1][1] == {"after_0": ids[1], "limit": 2}
+
+@pytest.mark.asyncio
+async def test_ndjson_stream_encodes_rows():
+    async def rows():
+        yield {"card_id": "abc", "price": Decimal("1.50"), "date": date(2024, 1, 2)}
+        yield {"card_id": "def", "price": Decimal("2.00"), "date": date(2024, 1, 3)}
+
+    chunks = [chunk async for chunk in ndjson_stream(rows(), rows_per_chunk=1)]
+
+    assert chunks == [
+        b'{"card_id": "abc", "price": "1.50", "date": "2024-01-02"}\n',
+        b'{"card_id": "def", "price": "2.00", "date": "2024-01-03"}\n',
+    ]
+
+@pytest.mark.asyncio
+async def test_bulk_upsert_uses_multi_row_insert():
+    repository = PriceHistoryRepository()
+    repository.database = AsyncMock()
+    repository.database.transaction = fake_transaction
+    rows = [{"card_id": "a", "price": Decimal("1.00"), "date": date(2024, 1, i)} for i in range(1, 4)]
+
+    result = await repository.bulk_upsert(rows, chunk_size=2)
+
+    queries = [call.kwargs["query"] for call in repository.database.execute.call_args_list]
+    assert queries[0] == (
+        "INSERT INTO Price_History (card_id, price, date) VALUES "
+        "(:card_id_0, :price_0, :date_0), (:card_id_1, :price_1, :date_1) "
+        "ON DUPLICATE KEY UPDATE price = VALUES(price)"
+    )
+    assert len([query for query in queries if query.startswith("INSERT INTO Price_History")]) == 2
+    # Depois da carga, o preço mais recente e os candles da carta são recalculados
+    assert [query.split(" (")[0] for query in queries[2:]] == ["INSERT INTO Latest_Prices", "INSERT INTO Price_Rollups", "INSERT INTO Price_Rollups"]
+    assert result.processed == 3 and result.failed == []
+
+@pytest.mark.asyncio
+async def test_bulk_upsert_reports_failed_rows():
+    repository = PriceHistoryRepository()
+    repository.database = AsyncMock()
+    repository.database.transaction = fake_transaction
+
+    missing_card, first_card, last_card = str(uuid4()), str(uuid4()), str(uuid4())
+    attempts, written, savepoints = [], [], []
+
+    @asynccontextmanager
+    async def transaction():
+        savepoints.append("open")
+        yield
+    repository.database.transaction = transaction
+
+    async def execute(query, values):
+        if not query.startswith("INSERT INTO Price_History"):
+            return  # Recalculo de Latest_Prices e dos candles
+        card_ids = [str(value) for key, value in values.items() if key.startswith("card_id_")]
+        attempts.append(card_ids)
+        # O banco rejeita a carta inexistente pela FK; o lote inteiro falha junto
+        if missing_card in card_ids:
+            raise Exception("foreign key constraint fails")
+        written.extend(card_ids)
+
+    repository.database.execute.side_effect = execute
+    service = PriceService(repository)
+    rows = [
+        {"card_id": first_card, "price": "1.00", "date": "2024-01-01"},
+        {"card_id": missing_card, "price": "2.00", "date": "2024-01-01"},
+        {"card_id": str(uuid4()), "price": "not a price", "date": "2024-01-01"},
+        {"card_id": last_card, "price": "3.00", "date": "2024-01-01"},
+    ]
+
+    result = await service.bulk_upsert(rows)
+
+    assert result.processed == 2
+    assert [error.index for error in result.failed] == [1, 2]
+    assert "foreign key" in result.failed[0].error
+    # O lote de três linhas válidas falha e é refeito linha a linha, cada uma no seu savepoint
+    assert attempts == [[first_card, missing_card, last_card], [first_card], [missing_card], [last_card]]
+    assert written == [first_card, last_card]
+    assert len(savepoints) == 6  # O bulk, o lote, uma por linha refeita e a do recálculo de Latest_Prices
+
+@pytest.mark.asyncio
+async def test_create_generates_uuid_and_skips_reselect():
+    repository = DecksRepository()
+    repository.database = AsyncMock()
+    repository.database.url.dialect = "mysql"
+    user_id = uuid4()
+
+    deck = await repository.create(Deck(user_id=user_id, name="Mono Red"))
+
+    repository.database.execute.assert_called_once()
+    repository.database.fetch_one.assert_not_called()
+    values = repository.database.execute.call_args.kwargs["values"]
+    assert isinstance(deck.id, UUID) and values["id"] == deck.id
+    assert deck.user_id == user_id
+
+@pytest.mark.asyncio
+async def test_create_uses_returning_when_supported():
+    repository = DecksRepository()
+    repository.database = AsyncMock()
+    repository.database.url.dialect = "postgresql"
+    deck_id, user_id = uuid4(), uuid4()
+    repository.database.fetch_one.return_value = {"id": deck_id, "user_id": user_id, "name": "Mono Red"}
+
+    deck = await repository.create(Deck(id=deck_id, user_id=user_id, name="Mono Red"))
+
+    assert repository.database.fetch_one.call_args.kwargs["query"].endswith(" RETURNING *")
+    assert deck.id == deck_id
+
+@pytest.mark.asyncio
+async def test_update_of_a_missing_id_returns_none(cards_repository):
+    cards_repository.database.url.dialect = "mysql"
+    cards_repository.database.execute.return_value = 0
+    cards_repository.database.fetch_one.return_value = None
+    card_id = uuid4()
+
+    assert await cards_repository.update(card_id, Card(**card_row(card_id))) is None
+    assert await cards_repository.update(card_id, Card(**card_row(card_id)), return_representation=False) is False
+    assert cards_repository.database.fetch_one.call_args.kwargs["query"] == "SELECT 1 FROM Cards WHERE id = :id"
+
+@pytest.mark.asyncio
+async def test_update_of_an_unchanged_row_is_not_reported_missing(cards_repository):
+    # Sem CLIENT.FOUND_ROWS o MySQL devolve 0 linhas afetadas quando os valores já eram esses
+    cards_repository.database.url.dialect = "mysql"
+    cards_repository.database.execute.return_value = 0
+    cards_repository.database.fetch_one.return_value = {"1": 1}
+    card_id = uuid4()
+
+    updated = await cards_repository.update(card_id, Card(**card_row(card_id)))
+
+    assert updated.id == card_id
+
+@pytest.mark.asyncio
+async def test_delete_without_representation_is_a_single_statement(cards_repository):
+    cards_repository.database.url.dialect = "mysql"
+    cards_repository.database.execute.return_value = 1
+
+    assert await cards_repository.delete(uuid4(), return_representation=False) is True
+    cards_repository.database.fetch_one.assert_not_called()
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("name, operator, value", [
+    ("Sol Ring", "AGAINST", '"Sol Ring"'),
+    (" x ", "LIKE", "%x%"),
+    ("%", "LIKE", "%\\%%"),
+])
+async def test_names_shorter_than_an_ngram_are_searched_with_like(cards_repository, name, operator, value):
+    cards_repository.database.fetch_all.return_value = []
+
+    await cards_repository.get_cards_by_name(name)
+
+    call = cards_repository.database.fetch_all.call_args.kwargs
+    assert operator in call["query"]
+    assert list(call["values"].values()) == [value]
+
+@pytest.mark.asyncio
+async def test_empty_name_is_rejected(cards_repository):
+    with pytest.raises(ValueError):
+        await cards_repository.get_cards_by_name("  ")
+    cards_repository.database.fetch_all.assert_not_called()
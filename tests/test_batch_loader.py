@@ -0,0 +1,89 @@
+import asyncio
+import pytest
+from unittest.mock import AsyncMock
+from uuid import uuid4
+from app.data.BatchLoader import BatchLoader
+from app.data.CardsRepository import CardsRepository
+from app.data.Cache import LRUCache
+from app.services.CardService import CardsService
+
+def card_row(card_id):
+    return {"id": card_id, "name": "Card", "_type": "Creature", "mana_cost": 1}
+
+@pytest.fixture
+def cards_repository():
+    # Repositório com um banco de dados falso que devolve uma linha por ID pedido
+    repository = CardsRepository()
+    repository.database = AsyncMock()
+    repository.database.fetch_all.side_effect = lambda query, values: [card_row(card_id) for card_id in values.values() if card_id != "missing"]
+    return repository
+
+@pytest.mark.asyncio
+async def test_get_many_chunks_in_queries(cards_repository):
+    ids = [str(uuid4()) for _ in range(5)]
+
+    cards = await cards_repository.get_many(ids + [ids[0]], chunk_size=2)
+
+    assert [str(card.id) for card in cards] == ids
+    assert cards_repository.database.fetch_all.call_count == 3
+    assert "WHERE id IN (:id_0, :id_1)" in cards_repository.database.fetch_all.call_args_list[0].kwargs["query"]
+
+@pytest.mark.asyncio
+async def test_get_many_serves_cached_rows_first(cards_repository):
+    cards_repository.cache = LRUCache()
+    cached_id, other_id = str(uuid4()), str(uuid4())
+    await cards_repository.get_many([cached_id])
+
+    await cards_repository.get_many([cached_id, other_id])
+
+    assert cards_repository.database.fetch_all.call_args.kwargs["values"] == {"id_0": other_id}
+
+@pytest.mark.asyncio
+async def test_concurrent_gets_are_coalesced_into_one_query(cards_repository):
+    loader = BatchLoader(cards_repository.get_many)
+    service = CardsService(cards_repository, loader=loader)
+    ids = [str(uuid4()) for _ in range(3)]
+
+    cards = await asyncio.gather(*[service.get(card_id) for card_id in ids + [ids[1], "missing"]])
+
+    assert [str(card.id) for card in cards[:4]] == ids + [ids[1]]
+    assert cards[4] is None
+    assert loader.batches == 1
+    cards_repository.database.fetch_all.assert_called_once()
+
+@pytest.mark.asyncio
+async def test_loader_memoises_results_within_the_request(cards_repository):
+    loader = BatchLoader(cards_repository.get_many)
+    card_id = str(uuid4())
+
+    await loader.load(card_id)
+    await loader.load(card_id)
+    loader.clear(card_id)
+    await loader.load(card_id)
+
+    assert loader.batches == 2
+
+@pytest.mark.asyncio
+async def test_failed_batch_is_not_memoised(cards_repository):
+    card_id = str(uuid4())
+    load_many = AsyncMock(side_effect=[ConnectionError("lost connection"), [cards_repository.model(**card_row(card_id))]])
+    loader = BatchLoader(load_many)
+
+    with pytest.raises(ConnectionError):
+        await loader.load(card_id)
+    card = await loader.load(card_id)
+
+    assert str(card.id) == card_id
+    assert load_many.await_count == 2
+
+@pytest.mark.asyncio
+async def test_dispatch_task_is_referenced_until_it_finishes(cards_repository):
+    loader = BatchLoader(cards_repository.get_many)
+
+    future = loader.load(str(uuid4()))
+    await asyncio.sleep(0)  # O despacho é criado no tick seguinte
+
+    assert len(loader._dispatch_tasks) == 1
+    await future
+    await asyncio.sleep(0)
+    assert not loader._dispatch_tasks
@@ -0,0 +1,50 @@
+import json
+from benchmarks.report import compare, format_table, load_baseline, percentile, save_baseline, summarize
+
+def test_percentile_uses_nearest_rank():
+    samples = sorted(float(i) for i in range(1, 101))
+
+    assert percentile(samples, 50) == 50.0
+    assert percentile(samples, 95) == 95.0
+    assert percentile(samples, 100) == 100.0
+    assert percentile([], 95) == 0.0
+
+def test_summarize_reports_percentiles_throughput_and_errors():
+    summary = summarize({"card_search": [0.010, 0.020, 0.030, 0.040]}, {"card_search": 1, "deck_edit.add": 2}, elapsed=2.0)
+
+    assert summary["card_search"]["requests"] == 4
+    assert summary["card_search"]["throughput"] == 2.0
+    assert summary["card_search"]["p50_ms"] == 20.0
+    assert summary["card_search"]["max_ms"] == 40.0
+    assert summary["deck_edit.add"] == {"requests": 0, "errors": 2, "throughput": 0.0, "p50_ms": 0.0, "p90_ms": 0.0, "p95_ms": 0.0, "p99_ms": 0.0, "max_ms": 0.0}
+    assert "card_search" in format_table(summary)
+
+def row(p95_ms, throughput, errors=0):
+    return {"requests": 100, "errors": errors, "throughput": throughput, "p50_ms": p95_ms / 2, "p90_ms": p95_ms, "p95_ms": p95_ms, "p99_ms": p95_ms, "max_ms": p95_ms}
+
+def test_compare_flags_latency_throughput_and_error_regressions():
+    baseline = {"deck_render.cards": row(20.0, 100.0), "card_search": row(10.0, 200.0), "price_history.chart": row(0.5, 50.0)}
+    current = {
+        "deck_render.cards": row(30.0, 100.0),     # p95 +50%
+        "card_search": row(10.5, 150.0, errors=3),  # vazão -25% e novos erros
+        "price_history.chart": row(1.2, 50.0),     # +0.7 ms: abaixo do ruído mínimo
+        "new_operation": row(99.0, 1.0),           # sem baseline
+    }
+
+    regressions = compare(current, baseline, max_regression=0.15)
+
+    assert regressions == [
+        "deck_render.cards: p95 20.0 ms -> 30.0 ms",
+        "card_search: throughput 200.0 -> 150.0 req/s",
+        "card_search: errors 0 -> 3",
+    ]
+
+def test_baseline_round_trip(tmp_path):
+    path = str(tmp_path / "results" / "baseline.json")
+    summary = {"card_search": row(10.0, 200.0)}
+
+    assert load_baseline(path) is None
+    save_baseline(path, summary, {"concurrency": 8})
+
+    assert load_baseline(path) == summary
+    assert json.load(open(path))["settings"] == {"concurrency": 8}
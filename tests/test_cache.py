@@ -0,0 +1,128 @@
+import pytest
+from contextlib import asynccontextmanager
+from unittest.mock import AsyncMock, patch
+from uuid import uuid4
+from app.data.Cache import Cache, LRUCache, RedisCache
+from app.data.CardsRepository import CardsRepository, CardIntereactionRepository, PriceHistoryRepository
+
+@asynccontextmanager
+async def fake_transaction():
+    yield
+
+class FakeRedis:
+    """
+    Minimal stand-in for redis.asyncio.Redis, enough for RedisCache.
+    """
+    def __init__(self):
+        self.data = {}
+
+    async def get(self, key):
+        return self.data.get(key)
+
+    async def set(self, key, value, ex=None):
+        self.data[key] = value
+
+    async def delete(self, *keys):
+        return sum(self.data.pop(key, None) is not None for key in keys)
+
+    async def scan_iter(self, match):
+        for key in list(self.data):
+            if key.startswith(match.rstrip("*")):
+                yield key
+
+def test_cache_backends_must_implement_the_interface():
+    class NoDelete(Cache):
+        async def get(self, key): ...
+        async def set(self, key, value): ...
+        async def clear(self): ...
+
+    with pytest.raises(TypeError):
+        NoDelete(ttl=1)
+
+@pytest.mark.asyncio
+async def test_lru_cache_evicts_least_recently_used():
+    cache = LRUCache(max_entries=2)
+    await cache.set("a", 1)
+    await cache.set("b", 2)
+    await cache.get("a")
+    await cache.set("c", 3)
+
+    assert await cache.get("b") is None
+    assert await cache.get("a") == 1
+    assert cache.stats()["evictions"] == 1
+    assert cache.stats()["hits"] == 2 and cache.stats()["misses"] == 1
+
+@pytest.mark.asyncio
+async def test_lru_cache_expires_entries():
+    cache = LRUCache(ttl=10)
+    with patch("app.data.Cache.time.monotonic", return_value=100):
+        await cache.set("a", 1)
+    with patch("app.data.Cache.time.monotonic", return_value=111):
+        assert await cache.get("a") is None
+    assert cache.stats()["expirations"] == 1
+
+@pytest.mark.asyncio
+async def test_redis_cache_round_trips_values():
+    cache = RedisCache(FakeRedis())
+    await cache.set("a", {"price": 1})
+
+    assert await cache.get("a") == {"price": 1}
+    await cache.delete("a")
+    assert await cache.get("a") is None
+    assert cache.stats()["invalidations"] == 1
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("cache", [LRUCache(), RedisCache(FakeRedis())])
+async def test_card_get_reads_through_and_update_invalidates(cache):
+    card_id = uuid4()
+    repository = CardsRepository()
+    repository.cache = cache
+    repository.database = AsyncMock()
+    repository.database.fetch_one.return_value = {"id": card_id, "name": "Card", "_type": "Creature", "mana_cost": 1}
+
+    await repository.get(card_id)
+    await repository.get(card_id)
+    assert repository.database.fetch_one.call_count == 1
+
+    # O update invalida a entrada, então a releitura feita por ele vai ao banco
+    await repository.update(card_id, await repository.get(card_id))
+    await repository.get(card_id)
+    assert repository.database.fetch_one.call_count == 2
+
+@pytest.mark.asyncio
+async def test_new_interaction_invalidates_both_cards():
+    card_a, card_b = uuid4(), uuid4()
+    repository = CardIntereactionRepository()
+    repository.cache = LRUCache()
+    repository.database = AsyncMock()
+    repository.database.fetch_all.return_value = []
+
+    await repository.get_interactions_for_card(card_a)
+    await repository.get_interactions_for_card(card_b)
+    await repository.create_interaction(card_a, card_b, "combo")
+    await repository.get_interactions_for_card(card_a)
+    await repository.get_interactions_for_card(card_b)
+
+    assert repository.database.fetch_all.call_count == 4
+
+@pytest.mark.asyncio
+async def test_card_delete_invalidates_partner_interactions_and_latest_price():
+    card_id, partner_id = uuid4(), uuid4()
+    cache, database = LRUCache(), AsyncMock()
+    database.transaction = fake_transaction
+    cards, interactions, prices = CardsRepository(), CardIntereactionRepository(), PriceHistoryRepository()
+    for repository in (cards, interactions, prices):
+        repository.cache, repository.database = cache, database
+    database.fetch_all.return_value = [{"card_id_1": partner_id, "card_id_2": card_id, "interaction_type": "combo"}]
+    database.fetch_one.return_value = {"card_id": card_id, "price": 1, "date": "2024-03-01"}
+
+    await interactions.get_interactions_for_card(partner_id)
+    await prices.get_latest_price(card_id)
+    database.fetch_all.return_value = [{"partner": partner_id}]
+    database.execute.return_value = 1
+    assert await cards.delete(card_id, return_representation=False)
+
+    # A cascata da FK levou as linhas: as duas leituras voltam ao banco
+    database.fetch_all.return_value, database.fetch_one.return_value = [], None
+    assert await interactions.get_interactions_for_card(partner_id) == []
+    assert await prices.get_latest_price(card_id) is None
@@ -0,0 +1,137 @@
+import pytest
+from contextlib import asynccontextmanager
+from decimal import Decimal
+from unittest.mock import AsyncMock
+from uuid import uuid4
+from app.data.CardCatalogue import CardCatalogue
+from app.data.CardsRepository import CardsRepository
+from app.domain.CardModel import Card
+from app.services.CardService import CardsService
+
+def card_row(_type="Creature", mana_cost=1, color=None, power=None, _set="SET01", price=None):
+    return {"id": uuid4(), "_type": _type, "mana_cost": mana_cost, "color": color, "power": power, "toughness": None, "_set": _set, "price": price}
+
+@asynccontextmanager
+async def fake_transaction():
+    yield
+
+@pytest.fixture
+def catalogue():
+    catalogue = CardCatalogue()
+    catalogue.build([
+        card_row(color="Red", mana_cost=1, power=2, price=Decimal("1.50")),
+        card_row(color="Red", mana_cost=3, power=4, price=Decimal("0.50")),
+        card_row(color="Blue", mana_cost=2, _type="Instant", price=None),
+        card_row(color=None, mana_cost=0, _type="Artifact", _set="SET02", price=Decimal("10.00")),
+    ])
+    return catalogue
+
+def test_aggregates_per_group_skip_null_values(catalogue):
+    stats = {group["group"]: group for group in catalogue.aggregate("color", "price")}
+
+    assert list(stats) == ["Blue", "Red", None]
+    assert stats["Red"] == {"group": "Red", "cards": 2, "count": 2, "mean": 1.0, "min": 0.5, "max": 1.5, "total": 2.0}
+    assert stats["Blue"]["cards"] == 1 and stats["Blue"]["count"] == 0 and stats["Blue"]["mean"] is None
+    assert stats[None]["total"] == 10.0
+
+def test_distribution_counts_values_per_group(catalogue):
+    distribution = catalogue.distribution("set", "mana_cost")
+
+    assert distribution == [{"group": "SET01", "counts": {1: 1, 2: 1, 3: 1}}, {"group": "SET02", "counts": {0: 1}}]
+
+def test_unknown_group_or_metric_is_rejected(catalogue):
+    with pytest.raises(ValueError):
+        catalogue.aggregate("rarity", "price")
+    with pytest.raises(ValueError):
+        catalogue.distribution("set", "price")
+
+def test_upsert_keeps_columns_not_given_and_grows_past_capacity():
+    catalogue = CardCatalogue(capacity=2)
+    card_id = uuid4()
+    catalogue.upsert(card_id, {"_type": "Creature", "mana_cost": 2, "color": "Green", "price": Decimal("3.00")})
+    catalogue.upsert(card_id, {"mana_cost": 5})
+    for _ in range(5):
+        catalogue.upsert(uuid4(), {"_type": "Land", "mana_cost": 0})
+
+    assert len(catalogue) == 6
+    creature = next(group for group in catalogue.aggregate("type", "mana_cost") if group["group"] == "Creature")
+    assert creature["total"] == 5.0
+    assert catalogue.aggregate("color", "price")[0] == {"group": "Green", "cards": 1, "count": 1, "mean": 3.0, "min": 3.0, "max": 3.0, "total": 3.0}
+
+def test_removed_cards_leave_the_aggregates_and_are_compacted(monkeypatch):
+    monkeypatch.setattr("app.data.CardCatalogue.COMPACT_MIN_DEAD", 2)
+    rows = [card_row(mana_cost=i) for i in range(4)]
+    catalogue = CardCatalogue()
+    catalogue.build(rows)
+
+    for row in rows[:3]:
+        catalogue.remove(row["id"])
+
+    assert len(catalogue) == 1 and catalogue._size == 2  # Compactado ao chegar a 2 removidas de 4
+    assert catalogue.aggregate("type", "mana_cost")[0]["total"] == 3.0
+    catalogue.upsert(rows[3]["id"], {"mana_cost": 7})
+    assert catalogue.aggregate("type", "mana_cost")[0]["total"] == 7.0
+
+@pytest.mark.asyncio
+async def test_card_writes_refresh_the_catalogue():
+    repository = CardsRepository()
+    repository.database = AsyncMock()
+    repository.database.transaction = fake_transaction
+    catalogue = CardCatalogue()
+    catalogue.build([])
+    service = CardsService(repository, catalogue=catalogue)
+    card = Card(id=uuid4(), name="Shock", _type="Instant", mana_cost=1, color="Red", price=Decimal("0.25"))
+
+    await service.create(card, return_representation=False)
+    await service.bulk_upsert([{"id": str(uuid4()), "name": "Bolt", "_type": "Instant", "mana_cost": 1, "color": "Red", "price": "0.75"}])
+
+    stats = await service.get_card_stats("color", "price")
+    assert [(group.group, group.cards, group.total) for group in stats] == [("Red", 2, 1.0)]
+
+    repository.database.execute.return_value = 1
+    await service.delete(card.id, return_representation=False)
+    assert len(catalogue) == 1
+
+@pytest.mark.asyncio
+async def test_updating_a_missing_card_adds_no_phantom_row():
+    repository = AsyncMock()
+    repository.database.transaction = fake_transaction
+    repository.update.return_value = False
+    catalogue = CardCatalogue()
+    catalogue.build([])
+    service = CardsService(repository, catalogue=catalogue)
+    card_id = uuid4()
+
+    await service.update(card_id, Card(id=card_id, name="Shock", _type="Instant", mana_cost=1), return_representation=False)
+
+    assert len(catalogue) == 0
+
+@pytest.mark.asyncio
+async def test_catalogue_is_built_on_first_use():
+    repository = AsyncMock()
+
+    async def iterate_catalogue():
+        yield card_row(mana_cost=2)
+    repository.iterate_catalogue = iterate_catalogue
+    service = CardsService(repository, catalogue=CardCatalogue())
+
+    distribution = await service.get_card_distribution("type", "mana_cost")
+
+    assert distribution[0].counts == {2: 1}
+
+@pytest.mark.asyncio
+async def test_catalogue_columns_are_read_in_keyset_chunks():
+    repository = CardsRepository()
+    queries = []
+
+    async def fake_iterate(query, values):
+        queries.append(query)
+        yield card_row()
+
+    repository.database = AsyncMock()
+    repository.database.iterate = fake_iterate
+
+    rows = [row async for row in repository.iterate_catalogue()]
+
+    assert len(rows) == 1
+    assert queries[0].startswith("SELECT id, ") and queries[0].endswith("FROM Cards ORDER BY id LIMIT :limit")
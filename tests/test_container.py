@@ -0,0 +1,34 @@
+import pytest
+from app.core import config
+from app.core.container import Container
+from app.data.BatchLoader import BatchLoader
+
+@pytest.fixture
+def container(monkeypatch):
+    container = Container()
+    monkeypatch.setattr(config, "container", container)
+    return container
+
+@pytest.mark.asyncio
+async def test_dependencies_return_the_application_scoped_services(container):
+    assert await config.get_cards_service() is container.cards_service
+    assert await config.get_cards_service() is await config.get_cards_service()
+    assert await config.get_deck_cards_service() is container.deck_cards_service
+    # Repositórios compartilhados entre serviços em vez de um por serviço
+    assert container.deck_cards_service.summary_repository is container.price_service.summary_repository
+
+@pytest.mark.asyncio
+async def test_request_scoped_cards_service_gets_its_own_loader(container):
+    first = await config.get_request_cards_service()
+    second = await config.get_request_cards_service()
+
+    assert isinstance(first.loader, BatchLoader)
+    assert first.loader is not second.loader
+    assert first.repository is container.cards_repository
+    assert first.search_index is container.cards_service.search_index
+    assert container.cards_service.loader is None
+
+def test_container_is_built_lazily_once(monkeypatch):
+    monkeypatch.setattr(config, "container", None)
+
+    assert config.get_container() is config.get_container()
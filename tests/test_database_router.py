@@ -0,0 +1,141 @@
+import asyncio
+import os
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+from pymysql.err import OperationalError
+from app.data.DatabaseRouter import DatabaseRouter
+
+def fake_database(name):
+    database = MagicMock(name=name)
+    database.fetch_one = AsyncMock(return_value={"source": name})
+    database.fetch_all = AsyncMock(return_value=[{"source": name}])
+    database.execute = AsyncMock(return_value=1)
+    database.execute_many = AsyncMock()
+    return database
+
+def run_in_request(coroutine):
+    # Cada requisição roda numa task própria, com a sua cópia do contexto
+    return asyncio.get_running_loop().create_task(coroutine)
+
+@pytest.fixture
+def primary():
+    return fake_database("primary")
+
+@pytest.fixture
+def replicas():
+    return [fake_database("replica-0"), fake_database("replica-1")]
+
+@pytest.mark.asyncio
+async def test_reads_round_robin_over_replicas_and_writes_go_to_primary(primary, replicas):
+    router = DatabaseRouter(primary, replicas)
+
+    sources = [(await router.fetch_one("SELECT 1"))["source"] for _ in range(4)]
+    await router.execute("UPDATE Cards SET price = 1")
+
+    assert sources == ["replica-0", "replica-1", "replica-0", "replica-1"]
+    primary.execute.assert_awaited_once()
+    primary.fetch_one.assert_not_awaited()
+
+@pytest.mark.asyncio
+async def test_statements_sent_through_fetch_go_to_primary(primary, replicas):
+    router = DatabaseRouter(primary, replicas)
+
+    await router.fetch_one("INSERT INTO Cards (id) VALUES (:id) RETURNING *", {"id": 1})
+
+    primary.fetch_one.assert_awaited_once()
+    replicas[0].fetch_one.assert_not_awaited()
+
+@pytest.mark.asyncio
+async def test_reads_inside_a_transaction_use_the_primary(primary, replicas):
+    primary.transaction = MagicMock(return_value=AsyncMock())
+    router = DatabaseRouter(primary, replicas)
+
+    async with router.transaction():
+        inside = await router.fetch_one("SELECT * FROM Decks FOR UPDATE")
+    outside = await router.fetch_one("SELECT 1")
+
+    assert inside["source"] == "primary"
+    assert outside["source"] == "replica-0"
+
+@pytest.mark.asyncio
+async def test_sticky_primary_window_is_per_request(primary, replicas):
+    router = DatabaseRouter(primary, replicas)
+
+    async def writer():
+        router.stick_to_primary(30)
+        before = await router.fetch_one("SELECT 1")
+        await router.execute("INSERT INTO Decks (id) VALUES (1)")
+        return before["source"], (await router.fetch_one("SELECT 1"))["source"]
+
+    async def reader():
+        return (await router.fetch_one("SELECT 1"))["source"]
+
+    before_write, after_write = await run_in_request(writer())
+    other_request = await run_in_request(reader())
+
+    assert before_write.startswith("replica")
+    assert after_write == "primary"
+    assert other_request.startswith("replica")
+
+@pytest.mark.asyncio
+async def test_without_opt_in_reads_after_writes_use_replicas(primary, replicas):
+    router = DatabaseRouter(primary, replicas)
+
+    async def request():
+        await router.execute("INSERT INTO Decks (id) VALUES (1)")
+        return (await router.fetch_one("SELECT 1"))["source"]
+
+    assert (await run_in_request(request())).startswith("replica")
+
+@pytest.mark.asyncio
+async def test_failed_replica_falls_back_to_primary_and_leaves_rotation(primary, replicas):
+    replicas[0].fetch_all.side_effect = OperationalError(2013, "Lost connection to MySQL server")
+    router = DatabaseRouter(primary, replicas)
+
+    first = await router.fetch_all("SELECT * FROM Cards")
+    following = [(await router.fetch_all("SELECT * FROM Cards"))[0]["source"] for _ in range(2)]
+
+    assert first[0]["source"] == "primary"
+    assert following == ["replica-1", "replica-1"]
+    assert router.healthy == [False, True]
+    assert router.stats()["routed"]["fallback"] == 1
+
+@pytest.mark.asyncio
+async def test_health_check_removes_and_restores_replicas(primary, replicas):
+    router = DatabaseRouter(primary, replicas)
+    replicas[1].fetch_one.side_effect = ConnectionRefusedError()
+
+    await router.check_health()
+    assert router.healthy == [True, False]
+
+    replicas[1].fetch_one.side_effect = None
+    await router.check_health()
+    assert router.healthy == [True, True]
+
+@pytest.mark.asyncio
+async def test_no_healthy_replica_reads_from_primary(primary, replicas):
+    router = DatabaseRouter(primary, replicas)
+    router.healthy = [False, False]
+
+    assert (await router.fetch_one("SELECT 1"))["source"] == "primary"
+
+# Integração com o docker-compose (primário na 3305, réplica na 3307)
+PRIMARY_URL = os.getenv("TEST_DATABASE_URL")
+REPLICA_URL = os.getenv("TEST_REPLICA_DATABASE_URL")
+
+@pytest.mark.asyncio
+@pytest.mark.skipif(not (PRIMARY_URL and REPLICA_URL), reason="TEST_DATABASE_URL and TEST_REPLICA_DATABASE_URL not set")
+async def test_routes_between_two_mysql_instances():
+    from databases import Database
+    router = DatabaseRouter(Database(PRIMARY_URL), [Database(REPLICA_URL)])
+    await router.connect()
+    try:
+        primary_id = await router.primary.fetch_val("SELECT @@server_id")
+        replica_id = await router.fetch_val("SELECT @@server_id")
+        assert primary_id != replica_id
+
+        router.stick_to_primary(5)
+        await router.execute("DO 0")
+        assert await router.fetch_val("SELECT @@server_id") == primary_id
+    finally:
+        await router.disconnect()
@@ -0,0 +1,51 @@
+import pytest
+from contextlib import asynccontextmanager
+from unittest.mock import AsyncMock
+from uuid import uuid4
+from app.data.DeckRepository import DeckCardsRepository
+from app.services.DeckService import DeckCardsService
+
+@asynccontextmanager
+async def fake_transaction():
+    yield
+
+@pytest.fixture
+def deck_cards_repository():
+    # Repositório com um banco de dados falso
+    repository = DeckCardsRepository()
+    repository.database = AsyncMock()
+    repository.database.transaction = fake_transaction
+    return repository
+
+@pytest.mark.asyncio
+async def test_add_card_to_deck_is_a_single_upsert(deck_cards_repository):
+    deck_id, card_id = uuid4(), uuid4()
+
+    await deck_cards_repository.add_card_to_deck(deck_id, card_id, 2)
+
+    deck_cards_repository.database.fetch_one.assert_not_called()
+    deck_cards_repository.database.execute.assert_called_once()
+    query = deck_cards_repository.database.execute.call_args.kwargs["query"]
+    assert "ON DUPLICATE KEY UPDATE quantity = quantity + VALUES(quantity)" in query
+
+@pytest.mark.asyncio
+async def test_apply_deck_diff_merges_changes_into_two_statements_and_touches_the_deck(deck_cards_repository):
+    deck_id, card_a, card_b, card_c = uuid4(), uuid4(), uuid4(), uuid4()
+    service = DeckCardsService(deck_cards_repository)
+
+    await service.apply_deck_diff(deck_id, [(card_a, 2), (card_b, -1), (card_a, 1), (card_c, 1), (card_c, -1)])
+
+    calls = deck_cards_repository.database.execute.call_args_list
+    assert len(calls) == 3
+    values = calls[0].kwargs["values"]
+    assert values == {"deck_id": deck_id, "card_id_0": card_a, "quantity_0": 3, "card_id_1": card_b, "quantity_1": -1}
+    assert calls[1].kwargs["query"].startswith("DELETE FROM Deck_Cards WHERE deck_id = :deck_id AND quantity <= 0")
+    assert calls[2].kwargs["query"].startswith("UPDATE Decks SET updated_at")
+
+@pytest.mark.asyncio
+async def test_apply_deck_diff_skips_empty_diff(deck_cards_repository):
+    service = DeckCardsService(deck_cards_repository)
+
+    await service.apply_deck_diff(uuid4(), [(uuid4(), 0)])
+
+    deck_cards_repository.database.execute.assert_not_called()
@@ -0,0 +1,124 @@
+import json
+import pytest
+from contextlib import asynccontextmanager
+from datetime import date
+from decimal import Decimal
+from unittest.mock import AsyncMock
+from uuid import uuid4
+from app.data.DeckRepository import DeckCardsRepository, DeckSummaryRepository
+from app.domain.CardModel import PriceHistory
+from app.services.CardService import PriceService
+from app.services.DeckService import DeckCardsService, DeckSummaryService
+
+@asynccontextmanager
+async def fake_transaction():
+    yield
+
+@pytest.fixture
+def summary_repository():
+    # Repositório com um banco de dados falso
+    repository = DeckSummaryRepository()
+    repository.database = AsyncMock()
+    return repository
+
+@pytest.mark.asyncio
+async def test_adding_a_card_moves_every_summary_bucket_in_one_upsert(summary_repository):
+    deck_cards_repository = DeckCardsRepository()
+    deck_cards_repository.database = AsyncMock()
+    deck_cards_repository.database.transaction = fake_transaction
+    summary_repository.database.fetch_one.return_value = {"mana_cost": 3, "color": None, "price": Decimal("2.50")}
+    service = DeckCardsService(deck_cards_repository, summary_repository)
+    deck_id, card_id = uuid4(), uuid4()
+
+    await service.add_card_to_deck(deck_id, card_id, 2)
+
+    summary_repository.database.execute.assert_called_once()
+    values = summary_repository.database.execute.call_args.kwargs["values"]
+    assert values["cost_path"] == '$."3"' and values["color_path"] == '$."Colorless"'
+    assert values["delta"] == 2 and values["value_delta"] == Decimal("5.00")
+
+@pytest.mark.asyncio
+async def test_removing_a_card_subtracts_the_removed_copies(summary_repository):
+    deck_cards_repository = DeckCardsRepository()
+    deck_cards_repository.database = AsyncMock()
+    deck_cards_repository.database.transaction = fake_transaction
+    deck_cards_repository.database.fetch_one.return_value = {"quantity": 4}
+    summary_repository.database.fetch_one.return_value = {"mana_cost": 1, "color": "Red", "price": Decimal("1")}
+    service = DeckCardsService(deck_cards_repository, summary_repository)
+
+    await service.remove_card_from_deck(uuid4(), uuid4())
+
+    values = summary_repository.database.execute.call_args.kwargs["values"]
+    assert values["delta"] == -4 and values["value_delta"] == Decimal("-4")
+
+@pytest.mark.asyncio
+async def test_adding_a_card_to_a_deck_without_a_summary_row_rebuilds_it(summary_repository):
+    deck_cards_repository = DeckCardsRepository()
+    deck_cards_repository.database = AsyncMock()
+    deck_cards_repository.database.transaction = fake_transaction
+    deck_id, card_id = uuid4(), uuid4()
+    summary_repository.database.fetch_one.return_value = {"mana_cost": 2, "color": "Green", "price": Decimal("1.00")}
+    summary_repository.database.execute.side_effect = [0, None]  # UPDATE sem linha de resumo, depois a escrita do rebuild
+    # O deck já tinha 3 cópias de outra carta antes desta mudança
+    summary_repository.database.fetch_all.side_effect = [
+        [{"id": deck_id}],
+        [{"deck_id": deck_id, "quantity": 3, "mana_cost": 1, "color": "Red", "price": Decimal("2.00")},
+         {"deck_id": deck_id, "quantity": 2, "mana_cost": 2, "color": "Green", "price": Decimal("1.00")}],
+    ]
+    service = DeckCardsService(deck_cards_repository, summary_repository)
+
+    await service.add_card_to_deck(deck_id, card_id, 2)
+
+    update, write = summary_repository.database.execute.call_args_list
+    assert update.kwargs["query"].startswith("UPDATE Deck_Summary SET") and "INSERT" not in update.kwargs["query"]
+    values = write.kwargs["values"]
+    assert values["total_cards_0"] == 5 and values["deck_value_0"] == Decimal("8.00")
+    assert json.loads(values["mana_curve_0"]) == {"1": 3, "2": 2}
+
+@pytest.mark.asyncio
+async def test_new_latest_price_moves_deck_values_by_the_difference(summary_repository):
+    price_repository = AsyncMock()
+    price_repository.database.transaction = fake_transaction
+    card_id = uuid4()
+    price_repository.lock_latest_price.return_value = PriceHistory(card_id=card_id, price=Decimal("3.00"), date=date(2024, 1, 1))
+    service = PriceService(price_repository, summary_repository)
+
+    await service.record_price(card_id, Decimal("4.25"), date(2024, 2, 1))
+
+    price_repository.lock_latest_price.assert_awaited_once_with(card_id)
+    price_repository.get_latest_price.assert_not_called()
+
+    query = summary_repository.database.execute.call_args.kwargs["query"]
+    assert query.startswith("UPDATE Deck_Summary ds JOIN Deck_Cards dc")
+    assert summary_repository.database.execute.call_args.kwargs["values"]["price_delta"] == Decimal("1.25")
+
+@pytest.mark.asyncio
+async def test_summary_is_read_from_one_row_and_drops_empty_buckets(summary_repository):
+    deck_id = uuid4()
+    summary_repository.database.fetch_one.return_value = {
+        "deck_id": deck_id, "total_cards": 3, "mana_curve": json.dumps({"1": 3, "2": 0}),
+        "color_distribution": json.dumps({"Red": 3}), "deck_value": Decimal("7.50"), "updated_at": None,
+    }
+
+    summary = await DeckSummaryService(summary_repository).get_summary(deck_id)
+
+    assert summary.mana_curve == {1: 3} and summary.color_distribution == {"Red": 3}
+    assert "id" not in summary.model_dump()
+    summary_repository.database.fetch_all.assert_not_called()
+
+@pytest.mark.asyncio
+async def test_rebuild_recomputes_from_deck_cards(summary_repository):
+    deck_id = uuid4()
+    summary_repository.database.fetch_all.side_effect = [
+        [{"id": deck_id}],
+        [
+            {"deck_id": deck_id, "quantity": 2, "mana_cost": 1, "color": "Red", "price": Decimal("1.00")},
+            {"deck_id": deck_id, "quantity": 1, "mana_cost": 4, "color": "Red", "price": Decimal("3.00")},
+        ],
+    ]
+
+    [summary] = await summary_repository.rebuild([deck_id])
+
+    assert (summary.total_cards, summary.mana_curve, summary.deck_value) == (3, {1: 2, 4: 1}, Decimal("5.00"))
+    values = summary_repository.database.execute.call_args.kwargs["values"]
+    assert json.loads(values["color_distribution_0"]) == {"Red": 3}
@@ -0,0 +1,109 @@
+import pytest
+from datetime import datetime
+from email.utils import format_datetime
+from unittest.mock import AsyncMock, MagicMock
+from uuid import uuid4
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from starlette.requests import Request
+from app.api.v1 import CardController, DeckController
+from app.core.config import get_request_cards_service, get_deck_cards_service
+from app.core.http_cache import version_of, not_modified, _utc
+from app.data.DatabaseRouter import DatabaseRouter
+from app.domain.CardModel import Card
+from app.domain.DeckModel import DeckCard
+
+UPDATED_AT = datetime(2024, 3, 2, 8, 15, 0, 125000)
+
+def sol_ring(card_id, updated_at):
+    return Card(id=card_id, name="Sol Ring", _type="Artifact", mana_cost=1, updated_at=updated_at)
+
+def request_with(**headers):
+    return Request({"type": "http", "method": "GET", "headers": [(k.replace("_", "-").encode(), v.encode()) for k, v in headers.items()]})
+
+def client(router, dependency, service):
+    app = FastAPI()
+    app.include_router(router, prefix="/api/v1")
+    app.dependency_overrides[dependency] = lambda: service
+    return TestClient(app)
+
+def test_if_none_match_uses_weak_comparison():
+    version = version_of(UPDATED_AT, "card-1")
+
+    assert not_modified(request_with(if_none_match=version.etag), version)
+    assert not_modified(request_with(if_none_match=f'"other", {version.etag.removeprefix("W/")}'), version)
+    assert not not_modified(request_with(if_none_match=version_of(UPDATED_AT, "card-2").etag), version)
+
+def test_if_modified_since_is_ignored_when_if_none_match_is_sent():
+    version = version_of(UPDATED_AT, "card-1")
+    later = format_datetime(_utc(datetime(2025, 1, 1)), usegmt=True)
+
+    assert not_modified(request_with(if_modified_since=later), version)
+    assert not not_modified(request_with(if_modified_since=later, if_none_match='W/"stale"'), version)
+    # Last-Modified tem precisão de segundos: o próprio valor enviado ainda vale como não modificado
+    assert not_modified(request_with(if_modified_since=format_datetime(_utc(UPDATED_AT), usegmt=True)), version)
+    assert not not_modified(request_with(if_modified_since="not a date"), version)
+
+def test_card_is_served_with_validators_and_revalidated_with_a_version_lookup():
+    card_id = uuid4()
+    service = MagicMock()
+    service.get = AsyncMock(return_value=sol_ring(card_id, UPDATED_AT))
+    service.get_version = AsyncMock(return_value=UPDATED_AT)
+    api = client(CardController.router, get_request_cards_service, service)
+
+    first = api.get(f"/api/v1/cards/{card_id}")
+    second = api.get(f"/api/v1/cards/{card_id}", headers={"If-None-Match": first.headers["ETag"]})
+
+    assert first.status_code == 200
+    assert first.headers["Cache-Control"] == "public, max-age=60"
+    assert first.headers["Last-Modified"] == "Sat, 02 Mar 2024 08:15:00 GMT"
+    assert second.status_code == 304 and second.content == b""
+    assert second.headers["ETag"] == first.headers["ETag"]
+    service.get.assert_awaited_once()  # O 304 não carregou a carta
+
+def test_changed_card_is_sent_again():
+    card_id = uuid4()
+    service = MagicMock()
+    service.get = AsyncMock(return_value=sol_ring(card_id, datetime(2024, 4, 1)))
+    service.get_version = AsyncMock(return_value=datetime(2024, 4, 1))
+    stale = version_of(UPDATED_AT, card_id).etag
+
+    response = client(CardController.router, get_request_cards_service, service).get(f"/api/v1/cards/{card_id}", headers={"If-None-Match": stale})
+
+    assert response.status_code == 200
+    assert response.json()["name"] == "Sol Ring"
+    assert response.headers["ETag"] != stale
+
+def test_deck_cards_are_revalidated_without_reading_the_rows():
+    deck_id = uuid4()
+    service = MagicMock()
+    service.pinned_reads = MagicMock(return_value=AsyncMock())
+    service.get_cards_version = AsyncMock(return_value=(UPDATED_AT, 1))
+    service.get_cards_in_deck = AsyncMock(return_value=[DeckCard(deck_id=deck_id, card_id=uuid4(), quantity=4)])
+    api = client(DeckController.router, get_deck_cards_service, service)
+
+    first = api.get(f"/api/v1/decks/{deck_id}/cards")
+    second = api.get(f"/api/v1/decks/{deck_id}/cards", headers={"If-None-Match": first.headers["ETag"]})
+    expanded = api.get(f"/api/v1/decks/{deck_id}/cards?expand=card", headers={"If-None-Match": first.headers["ETag"]})
+
+    assert first.status_code == 200 and first.json()[0]["quantity"] == 4
+    assert first.headers["Cache-Control"] == "private, no-cache"
+    assert second.status_code == 304
+    assert expanded.status_code == 200  # Outra representação, outro ETag
+    assert service.get_cards_in_deck.await_count == 2
+
+@pytest.mark.asyncio
+async def test_pinned_reads_send_every_read_to_one_replica():
+    databases = []
+    for name in ("primary", "replica-0", "replica-1"):
+        database = MagicMock(name=name)
+        database.fetch_one = AsyncMock(return_value={"source": name})
+        databases.append(database)
+    router = DatabaseRouter(databases[0], databases[1:])
+
+    async with router.pinned_reads():
+        pinned = [(await router.fetch_one("SELECT 1"))["source"] for _ in range(3)]
+    unpinned = [(await router.fetch_one("SELECT 1"))["source"] for _ in range(2)]
+
+    assert pinned == ["replica-0"] * 3
+    assert unpinned == ["replica-1", "replica-0"]
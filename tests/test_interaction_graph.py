@@ -0,0 +1,109 @@
+import pytest
+from contextlib import asynccontextmanager
+from unittest.mock import AsyncMock
+from uuid import uuid4
+from app.data.CardsRepository import CardIntereactionRepository
+from app.data.InteractionGraph import InteractionGraph
+from app.domain.CardModel import CardInteraction
+from app.domain.DeckModel import DeckCard
+from app.services.CardService import CardIntereactionService, CardsService
+
+@asynccontextmanager
+async def fake_transaction():
+    yield
+
+@pytest.fixture
+def graph():
+    # a - b - c - d, com um atalho a - c
+    graph = InteractionGraph()
+    graph.build([("a", "b"), ("b", "c"), ("c", "d"), ("a", "c"), ("b", "a")])
+    return graph
+
+def test_neighbourhood_is_reported_by_hop(graph):
+    assert graph.neighbourhood("a", depth=1) == [("b", 1), ("c", 1)]
+    assert graph.neighbourhood("a", depth=2) == [("b", 1), ("c", 1), ("d", 2)]
+    assert graph.neighbourhood("unknown") == []
+    assert graph.edge_count == 4
+
+def test_common_neighbours(graph):
+    assert graph.common_neighbours(["a", "b"]) == ["c"]
+    assert graph.common_neighbours(["a", "d"]) == ["c"]
+
+def test_suggestions_weight_by_quantity_and_skip_deck_cards(graph):
+    assert graph.suggest([("a", 3), ("d", 1)]) == [("c", 4.0), ("b", 3.0)]
+
+def test_added_edges_are_visible_before_and_after_compaction():
+    graph = InteractionGraph(compact_threshold=2)
+    graph.build([("a", "b")])
+
+    graph.add_edge("b", "c")
+    assert graph.neighbourhood("c") == [("b", 1)]
+    graph.add_edge("c", "a")
+    graph.add_edge("a", "c")
+
+    assert graph.neighbourhood("a") == [("b", 1), ("c", 1)]
+    assert graph.edge_count == 3
+
+@pytest.mark.asyncio
+async def test_service_builds_lazily_and_updates_on_write():
+    repository = CardIntereactionRepository()
+    repository.database = AsyncMock()
+    card_a, card_b, card_c = uuid4(), uuid4(), uuid4()
+    async def edges():
+        yield {"card_id_1": card_a, "card_id_2": card_b}
+    repository.iterate_edges = edges
+    service = CardIntereactionService(repository, InteractionGraph())
+
+    await service.create(CardInteraction(card_id_1=card_b, card_id_2=card_c, interaction_type="combo"))
+    suggestions = await service.suggest_cards([DeckCard(deck_id=uuid4(), card_id=card_b, quantity=2)])
+
+    assert {suggestion.card_id for suggestion in suggestions} == {card_a, card_c}
+    assert [neighbour.distance for neighbour in await service.get_interaction_graph(card_a, depth=2)] == [1, 2]
+    assert "id" not in suggestions[0].model_dump()
+
+def test_removed_card_leaves_every_result(graph):
+    graph.add_edge("d", "e")  # Aresta ainda pendente
+
+    graph.remove_node("c")
+    graph.remove_node("e")
+
+    assert graph.neighbourhood("a", depth=3) == [("b", 1)]
+    assert graph.neighbourhood("c") == [] and graph.neighbourhood("d") == []
+    assert graph.common_neighbours(["a", "b"]) == []
+    assert graph.suggest([("a", 1), ("d", 1)]) == [("b", 1.0)]
+    assert graph.edge_count == 1 and len(graph) == 3
+
+@pytest.mark.asyncio
+async def test_deleted_card_is_no_longer_suggested():
+    repository = AsyncMock()
+    repository.database.transaction = fake_transaction
+    graph = InteractionGraph()
+    card_a, card_b, card_c = uuid4(), uuid4(), uuid4()
+    graph.build([(card_a, card_b), (card_a, card_c)])
+    cards_service = CardsService(repository, interaction_graph=graph)
+    repository.delete.return_value = True
+
+    await cards_service.delete(card_c, return_representation=False)
+    suggestions = await CardIntereactionService(AsyncMock(), graph).suggest_cards([DeckCard(deck_id=uuid4(), card_id=card_a, quantity=2)])
+
+    assert [suggestion.card_id for suggestion in suggestions] == [card_b]
+
+@pytest.mark.asyncio
+async def test_edges_are_read_in_keyset_chunks():
+    repository = CardIntereactionRepository()
+    edges = sorted((str(uuid4()), str(uuid4())) for _ in range(3))
+    queries = []
+
+    async def fake_iterate(query, values):
+        queries.append(query)
+        start = edges.index((values["after_0"], values["after_1"])) + 1 if "after_0" in values else 0
+        for card_id_1, card_id_2 in edges[start:start + values["limit"]]:
+            yield {"card_id_1": card_id_1, "card_id_2": card_id_2}
+
+    repository.database = AsyncMock()
+    repository.database.iterate = fake_iterate
+
+    rows = [row async for row in repository.iterate_edges()]
+
+    assert [(row["card_id_1"], row["card_id_2"]) for row in rows] == edges
+    assert queries[0].startswith("SELECT card_id_1, card_id_2 FROM Card_Interactions ORDER BY card_id_1, card_id_2 LIMIT")
@@ -0,0 +1,62 @@
+import asyncio
+import pytest
+from types import SimpleNamespace
+from app.core.pool import PoolMetrics
+
+class FakePool:
+    """
+    Pool with one connection: a second acquire waits until the first is released.
+    """
+    minsize, maxsize = 1, 1
+
+    def __init__(self):
+        self.size, self.freesize = 1, 1
+        self.available = asyncio.Semaphore(1)
+
+    async def acquire(self):
+        await self.available.acquire()
+        self.freesize -= 1
+        return object()
+
+    async def release(self, connection):
+        self.freesize += 1
+        self.available.release()
+
+def fake_database(pool):
+    return SimpleNamespace(_backend=SimpleNamespace(_pool=pool))
+
+@pytest.mark.asyncio
+async def test_reports_in_use_idle_and_wait_time():
+    pool = FakePool()
+    metrics = PoolMetrics("primary")
+    metrics.attach(fake_database(pool), acquire_timeout=1)
+
+    connection = await pool.acquire()
+    waiter = asyncio.create_task(pool.acquire())
+    await asyncio.sleep(0.02)
+    busy = metrics.snapshot()
+    await pool.release(connection)
+    await waiter
+
+    assert (busy["in_use"], busy["idle"], busy["waiting"]) == (1, 0, 1)
+    snapshot = metrics.snapshot()
+    assert snapshot["acquisitions"] == 2 and snapshot["waiting"] == 0
+    assert snapshot["max_wait_ms"] >= 15
+
+@pytest.mark.asyncio
+async def test_counts_acquire_timeouts():
+    pool = FakePool()
+    metrics = PoolMetrics("primary")
+    metrics.attach(fake_database(pool), acquire_timeout=0.01)
+    await pool.acquire()
+
+    with pytest.raises(asyncio.TimeoutError):
+        await pool.acquire()
+
+    assert metrics.snapshot()["acquire_timeouts"] == 1
+
+def test_backends_without_a_pool_are_ignored():
+    metrics = PoolMetrics("sqlite")
+    metrics.attach(SimpleNamespace(_backend=SimpleNamespace()))
+
+    assert metrics.snapshot()["size"] == 0
@@ -0,0 +1,92 @@
+import pytest
+from contextlib import asynccontextmanager
+from datetime import date, timedelta
+from decimal import Decimal
+from unittest.mock import AsyncMock
+from uuid import uuid4
+from app.data.CardsRepository import PriceHistoryRepository, bucket_start
+from app.services.CardService import PriceService
+
+@asynccontextmanager
+async def fake_transaction():
+    yield
+
+@pytest.fixture
+def price_repository():
+    # Repositório com um banco de dados falso
+    repository = PriceHistoryRepository()
+    repository.database = AsyncMock()
+    repository.database.transaction = fake_transaction
+    repository.database.fetch_all.return_value = []
+    repository.database.fetch_one.return_value = None
+    return repository
+
+def test_bucket_start():
+    assert bucket_start(date(2024, 5, 16), "week") == date(2024, 5, 13)
+    assert bucket_start(date(2024, 5, 16), "month") == date(2024, 5, 1)
+    assert bucket_start(date(2024, 5, 16), "day") == date(2024, 5, 16)
+
+@pytest.mark.asyncio
+async def test_new_price_moves_latest_price_and_both_rollups(price_repository):
+    card_id = uuid4()
+
+    await price_repository.add_price_record(card_id, Decimal("2.00"), date(2024, 5, 16))
+
+    calls = price_repository.database.execute.call_args_list
+    assert [call.kwargs["query"].split(" (")[0] for call in calls] == [
+        "INSERT INTO Price_History", "INSERT INTO Latest_Prices", "INSERT INTO Price_Rollups",
+    ]
+    rollup = calls[2].kwargs
+    assert "(:card_id, 'week', :week_start" in rollup["query"] and "GREATEST(high_price" in rollup["query"]
+    assert rollup["values"]["week_start"] == date(2024, 5, 13) and rollup["values"]["month_start"] == date(2024, 5, 1)
+
+@pytest.mark.asyncio
+async def test_latest_price_is_a_primary_key_lookup(price_repository):
+    await price_repository.get_latest_price(uuid4())
+
+    assert price_repository.database.fetch_one.call_args.kwargs["query"].startswith("SELECT card_id, price, date FROM Latest_Prices WHERE card_id")
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("start, bucket, expected_table", [
+    (date(2024, 1, 1), None, "Price_History"),  # 1 ano em dias cabe em 500 pontos
+    (date(2020, 1, 1), None, "Price_Rollups"),  # vários anos viram semanas
+    (None, None, "Price_History"),  # sem histórico não há o que agregar
+    (date(2020, 1, 1), "day", "Price_History"),
+])
+async def test_range_query_picks_the_source_for_the_bucket(price_repository, start, bucket, expected_table):
+    service = PriceService(price_repository)
+
+    await service.get_price_candles(uuid4(), start, date(2024, 12, 31), bucket=bucket)
+
+    query = price_repository.database.fetch_all.call_args.kwargs["query"]
+    assert f"FROM {expected_table} WHERE card_id = :card_id" in query
+
+@pytest.mark.asyncio
+async def test_weeks_are_used_when_days_do_not_fit(price_repository):
+    await PriceService(price_repository).get_price_candles(uuid4(), date(2020, 1, 1), date(2024, 12, 31))
+
+    values = price_repository.database.fetch_all.call_args.kwargs["values"]
+    assert values["bucket"] == "week" and values["start"] == date(2019, 12, 30)
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("first_date, expected_bucket", [
+    (date.today() - timedelta(days=14), "day"),  # duas semanas de histórico
+    (date.today() - timedelta(days=5 * 365), "week"),
+    (date.today() - timedelta(days=20 * 365), "month"),
+])
+async def test_request_without_a_range_picks_the_bucket_from_the_card_history(price_repository, first_date, expected_bucket):
+    price_repository.database.fetch_one.return_value = {"first_date": first_date}
+
+    await PriceService(price_repository).get_price_candles(uuid4())
+
+    assert price_repository.database.fetch_one.call_args.kwargs["query"].startswith("SELECT MIN(date) AS first_date FROM Price_History")
+    call = price_repository.database.fetch_all.call_args.kwargs
+    if expected_bucket == "day":
+        assert "FROM Price_History WHERE card_id = :card_id ORDER BY date" in call["query"]
+    else:
+        assert call["values"]["bucket"] == expected_bucket and "start" not in call["values"]
+
+@pytest.mark.asyncio
+async def test_inverted_range_is_rejected(price_repository):
+    with pytest.raises(ValueError):
+        await PriceService(price_repository).get_price_candles(uuid4(), date(2024, 2, 1), date(2024, 1, 1))
@@ -0,0 +1,112 @@
+import asyncio
+import json
+import logging
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from app.core import instrumentation
+from app.core.instrumentation import Histogram, instrument_requests, render_prometheus
+from app.data.InstrumentedDatabase import InstrumentedDatabase, QueryStats, current_query_stats
+
+@pytest.fixture
+def inner():
+    database = MagicMock()
+    database.fetch_one = AsyncMock(return_value={"id": 1})
+    database.fetch_all = AsyncMock(return_value=[{"id": 1}, {"id": 2}])
+    database.execute = AsyncMock(return_value=1)
+    return database
+
+@pytest.mark.asyncio
+async def test_records_statements_of_the_current_request(inner):
+    database = InstrumentedDatabase(inner, slow_query_seconds=0)
+    stats = QueryStats(keep_slowest=2)
+    token = current_query_stats.set(stats)
+    try:
+        await database.fetch_one("SELECT * FROM Cards WHERE id = :id", {"id": 1})
+        await database.fetch_all("SELECT *\n  FROM Decks")
+        await database.execute("UPDATE Cards SET price = 1")
+    finally:
+        current_query_stats.reset(token)
+
+    assert stats.count == 3
+    assert stats.total_time > 0
+    assert len(stats.slowest) == 2
+    assert all(sql in {"SELECT * FROM Cards WHERE id = :id", "SELECT * FROM Decks", "UPDATE Cards SET price = 1"} for _, sql in stats.slowest)
+
+@pytest.mark.asyncio
+async def test_statements_outside_a_request_are_not_collected(inner):
+    database = InstrumentedDatabase(inner, slow_query_seconds=0)
+
+    assert await database.fetch_one("SELECT 1") == {"id": 1}
+    assert current_query_stats.get() is None
+
+@pytest.mark.asyncio
+async def test_slow_query_is_logged_with_its_explain_plan(inner, caplog):
+    async def slow_fetch_one(query, values=None):
+        await asyncio.sleep(0.02)
+        return None
+    inner.fetch_one = slow_fetch_one
+    inner.fetch_all = AsyncMock(return_value=[{"type": "ALL", "rows": 4200}])
+    database = InstrumentedDatabase(inner, slow_query_seconds=0.01)
+
+    with caplog.at_level(logging.WARNING, logger="app.data.InstrumentedDatabase"):
+        await database.fetch_one("SELECT * FROM Cards WHERE name = :name", {"name": "Sol Ring"})
+        await asyncio.gather(*database._explains)
+
+    inner.fetch_all.assert_awaited_once_with(query="EXPLAIN SELECT * FROM Cards WHERE name = :name", values={"name": "Sol Ring"})
+    entry = json.loads(caplog.records[-1].getMessage())
+    assert entry["event"] == "slow_query"
+    assert entry["explain"] == [{"type": "ALL", "rows": 4200}]
+
+@pytest.mark.asyncio
+async def test_iterate_counts_one_statement(inner):
+    async def rows(query, values=None):
+        for i in range(3):
+            yield {"id": i}
+    inner.iterate = rows
+    database = InstrumentedDatabase(inner, slow_query_seconds=0)
+    stats = QueryStats()
+    token = current_query_stats.set(stats)
+    try:
+        assert [row["id"] async for row in database.iterate("SELECT * FROM Cards")] == [0, 1, 2]
+    finally:
+        current_query_stats.reset(token)
+
+    assert stats.count == 1
+
+def test_histogram_renders_cumulative_buckets():
+    histogram = Histogram("demo_seconds", "Demo.", (0.1, 1.0))
+    histogram.observe("GET", "/cards", 0.05)
+    histogram.observe("GET", "/cards", 0.5)
+    histogram.observe("GET", "/cards", 3.0)
+
+    lines = histogram.render()
+
+    assert 'demo_seconds_bucket{method="GET",route="/cards",le="0.1"} 1' in lines
+    assert 'demo_seconds_bucket{method="GET",route="/cards",le="1.0"} 2' in lines
+    assert 'demo_seconds_bucket{method="GET",route="/cards",le="+Inf"} 3' in lines
+    assert 'demo_seconds_count{method="GET",route="/cards"} 3' in lines
+
+def test_middleware_adds_server_timing_and_feeds_route_histograms(inner, monkeypatch):
+    for name in ("request_duration", "request_db_duration", "request_db_queries"):
+        histogram = getattr(instrumentation, name)
+        monkeypatch.setattr(histogram, "_series", {})
+    database = InstrumentedDatabase(inner, slow_query_seconds=0)
+    app = FastAPI()
+    app.middleware("http")(instrument_requests)
+
+    @app.get("/cards/{card_id}")
+    async def get_card(card_id: str):
+        await database.fetch_one("SELECT * FROM Cards WHERE id = :id", {"id": card_id})
+        await database.fetch_all("SELECT * FROM Cards_Themes WHERE card_id = :id", {"id": card_id})
+        return {"id": card_id}
+
+    response = TestClient(app).get("/cards/abc")
+
+    assert response.status_code == 200
+    assert response.headers["Server-Timing"].startswith("db;dur=")
+    assert 'desc="2 queries"' in response.headers["Server-Timing"]
+    text = render_prometheus()
+    assert 'http_request_db_queries_bucket{method="GET",route="/cards/{card_id}",le="2"} 1' in text
+    assert 'http_request_duration_seconds_count{method="GET",route="/cards/{card_id}"} 1' in text
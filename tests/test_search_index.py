@@ -0,0 +1,105 @@
+import pytest
+from contextlib import asynccontextmanager
+from unittest.mock import AsyncMock
+from uuid import uuid4
+from app.data.CardsRepository import CardsRepository
+from app.data.SearchIndex import TrigramIndex
+from app.services.CardService import CardsService
+from app.domain.CardModel import Card
+
+@asynccontextmanager
+async def fake_transaction():
+    yield
+
+@pytest.fixture
+def index():
+    index = TrigramIndex()
+    index.build([("1", "Lightning Bolt"), ("2", "Lightning Helix"), ("3", "Counterspell"), ("4", "Ball Lightning")])
+    return index
+
+def test_prefix_matches_rank_first(index):
+    results = index.search("light")
+
+    assert [result["id"] for result in results[:2]] == ["1", "2"]
+    assert results[2]["id"] == "4"
+
+def test_fuzzy_match_tolerates_typos_and_accents(index):
+    assert index.search("cöunterspel")[0]["id"] == "3"
+
+def test_limit_and_offset(index):
+    assert [result["id"] for result in index.search("lightning", limit=1, offset=1)] == ["2"]
+
+def test_remove_and_rename(index):
+    index.remove("3")
+    index.add("1", "Chain Lightning")
+
+    assert index.search("counterspell") == []
+    assert index.search("chain")[0]["id"] == "1"
+    assert len(index) == 3
+
+@pytest.mark.asyncio
+async def test_service_keeps_index_current_and_falls_back_to_fulltext():
+    repository = AsyncMock()
+    repository.database.transaction = fake_transaction
+    search_index = TrigramIndex()
+    service = CardsService(repository, search_index)
+    card = Card(id=uuid4(), name="Dark Ritual", _type="Instant", mana_cost=1)
+    repository.create.return_value = card
+    repository.search_cards.return_value = [{"id": card.id, "name": card.name, "score": 1.5}]
+
+    # Antes do build o índice não está pronto e a busca vai ao FULLTEXT do MySQL
+    await service.create(card)
+    assert (await service.search("ritual"))[0].id == card.id
+    repository.search_cards.assert_called_once()
+
+    search_index.ready = True
+    assert (await service.search("dark rit"))[0].id == card.id
+    repository.search_cards.assert_called_once()
+
+@pytest.mark.asyncio
+async def test_updating_a_missing_card_leaves_the_index_alone():
+    repository = AsyncMock()
+    repository.database.transaction = fake_transaction
+    repository.update.return_value = None
+    search_index = TrigramIndex()
+    search_index.build([])
+    service = CardsService(repository, search_index)
+
+    card_id = uuid4()
+    await service.update(card_id, Card(id=card_id, name="Dark Ritual", _type="Instant", mana_cost=1))
+
+    assert search_index.search("dark ritual", limit=5) == []
+
+@pytest.mark.asyncio
+async def test_card_created_in_a_rolled_back_unit_stays_out_of_the_index():
+    repository = AsyncMock()
+    repository.database.transaction = fake_transaction
+    search_index = TrigramIndex()
+    search_index.build([])
+    service = CardsService(repository, search_index)
+    repository.create.return_value = Card(id=uuid4(), name="Dark Ritual", _type="Instant", mana_cost=1)
+
+    with pytest.raises(RuntimeError):
+        async with service.unit_of_work():
+            await service.create(repository.create.return_value)
+            raise RuntimeError("rollback")
+
+    assert search_index.search("dark ritual", limit=5) == []
+
+@pytest.mark.asyncio
+async def test_index_is_built_from_a_keyset_scan_of_the_names():
+    repository = CardsRepository()
+    queries = []
+
+    async def fake_iterate(query, values):
+        queries.append(query)
+        yield {"id": "1", "name": "Dark Ritual"}
+
+    repository.database = AsyncMock()
+    repository.database.iterate = fake_iterate
+    search_index = TrigramIndex()
+
+    await CardsService(repository, search_index).build_search_index()
+
+    assert queries == ["SELECT id, name FROM Cards ORDER BY id LIMIT :limit"]
+    assert search_index.search("dark ritual", limit=5)[0]["id"] == "1"
@@ -0,0 +1,57 @@
+import json
+import pytest
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Dict, List
+from unittest.mock import AsyncMock
+from uuid import uuid4
+from app.core.serialization import FastJSONResponse, dump_json
+from app.data.CardsRepository import CardsRepository, PriceHistoryRepository
+from app.domain.BaseModel import Page
+from app.domain.CardModel import Card, PriceCandle, PriceHistory
+
+def card_row(card_id):
+    # Linha como vem do MySQL: id em texto, Decimal e colunas que o modelo não expõe
+    return {"id": card_id, "name": "Sol Ring", "_type": "Artifact", "mana_cost": 1, "color": None, "power": None,
+            "toughness": None, "effect": "Add two colorless mana.", "_set": "C21", "price": Decimal("1.50"),
+            "created_at": datetime(2024, 1, 1, 12, 30), "updated_at": datetime(2024, 3, 2, 8, 15, 0, 125000)}
+
+def pydantic_json(annotation, value):
+    # Saída do caminho padrão do FastAPI: validação contra o response_model e serialização por alias
+    from pydantic import TypeAdapter
+    adapter = TypeAdapter(annotation)
+    return json.loads(adapter.dump_json(adapter.validate_python(value), by_alias=True))
+
+@pytest.mark.asyncio
+async def test_raw_card_page_serialises_like_the_validated_page():
+    repository = CardsRepository()
+    repository.database = AsyncMock()
+    ids = sorted(str(uuid4()) for _ in range(3))
+    repository.database.fetch_all.return_value = [card_row(card_id) for card_id in ids]
+
+    raw_page = await repository.list(limit=2, raw=True)
+    model_page = await repository.list(limit=2)
+
+    assert raw_page.items[0] == {key: value for key, value in card_row(ids[0]).items() if key != "created_at"}
+    assert json.loads(FastJSONResponse(raw_page).body) == pydantic_json(Page[Card], model_page.model_dump(by_alias=True))
+
+@pytest.mark.asyncio
+async def test_raw_latest_prices_serialise_like_the_models():
+    repository = PriceHistoryRepository()
+    repository.database = AsyncMock()
+    card_id = str(uuid4())
+    repository.database.fetch_all.return_value = [{"card_id": card_id, "price": Decimal("3.25"), "date": date(2024, 5, 1)}]
+
+    raw = await repository.get_latest_prices([card_id], raw=True)
+    models = await repository.get_latest_prices([card_id])
+
+    assert json.loads(FastJSONResponse(raw).body) == pydantic_json(Dict[str, PriceHistory], models)
+
+def test_dump_json_serialises_models_by_alias():
+    card = Card(**card_row(str(uuid4())))
+    candles = [PriceCandle(date=date(2024, 1, 1), open=Decimal("1"), high=Decimal("2"), low=Decimal("0.5"), close=Decimal("1.5"))]
+
+    assert json.loads(dump_json(List[Card], [card]))[0]["_type"] == "Artifact"
+    assert json.loads(dump_json(List[Card], [card])) == pydantic_json(List[Card], [card])
+    assert json.loads(dump_json(List[PriceCandle], candles)) == pydantic_json(List[PriceCandle], candles)
+    assert "id" not in json.loads(dump_json(List[PriceCandle], candles))[0]
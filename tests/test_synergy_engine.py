@@ -0,0 +1,52 @@
+import pytest
+from decimal import Decimal
+from unittest.mock import AsyncMock
+from uuid import uuid4
+from app.data.DeckRepository import SynergyScoresRepository
+from app.services.DeckService import SynergyScoresService
+from app.services.SynergyEngine import SynergyInputs, build_matrices, score_matrices, score_deck
+
+def test_unrelated_cards_score_zero():
+    inputs = SynergyInputs(cards=[("a", 1), ("b", 1)], themes=[("a", "Aggro"), ("b", "Control")], interactions=[])
+
+    assert score_deck(inputs) == Decimal("0.0")
+
+def test_fully_connected_deck_scores_one_hundred():
+    inputs = SynergyInputs(
+        cards=[("a", 2), ("b", 1), ("c", 1)],
+        themes=[("a", "Tokens"), ("b", "Tokens"), ("c", "Tokens")],
+        interactions=[("a", "b"), ("b", "c"), ("c", "a")],
+    )
+
+    assert score_matrices(build_matrices(inputs)) == pytest.approx(100.0)
+
+def test_quantities_weight_the_score():
+    # Só a e b combinam; mais cópias deles aumentam a nota
+    themes = [("a", "Burn"), ("b", "Burn"), ("c", "Ramp")]
+    few = SynergyInputs(cards=[("a", 1), ("b", 1), ("c", 4)], themes=themes, interactions=[("a", "b")])
+    many = SynergyInputs(cards=[("a", 4), ("b", 4), ("c", 1)], themes=themes, interactions=[("a", "b")])
+
+    assert score_deck(many) > score_deck(few)
+
+def test_interactions_with_cards_outside_the_deck_are_ignored():
+    inputs = SynergyInputs(cards=[("a", 1), ("b", 1)], themes=[], interactions=[("a", "z")])
+
+    assert build_matrices(inputs).interactions.sum() == 0
+
+@pytest.mark.asyncio
+async def test_service_loads_in_bulk_and_stores_the_score():
+    repository = SynergyScoresRepository()
+    repository.database = AsyncMock()
+    deck_id, card_a, card_b = uuid4(), uuid4(), uuid4()
+    repository.database.fetch_all.side_effect = [
+        [{"deck_id": deck_id, "card_id": card_a, "quantity": 1}, {"deck_id": deck_id, "card_id": card_b, "quantity": 1}],
+        [{"deck_id": deck_id, "card_id": card_a, "theme": "Elves"}, {"deck_id": deck_id, "card_id": card_b, "theme": "Elves"}],
+        [{"deck_id": deck_id, "card_id_1": card_a, "card_id_2": card_b}],
+    ]
+
+    score = await SynergyScoresService(repository).calculate_synergy_score(deck_id)
+
+    assert score.synergy_score == Decimal("100.0")
+    assert repository.database.fetch_all.call_count == 3
+    insert = repository.database.execute.call_args.kwargs
+    assert insert["query"].startswith("INSERT INTO Synergy_Scores") and insert["values"]["synergy_score"] == Decimal("100.0")
@@ -0,0 +1,73 @@
+import json
+import pytest
+from unittest.mock import AsyncMock
+from app.data.DeckRepository import SynergyScoresRepository
+from app.domain.BaseModel import BulkResult
+from app.services.SynergyRescoreJob import SynergyRescoreJob
+
+DECKS = [f"deck-{i}" for i in range(5)]
+
+@pytest.fixture
+def repository():
+    # Repositório falso: cinco decks, cada um com uma única carta
+    repository = AsyncMock()
+    repository.get_deck_ids_after.side_effect = lambda after, limit, card_ids=None: [d for d in DECKS if after is None or d > after][:limit]
+    repository.load_synergy_rows.side_effect = lambda deck_ids: (
+        [{"deck_id": deck_id, "card_id": "card", "quantity": 1} for deck_id in deck_ids], [], []
+    )
+    repository.bulk_upsert.side_effect = lambda rows: BulkResult(processed=len(rows))
+    return repository
+
+@pytest.mark.asyncio
+async def test_rescores_every_deck_in_chunks_and_reports_progress(repository, tmp_path):
+    messages = []
+    job = SynergyRescoreJob(repository, chunk_size=2, workers=0, checkpoint_path=str(tmp_path / "checkpoint.json"), report=messages.append)
+
+    assert await job.run() == 5
+
+    written = [row["deck_id"] for call in repository.bulk_upsert.call_args_list for row in call.args[0]]
+    assert written == DECKS
+    assert repository.bulk_upsert.call_count == 3
+    assert len({row["calculated_at"] for call in repository.bulk_upsert.call_args_list for row in call.args[0]}) == 1
+    assert messages[-1].startswith("[done] 5 decks rescored")
+    assert not (tmp_path / "checkpoint.json").exists()
+
+@pytest.mark.asyncio
+async def test_resume_skips_decks_already_rescored(repository, tmp_path):
+    checkpoint = tmp_path / "checkpoint.json"
+    checkpoint.write_text(json.dumps({"card_ids": ["card"], "after": "deck-2", "calculated_at": "2024-05-01T10:00:00"}))
+    job = SynergyRescoreJob(repository, chunk_size=1, workers=0, checkpoint_path=str(checkpoint), report=lambda message: None)
+
+    assert await job.run(card_ids=["card"], resume=True) == 2
+
+    assert [row["deck_id"] for call in repository.bulk_upsert.call_args_list for row in call.args[0]] == ["deck-3", "deck-4"]
+    # Os decks afetados são paginados no banco, um lote por vez, e nunca carregados de uma vez
+    assert [call.args[0] for call in repository.get_deck_ids_after.call_args_list] == ["deck-2", "deck-3", "deck-4"]
+    assert all(call.kwargs["card_ids"] == ["card"] for call in repository.get_deck_ids_after.call_args_list)
+    rows = repository.bulk_upsert.call_args.args[0]
+    assert rows[0]["calculated_at"].isoformat() == "2024-05-01T10:00:00"
+
+@pytest.mark.asyncio
+async def test_resume_refuses_a_checkpoint_for_other_cards(repository, tmp_path):
+    checkpoint = tmp_path / "checkpoint.json"
+    checkpoint.write_text(json.dumps({"card_ids": None, "after": "deck-2", "calculated_at": "2024-05-01T10:00:00"}))
+    job = SynergyRescoreJob(repository, workers=0, checkpoint_path=str(checkpoint))
+
+    with pytest.raises(ValueError):
+        await job.run(card_ids=["card"], resume=True)
+
+@pytest.mark.asyncio
+async def test_decks_holding_cards_are_keyset_paginated_in_sql():
+    repository = SynergyScoresRepository()
+    repository.database = AsyncMock()
+    repository.database.fetch_all.return_value = [{"deck_id": "deck-3"}, {"deck_id": "deck-4"}]
+
+    deck_ids = await repository.get_deck_ids_after("deck-2", 2, card_ids=["card-a", "card-b"])
+
+    call = repository.database.fetch_all.call_args
+    assert call.kwargs["query"] == (
+        "SELECT DISTINCT deck_id FROM Deck_Cards WHERE card_id IN (:card_id_0, :card_id_1) "
+        "AND deck_id > :after ORDER BY deck_id LIMIT :limit"
+    )
+    assert call.kwargs["values"] == {"limit": 2, "after": "deck-2", "card_id_0": "card-a", "card_id_1": "card-b"}
+    assert deck_ids == ["deck-3", "deck-4"]
@@ -0,0 +1,129 @@
+import pytest
+from contextlib import asynccontextmanager
+from unittest.mock import AsyncMock, MagicMock
+from uuid import uuid4
+from app.data.Cache import LRUCache
+from app.data.CardsRepository import CardsRepository
+from app.data.DeckRepository import DeckCardsRepository, DecksRepository
+from app.data.SearchIndex import TrigramIndex
+from app.data.UnitOfWork import after_commit, current_unit_of_work, unit_of_work
+from app.domain.BaseModel import BulkResult, BulkRowError
+from app.domain.CardModel import Card
+from app.services.CardService import CardsService
+from app.services.DeckService import DeckCardsService, DeckService
+
+class FakeDatabase(AsyncMock):
+    """
+    AsyncMock database that records transactions: outermost ones commit, nested ones are savepoints.
+    """
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.depth = 0
+        self.commits = 0
+        self.rollbacks = 0
+
+    @asynccontextmanager
+    async def transaction(self):
+        self.depth += 1
+        try:
+            yield
+        except Exception:
+            self.rollbacks += self.depth == 1
+            raise
+        else:
+            self.commits += self.depth == 1
+        finally:
+            self.depth -= 1
+
+@pytest.fixture
+def database():
+    return FakeDatabase()
+
+@pytest.mark.asyncio
+async def test_nested_units_share_one_commit(database):
+    async with unit_of_work(database) as outer:
+        async with unit_of_work(database) as inner:
+            assert inner is outer
+            assert database.depth == 1
+    assert database.commits == 1
+    assert current_unit_of_work.get() is None
+
+@pytest.mark.asyncio
+async def test_after_commit_callbacks_run_only_when_the_unit_commits(database):
+    callback = MagicMock()
+    with pytest.raises(ValueError):
+        async with unit_of_work(database):
+            await after_commit(callback)
+            raise ValueError("boom")
+    callback.assert_not_called()
+    assert database.rollbacks == 1
+
+    async with unit_of_work(database):
+        await after_commit(callback)
+        callback.assert_not_called()
+    callback.assert_called_once()
+
+@pytest.mark.asyncio
+async def test_after_commit_runs_at_once_outside_a_unit():
+    callback = AsyncMock()
+    await after_commit(callback)
+    callback.assert_awaited_once()
+
+@pytest.mark.asyncio
+async def test_cache_is_bypassed_and_invalidated_after_commit(database):
+    repository = CardsRepository()
+    repository.database = database
+    repository.cache = LRUCache()
+    card_id = uuid4()
+    key = repository._cache_key("get", card_id)
+    await repository.cache.set(key, Card(id=card_id, name="Old", _type="Creature", mana_cost=1))
+    database.fetch_one.return_value = {"id": card_id, "name": "New", "_type": "Creature", "mana_cost": 1}
+
+    async with unit_of_work(database):
+        await repository.update(card_id, Card(id=card_id, name="New", _type="Creature", mana_cost=1), return_representation=False)
+        assert (await repository.get(card_id)).name == "New"
+        assert await repository.cache.get(key) is not None  # Ainda não confirmado
+    assert await repository.cache.get(key) is None
+
+@pytest.mark.asyncio
+async def test_search_index_is_left_alone_when_the_unit_rolls_back(database):
+    repository = CardsRepository()
+    repository.database = database
+    index = TrigramIndex()
+    service = CardsService(repository, index)
+
+    with pytest.raises(RuntimeError):
+        async with service.unit_of_work():
+            await service.create(Card(id=uuid4(), name="Llanowar Elves", _type="Creature", mana_cost=1), return_representation=False)
+            raise RuntimeError("later statement failed")
+    assert len(index) == 0
+
+    await service.create(Card(id=uuid4(), name="Llanowar Elves", _type="Creature", mana_cost=1), return_representation=False)
+    assert len(index) == 1
+
+@pytest.mark.asyncio
+async def test_deck_card_changes_commit_once(database):
+    deck_cards_repository = DeckCardsRepository()
+    deck_cards_repository.database = database
+    summary_repository = AsyncMock()
+    service = DeckCardsService(deck_cards_repository, summary_repository)
+
+    await service.apply_deck_diff(uuid4(), [(uuid4(), 2), (uuid4(), -1)])
+
+    assert database.commits == 1
+    assert database.execute.await_count == 3  # Upsert, DELETE dos zerados e a nova versão do deck
+    summary_repository.rebuild.assert_awaited_once()
+
+@pytest.mark.asyncio
+async def test_creating_a_deck_with_rejected_cards_writes_nothing(database):
+    decks_repository = DecksRepository()
+    decks_repository.database = database
+    deck_cards_service = AsyncMock()
+    deck_cards_service.set_cards_in_deck.return_value = BulkResult(processed=1, failed=[BulkRowError(index=1, error="bad card")])
+    service = DeckService(decks_repository, deck_cards_service)
+
+    with pytest.raises(ValueError, match="Card row 1"):
+        await service.create_deck_with_cards(uuid4(), "Elves", [{"card_id": uuid4(), "quantity": 4}, {"quantity": 1}])
+
+    assert database.rollbacks == 1 and database.commits == 0
+    database.execute.assert_awaited_once()  # O INSERT do deck foi desfeito junto
@@ -1,7 +1,10 @@
 import pytest
+from uuid import uuid4
+from fastapi import HTTPException
 from unittest.mock import AsyncMock, MagicMock
 from app.services.UserService import UserService
-from app.domain.user import User
+from app.domain.UserModel import User
+from app.domain.BaseModel import Page
 from app.data.UserRepository import UserRepository
 
 @pytest.fixture
@@ -18,33 +21,44 @@ def user_service(mock_repository):
 @pytest.mark.asyncio
 async def test_create_user(user_service, mock_repository):
     # Dados de exemplo
-    user = User(name="John Doe", email="johndoe@example.com")
-    mock_repository.create.return_value = 1  # Simula retorno de ID
+    user = User(username="johndoe", email="johndoe@example.com", password_hash="secret")
+    mock_repository.get_by_email.return_value = None  # E-mail ainda não cadastrado
+    mock_repository.create.return_value = user
 
     # Chama o método create do UserService
-    user_id = await user_service.create(user)
+    created = await user_service.create(user)
 
-    # Verifica se o repositório foi chamado com o usuário correto
-    mock_repository.create.assert_called_once_with(user)
-    assert user_id == 1
+    # Verifica se o repositório foi chamado com o usuário correto, com a senha já transformada
+    mock_repository.create.assert_called_once_with(user, return_representation=True)
+    assert created.password_hash == "hashed_secret"
+
+@pytest.mark.asyncio
+async def test_create_user_with_existing_email_is_rejected(user_service, mock_repository):
+    user = User(username="johndoe", email="johndoe@example.com", password_hash="secret")
+    mock_repository.get_by_email.return_value = user
+
+    with pytest.raises(HTTPException):
+        await user_service.create(user)
+    mock_repository.create.assert_not_called()
 
 @pytest.mark.asyncio
 async def test_get_user(user_service, mock_repository):
     # Configura o mock para retornar um objeto User
-    user = User(id=1, name="John Doe", email="johndoe@example.com")
+    user_id = uuid4()
+    user = User(id=user_id, username="johndoe", email="johndoe@example.com", password_hash="secret")
     mock_repository.get.return_value = user
 
     # Chama o método get do UserService
-    result = await user_service.get(1)
+    result = await user_service.get(user_id)
 
     # Verifica se o repositório foi chamado corretamente
-    mock_repository.get.assert_called_once_with(1)
+    mock_repository.get.assert_called_once_with(user_id)
     assert result == user
 
 @pytest.mark.asyncio
 async def test_list_users(user_service, mock_repository):
-    # Configura o mock para retornar uma lista de usuários
-    users = [User(id=1, name="John Doe", email="johndoe@example.com")]
+    # Configura o mock para retornar uma página de usuários
+    users = Page[User](items=[User(id=uuid4(), username="johndoe", email="johndoe@example.com", password_hash="secret")])
     mock_repository.list.return_value = users
 
     # Chama o método list do UserService
@@ -57,13 +71,13 @@ async def test_list_users(user_service, mock_repository):
 @pytest.mark.asyncio
 async def test_update_user(user_service, mock_repository):
     # Dados de exemplo
-    user = User(name="John Doe", email="johndoe@example.com")
+    user = User(username="johndoe", email="johndoe@example.com", password_hash="secret")
 
     # Chama o método update do UserService
     await user_service.update(1, user)
 
     # Verifica se o repositório foi chamado com os parâmetros corretos
-    mock_repository.update.assert_called_once_with(1, user)
+    mock_repository.update.assert_called_once_with(1, user, return_representation=True)
 
 @pytest.mark.asyncio
 async def test_delete_user(user_service, mock_repository):
@@ -71,4 +85,4 @@ async def test_delete_user(user_service, mock_repository):
     await user_service.delete(1)
 
     # Verifica se o repositório foi chamado com o ID correto
-    mock_repository.delete.assert_called_once_with(1)
+    mock_repository.delete.assert_called_once_with(1, return_representation=True)
@@ -0,0 +1,41 @@
+import pytest
+from datetime import date
+from decimal import Decimal
+from unittest.mock import AsyncMock
+from uuid import uuid4
+from app.data.CardsRepository import PriceHistoryRepository
+from app.data.DeckRepository import DecksRepository
+from app.services.DeckService import DeckService
+
+@pytest.mark.asyncio
+async def test_latest_prices_of_many_cards_in_chunked_lookups():
+    repository = PriceHistoryRepository()
+    repository.database = AsyncMock()
+    repository.database.fetch_all.side_effect = lambda query, values: [
+        {"card_id": card_id, "price": Decimal("1.00"), "date": date(2024, 1, 1)} for card_id in values.values()
+    ]
+    card_ids = [str(uuid4()) for _ in range(3)]
+
+    latest = await repository.get_latest_prices(card_ids + card_ids[:1], chunk_size=2)
+
+    assert list(latest) == card_ids
+    assert repository.database.fetch_all.call_count == 2
+    assert "FROM Latest_Prices WHERE card_id IN (:card_id_0, :card_id_1)" in repository.database.fetch_all.call_args_list[0].kwargs["query"]
+
+@pytest.mark.asyncio
+async def test_user_decks_are_valued_in_one_aggregate_query():
+    repository = DecksRepository()
+    repository.database = AsyncMock()
+    user_id = uuid4()
+    repository.database.fetch_all.return_value = [
+        {"deck_id": uuid4(), "name": "Burn", "total_cards": 60, "deck_value": Decimal("120.50")},
+        {"deck_id": uuid4(), "name": "Empty", "total_cards": 0, "deck_value": Decimal("0")},
+    ]
+
+    value = await DeckService(repository).get_user_decks_value(user_id)
+
+    assert value.total_value == Decimal("120.50") and len(value.decks) == 2
+    assert "id" not in value.model_dump() and "id" not in value.decks[0].model_dump()
+    repository.database.fetch_all.assert_called_once()
+    query = repository.database.fetch_all.call_args.kwargs["query"]
+    assert "SUM(dc.quantity * COALESCE(lp.price, c.price, 0))" in query and "WHERE d.user_id = :user_id GROUP BY d.id" in query